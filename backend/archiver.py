@@ -6,9 +6,15 @@ import json
 import time
 import re
 
+# Same default and SUB5_BASE_URL override as scraper.py
+BASE_URL = "https://sub5.com"
+BASE_URL_ENV = "SUB5_BASE_URL"
+START_PATH = "/youth-pages/indoor-track/2026-indoor-results/"
+
 class Sub5Archiver:
-    def __init__(self, base_dir="backend/data/sub5_archive"):
+    def __init__(self, base_dir="backend/data/sub5_archive", base_url=None):
         self.base_dir = base_dir
+        self.base_url = (base_url or os.environ.get(BASE_URL_ENV) or BASE_URL).rstrip('/')
         self.headers = {'User-Agent': 'Mozilla/5.0'}
         self.scraped_urls = set()
         self.manifest_path = os.path.join(self.base_dir, "manifest.json")
@@ -129,7 +135,8 @@ class Sub5Archiver:
         except Exception as e:
             print(f"Error crawling {url}: {e}")
 
-    def run(self, start_url):
+    def run(self, start_url=None):
+        start_url = start_url or self.base_url + START_PATH
         print(f"Starting archival mission from: {start_url}")
         # Determine initial year
         start_year = self.get_year_from_url(start_url)
@@ -140,4 +147,4 @@ class Sub5Archiver:
 if __name__ == "__main__":
     archiver = Sub5Archiver()
     # Start with the 2026 indoor results
-    archiver.run("https://sub5.com/youth-pages/indoor-track/2026-indoor-results/")
+    archiver.run()
@@ -0,0 +1,104 @@
+import sqlite3
+import sys
+import os
+import re
+try:
+    from backend.database import create_schema
+    from backend import queries
+except ImportError:
+    from database import create_schema
+    import queries
+
+# Tables that grow with every meet. A bare SCAN of these means an index is missing.
+FACT_TABLES = ('performances', 'relay_legs', 'change_log')
+
+def catalog():
+    """
+    Every query the API, exporter and sync run, with representative parameters.
+    `bounded` marks queries whose result is one athlete's history or one export shard,
+    where sorting the (small) result in a temp B-tree is acceptable as long as nothing is scanned.
+    """
+    entries = [
+        ("GET /athletes", queries.athletes_query()),
+        ("GET /athletes?team=", queries.athletes_query(team_id=1)),
+        ("GET /athletes?team=&year=&season=", queries.athletes_query(team_id=1, season_ids=[1])),
+        ("GET /athletes?year=", queries.athletes_query(season_ids=[1, 2])),
+        ("GET /teams", queries.teams_query()),
+        ("GET /athletes/{id}/performances", queries.athlete_performances_query(1)),
+        ("GET /athletes/{id}/performances?team=", queries.athlete_performances_query(1, team_id=1)),
+        ("GET /performances", queries.performances_query()),
+        ("GET /performances?team=", queries.performances_query(team_id=1)),
+        ("relay legs for performances", queries.relay_legs_query([1, 2, 3])),
+        ("GET /search", (queries.SEARCH_QUERY, ['"ben"*', 10])),
+        ("export: shard list", (queries.EXPORT_SHARDS_QUERY, [])),
+        ("export: shard rows", (queries.EXPORT_SHARD_QUERY, [1, 1])),
+        ("sync: synced meets", (queries.SYNCED_MEETS_QUERY, [])),
+        ("sync: performance exists", (queries.PERFORMANCE_EXISTS_QUERY, [1, 1, "10.00", "2026-01-01T12:00:00"])),
+        ("GET /meets/unknown-dates", (queries.UNKNOWN_DATE_MEETS_QUERY, [])),
+        ("sync: relay exists", (queries.RELAY_EXISTS_QUERY, [1, "1:50.00", "2026-01-01T12:00:00", 1])),
+        ("GET /changes", (queries.CHANGES_QUERY, [100, 5000])),
+        ("GET /changes: performances", queries.performances_by_id_query([1, 2, 3])),
+        ("GET /changes: athletes", queries.athletes_by_id_query([1, 2, 3])),
+    ]
+    bounded = {"GET /athletes/{id}/performances", "GET /athletes/{id}/performances?team=", "export: shard rows"}
+    return [
+        {"name": name, "sql": sql, "params": params, "bounded": name in bounded}
+        for name, (sql, params) in entries
+    ]
+
+def explain(conn, sql, params):
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()]
+
+def check_plan(details, bounded=False):
+    """Returns a list of problems found in an EXPLAIN QUERY PLAN."""
+    problems = []
+    scans_fact_table = False
+    for detail in details:
+        m = re.match(r'SCAN (\w+)', detail)
+        if m and m.group(1) in FACT_TABLES:
+            scans_fact_table = True
+            if 'USING' not in detail:
+                problems.append(f"full table scan: {detail}")
+    for detail in details:
+        if detail.startswith('USE TEMP B-TREE FOR'):
+            if bounded and not scans_fact_table:
+                continue
+            problems.append(f"temp B-tree sort: {detail}")
+    return problems
+
+def audit(db_path=None, verbose=True):
+    """
+    Runs EXPLAIN QUERY PLAN for every catalog query.
+    Without a db_path the plans are taken against a fresh schema, which is what a new
+    install (and CI) gets. Returns the number of failing queries.
+    """
+    if db_path:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(':memory:')
+        create_schema(conn)
+
+    failures = 0
+    for entry in catalog():
+        details = explain(conn, entry["sql"], entry["params"])
+        problems = check_plan(details, entry["bounded"])
+        status = "FAIL" if problems else "ok"
+        if verbose or problems:
+            print(f"[{status}] {entry['name']}")
+            for detail in details:
+                print(f"    {detail}")
+            for problem in problems:
+                print(f"    !! {problem}")
+        if problems:
+            failures += 1
+    conn.close()
+
+    print(f"\n{failures} of {len(catalog())} queries have plan regressions.")
+    return failures
+
+if __name__ == "__main__":
+    db = sys.argv[1] if len(sys.argv) > 1 else None
+    if db and not os.path.exists(db):
+        print(f"Database not found: {db}")
+        sys.exit(2)
+    sys.exit(1 if audit(db) else 0)
@@ -0,0 +1,133 @@
+import os
+import shutil
+import sys
+import tempfile
+try:
+    from backend.synth_corpus import SEASONS, generate_corpus, check_parsed, parse_args
+    from backend.scraper import Sub5Scraper
+    from backend.export_for_web import export_data
+    from backend.run_report import RunReport, print_summary
+    from backend.replay_server import ReplayServer, parse_args as replay_args
+except ImportError:
+    from synth_corpus import SEASONS, generate_corpus, check_parsed, parse_args
+    from scraper import Sub5Scraper
+    from export_for_web import export_data
+    from run_report import RunReport, print_summary
+    from replay_server import ReplayServer, parse_args as replay_args
+
+# End-to-end throughput benchmark: synthetic corpus -> parse -> sync -> export.
+#
+#   python backend/bench_pipeline.py [--scale 1] [--seed 1] [--seasons 2025,2026] [--keep DIR]
+#   python backend/bench_pipeline.py --replay [--latency 50] [--error-rate 0.02] [--fail-first 1] ...
+#   python backend/profiling.py --targets parse,sync backend/bench_pipeline.py --scale 5
+#
+# The corpus (synth_corpus.py) is written to a scratch directory and run through the real
+# Sub5Scraper.parse_all_files, sync_json_to_db and export_for_web.export_data against a
+# fresh database. With --replay it is first crawled from a local replay_server.py (index and
+# download stages, with the fault options of replay_server.py) instead of read in place.
+# The scratch directory is removed afterwards unless --keep is given.
+# The run report (kind "bench", with scale and seed) goes to BENCH_DIR, so runs of the same
+# scale and seed on two commits can be compared stage by stage.
+
+BENCH_DIR = os.path.join(os.path.dirname(__file__), 'data', 'bench_reports')
+STAGES = ("generate", "index", "download", "parse", "sync", "export")
+
+def run_benchmark(work_dir, scale=1.0, seed=1, seasons=SEASONS, replay=None):
+    """Returns the finished run report (a dict). `replay`: ReplayServer options, to download the corpus."""
+    corpus_dir = os.path.join(work_dir, 'corpus')
+    json_root = os.path.join(work_dir, 'parsed')
+    db_path = os.path.join(work_dir, 'bench.db')
+    export_dir = os.path.join(work_dir, 'export')
+
+    run = RunReport("bench", scale=scale, seed=seed, seasons=list(seasons), replay=replay)
+    with run.stage("generate") as stage:
+        corpus = generate_corpus(corpus_dir, scale, seed, seasons)
+        for season in corpus.values():
+            stage.counts["files"] += season["files"]
+            stage.counts["bytes"] += season["bytes"]
+            stage.counts["rows_inserted"] += season["results"]
+
+    server = ReplayServer(corpus_dir, **replay).start() if replay is not None else None
+    scraper = Sub5Scraper(db_path=db_path, progress_callback=lambda message, progress: None,
+                          base_url=server and server.url, data_dir=os.path.join(work_dir, 'data'))
+    scraper.run = run
+    with run.stage("schema"):
+        scraper.initialize_db(wipe=True)
+    generated = parsed = wrong = 0
+    samples = []
+    for year, season in corpus.items():
+        json_dir = os.path.join(json_root, year)
+        archive_dir = season["dir"]
+        if server:
+            archive_dir = os.path.join(scraper.data_dir, 'sub5_archive', year)
+            with run.stage("index", season=year):
+                links = scraper.get_meet_links(scraper.season_url(year))
+            with run.stage("download", season=year):
+                scraper.download_missing_files(scraper.season_url(year), archive_dir, links=links)
+        with run.stage("parse", season=year) as stage:
+            scraper.parse_all_files(archive_dir, json_dir)
+        # Not timed: how many of the generated results the parser recovered, and how many
+        # came back with an athlete or team the page was not generated with
+        stage.counts["rows_inserted"], season_wrong, season_samples = check_parsed(season["rows"], json_dir)
+        generated += season["results"]
+        parsed += stage.counts["rows_inserted"]
+        wrong += season_wrong
+        samples += season_samples
+        with run.stage("sync", season=year):
+            scraper.sync_json_to_db(json_dir, season="Indoor", year=year)
+    with run.stage("export"):
+        export_data(db_path, export_dir, run=run)
+    if server:
+        server.stop()
+        run.info["server"] = server.stats
+
+    run.info["parsed_results"] = parsed
+    run.info["generated_results"] = generated
+    run.info["mismatched_results"] = wrong
+    run.info["mismatched_samples"] = samples[:5]
+    run.finish(reports_dir=BENCH_DIR)
+    return run.to_dict()
+
+def throughput(report):
+    """{stage: (wall_s, files, rows, MB)} summed over seasons."""
+    totals = {}
+    for stage in report["stages"]:
+        if stage["name"] not in STAGES:
+            continue
+        wall, files, rows, mb = totals.get(stage["name"], (0.0, 0, 0, 0.0))
+        totals[stage["name"]] = (wall + stage["wall_s"], files + stage["files"],
+                                 rows + stage["rows_inserted"], mb + stage["bytes"] / 1024 / 1024)
+    return totals
+
+def print_throughput(report):
+    print(f"\nbench scale={report['scale']} seed={report['seed']}: parsed {report['parsed_results']} "
+          f"of {report['generated_results']} generated results, {report['mismatched_results']} with a wrong "
+          f"athlete or team")
+    for stem, athlete, team in report["mismatched_samples"]:
+        print(f"  {stem}: {athlete!r} / {team!r}")
+    print(f"  {'stage':<10}{'wall s':>9}{'files/s':>10}{'rows/s':>11}{'MB/s':>8}")
+    for name, (wall, files, rows, mb) in throughput(report).items():
+        rate = lambda n: n / wall if wall else 0.0
+        print(f"  {name:<10}{wall:9.2f}{rate(files):10.1f}{rate(rows):11.0f}{rate(mb):8.2f}")
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    keep = None
+    if "--keep" in argv and argv.index("--keep") + 1 < len(argv):
+        i = argv.index("--keep")
+        keep = argv[i + 1]
+        del argv[i:i + 2]
+    options, rest = parse_args(argv)
+    if "--replay" in rest:
+        rest.remove("--replay")
+        options["replay"] = replay_args(rest)[2]
+    work_dir = keep or tempfile.mkdtemp(prefix='sub5-bench-')
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        report = run_benchmark(work_dir, **options)
+    finally:
+        if not keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    print_summary(report)
+    print_throughput(report)
+    print(f"Run report saved to {BENCH_DIR}" + (f"; files kept in {work_dir}" if keep else ""))
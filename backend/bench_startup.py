@@ -0,0 +1,123 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import requests
+try:
+    from backend.bench_pipeline import BENCH_DIR
+    from backend.load_test import REPO_DIR, build_fixture, free_port
+    from backend.run_report import save_report
+except ImportError:
+    from bench_pipeline import BENCH_DIR
+    from load_test import REPO_DIR, build_fixture, free_port
+    from run_report import save_report
+
+# Cold-start benchmark for the API process.
+#
+#   python backend/bench_startup.py [--runs 5] [--db track_app.db] [--check]
+#
+# Every run starts a fresh interpreter, so nothing is warm:
+#   import_s      time to `import backend.main`, measured inside the process
+#   process_s     the same from the outside, interpreter startup included
+#   modules       how many modules the import loads; any of HEAVY_MODULES is listed
+#   first_s       spawning `uvicorn backend.main:app` until /health answers
+#   first_read_s  the first read after that (/teams, which opens the first DB connection)
+# Medians are printed and saved as a report (kind "startup") in BENCH_DIR, next to
+# bench_pipeline.py's. Without --db the app reads a small synthetic database (load_test.py's).
+# --check exits 1 if importing the API loads any of HEAVY_MODULES, i.e. the scraping stack
+# is back on the read-only startup path.
+
+HEAVY_MODULES = ("requests", "bs4", "backend.scraper", "backend.prototype_parser", "backend.parsers")
+STARTUP_TIMEOUT = 60
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in sys.modules if any(m == h or m.startswith(h + '.') for h in HEAVY))
+print(json.dumps({"import_s": elapsed, "modules": len(sys.modules), "heavy": heavy}))
+'''
+
+def measure_import():
+    code = f"HEAVY = {HEAVY_MODULES!r}\n" + PROBE
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - start
+    return result
+
+def measure_first_response(db_path):
+    """(seconds until /health answers, seconds for the first /teams) for a fresh uvicorn."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "SUB5_DB_PATH": db_path}
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'backend.main:app', '--host', '127.0.0.1',
+                                '--port', str(port), '--log-level', 'warning'], cwd=REPO_DIR, env=env)
+    try:
+        while True:
+            try:
+                if requests.get(url + '/health', timeout=1).status_code == 200:
+                    break
+            except requests.RequestException:
+                pass
+            if time.perf_counter() - start > STARTUP_TIMEOUT:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.01)
+        first = time.perf_counter() - start
+        read_start = time.perf_counter()
+        requests.get(url + '/teams', timeout=30).raise_for_status()
+        return first, time.perf_counter() - read_start
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def run_startup_benchmark(runs=5, db_path=None):
+    db_path = db_path or build_fixture(0.1, 1, ("2025", "2026"))
+    samples = []
+    for _ in range(runs):
+        sample = measure_import()
+        sample["first_s"], sample["first_read_s"] = measure_first_response(db_path)
+        samples.append(sample)
+    report = {"kind": "startup", "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+              "runs": runs, "python": sys.version.split()[0], "heavy": samples[-1]["heavy"]}
+    for key in ("import_s", "process_s", "first_s", "first_read_s", "modules"):
+        report[key] = round(statistics.median(s[key] for s in samples), 4)
+    save_report(report, BENCH_DIR)
+    return report
+
+def parse_args(argv):
+    options = {}
+    check = False
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--check":
+            check = True
+            i += 1
+        elif argv[i] == "--runs" and i + 1 < len(argv):
+            options["runs"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--db" and i + 1 < len(argv):
+            options["db_path"] = os.path.abspath(argv[i + 1])
+            i += 2
+        else:
+            print(f"Unknown option {argv[i]}")
+            sys.exit(2)
+    return options, check
+
+if __name__ == "__main__":
+    options, check = parse_args(sys.argv[1:])
+    report = run_startup_benchmark(**options)
+    print(f"\nAPI cold start, median of {report['runs']} runs (Python {report['python']}):")
+    print(f"  import backend.main  {report['import_s'] * 1000:8.1f} ms  ({report['modules']:.0f} modules)")
+    print(f"  interpreter + import {report['process_s'] * 1000:8.1f} ms")
+    print(f"  first /health        {report['first_s'] * 1000:8.1f} ms after spawning uvicorn")
+    print(f"  first /teams         {report['first_read_s'] * 1000:8.1f} ms")
+    if report["heavy"]:
+        print(f"  [WARN] the API imports {', '.join(report['heavy'])} at startup")
+    print(f"Report saved to {BENCH_DIR}")
+    if check and report["heavy"]:
+        sys.exit(1)
@@ -0,0 +1,918 @@
+import json
+import os
+import re
+import sqlite3
+from urllib.parse import quote
+try:
+    from backend import queries
+except ImportError:
+    import queries
+
+# Shared schema and query helpers for track_app.db.
+# Used by the scraper (writer), the FastAPI server and export_for_web (readers).
+
+def create_schema(conn, wipe=False):
+    """Creates all tables, views and indexes. Optionally drops existing tables first."""
+    if wipe:
+        conn.execute('DROP VIEW IF EXISTS performance_details')
+        conn.execute('DROP TABLE IF EXISTS search_index')
+        conn.execute('DROP TABLE IF EXISTS relay_legs')
+        conn.execute('DROP TABLE IF EXISTS relays')
+        conn.execute('DROP TABLE IF EXISTS athlete_aliases')
+        conn.execute('DROP TABLE IF EXISTS athlete_merge_candidates')
+        conn.execute('DROP TABLE IF EXISTS performances')
+        conn.execute('DROP TABLE IF EXISTS athletes')
+        conn.execute('DROP TABLE IF EXISTS meets')
+        conn.execute('DROP TABLE IF EXISTS teams')
+        conn.execute('DROP TABLE IF EXISTS events')
+        conn.execute('DROP TABLE IF EXISTS seasons')
+        conn.execute('DROP TABLE IF EXISTS scraper_history')
+        conn.execute('DROP TABLE IF EXISTS applied_fixes')
+        conn.execute('DROP TABLE IF EXISTS shard_versions')
+        conn.execute('DROP TABLE IF EXISTS data_version')
+        conn.execute('DROP TABLE IF EXISTS change_log')
+        conn.execute('DROP TABLE IF EXISTS change_log_info')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS athletes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE
+        )
+    ''')
+
+    # Dimension tables: every repeated text value on a performance lives here once
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS meets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            date TEXT,
+            url TEXT,
+            date_source TEXT,
+            date_confidence REAL
+        )
+    ''')
+    # Resolved-date columns (meet_dates.py) were added after the table
+    add_missing_columns(conn, 'meets', {'date_source': 'TEXT', 'date_confidence': 'REAL'})
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            gender TEXT,
+            is_relay INTEGER DEFAULT 0
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS seasons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            year TEXT,
+            season TEXT,
+            UNIQUE(year, season)
+        )
+    ''')
+
+    # Relay performances have a NULL athlete_id; the runners live in relay_legs.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS performances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            athlete_id INTEGER,
+            event_id INTEGER,
+            mark TEXT,
+            place TEXT,
+            team_id INTEGER,
+            date TEXT,
+            season_id INTEGER,
+            meet_id INTEGER,
+            splits TEXT,
+            FOREIGN KEY(athlete_id) REFERENCES athletes(id),
+            FOREIGN KEY(event_id) REFERENCES events(id),
+            FOREIGN KEY(team_id) REFERENCES teams(id),
+            FOREIGN KEY(season_id) REFERENCES seasons(id),
+            FOREIGN KEY(meet_id) REFERENCES meets(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS relays (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            performance_id INTEGER NOT NULL UNIQUE,
+            FOREIGN KEY(performance_id) REFERENCES performances(id) ON DELETE CASCADE
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS relay_legs (
+            relay_id INTEGER NOT NULL,
+            leg INTEGER NOT NULL,
+            athlete_id INTEGER NOT NULL,
+            split TEXT,
+            PRIMARY KEY (relay_id, leg),
+            FOREIGN KEY(relay_id) REFERENCES relays(id) ON DELETE CASCADE,
+            FOREIGN KEY(athlete_id) REFERENCES athletes(id)
+        )
+    ''')
+
+    # Names merged into another athlete by identity.py; sync resolves them to the kept id
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS athlete_aliases (
+            alias TEXT PRIMARY KEY,
+            athlete_id INTEGER NOT NULL,
+            FOREIGN KEY(athlete_id) REFERENCES athletes(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS athlete_merge_candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keep_id INTEGER NOT NULL,
+            merge_id INTEGER NOT NULL,
+            confidence REAL NOT NULL,
+            reason TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            UNIQUE(keep_id, merge_id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scraper_history (
+            url TEXT PRIMARY KEY,
+            scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # manual_fixes.json as of the last sync (see fixes.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS applied_fixes (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (kind, key)
+        )
+    ''')
+
+    # Databases written before the dimension tables still carry text columns
+    if is_legacy_schema(conn):
+        migrate_relay_athletes(conn)
+        migrate_to_dimensions(conn)
+
+    # Add Indexes for performance
+    # Each index backs a query in queries.py; audit_query_plans.py checks they are used.
+    # athletes.name and relays.performance_id are already indexed by their UNIQUE constraints.
+    conn.execute('DROP INDEX IF EXISTS idx_athlete_name')
+    conn.execute('DROP INDEX IF EXISTS idx_perf_athlete_id')  # prefix of idx_perf_athlete_date
+    # Sync dedup check (athlete_id IS NULL for relays)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_composite ON performances(athlete_id, event_id, mark, date)')
+    # /athletes/{id}/performances: athlete lookup already in date order
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_athlete_date ON performances(athlete_id, date)')
+    # /performances and the export: newest first without a sort
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_date ON performances(date)')
+    # /performances?team=: team lookup already in date order
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_team_date ON performances(team_id, date)')
+    # /athletes filters: covering (team, season) -> athlete
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_team_season ON performances(team_id, season_id, athlete_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_season ON performances(season_id, athlete_id)')
+    # Synced-meet check
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_meet ON performances(meet_id)')
+    # "All relays this athlete ran" is a range scan on (athlete_id) then a rowid lookup
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_relay_legs_athlete ON relay_legs(athlete_id, relay_id)')
+
+    # Readers that want the old flat row shape (team, event, season, ...) select from this view.
+    # Recreated every time so schema changes reach existing databases.
+    conn.execute('DROP VIEW IF EXISTS performance_details')
+    conn.execute('''
+        CREATE VIEW performance_details AS
+        SELECT performances.id, performances.athlete_id,
+               events.name AS event, performances.mark, performances.place,
+               teams.name AS team, performances.date,
+               seasons.season AS season, seasons.year AS year,
+               meets.name AS meet_name, COALESCE(meets.url, '') AS meet_url, performances.splits,
+               performances.event_id, performances.team_id,
+               performances.season_id, performances.meet_id
+        FROM performances
+        LEFT JOIN events ON events.id = performances.event_id
+        LEFT JOIN teams ON teams.id = performances.team_id
+        LEFT JOIN seasons ON seasons.id = performances.season_id
+        LEFT JOIN meets ON meets.id = performances.meet_id
+    ''')
+
+    create_change_tracking(conn)
+    create_change_log(conn)
+    create_search_index(conn)
+    conn.commit()
+
+# Change tracking for the incremental export.
+# data_version is a counter bumped by every write to performances or relay_legs; the
+# (team, season) shard the row belongs to records the counter value in shard_versions.
+# export_for_web compares those with the versions in the last manifest and only
+# rebuilds shards that moved. NULL team/season ids are stored as 0.
+SHARD_BUMP = '''
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+    INSERT INTO shard_versions (team_id, season_id, version)
+    SELECT COALESCE({row}.team_id, 0), COALESCE({row}.season_id, 0), version FROM data_version WHERE id = 1
+    ON CONFLICT (team_id, season_id) DO UPDATE SET version = excluded.version;
+'''
+
+RELAY_SHARD_BUMP = '''
+    UPDATE data_version SET version = version + 1 WHERE id = 1;
+    INSERT INTO shard_versions (team_id, season_id, version)
+    SELECT COALESCE(performances.team_id, 0), COALESCE(performances.season_id, 0), data_version.version
+    FROM relays JOIN performances ON performances.id = relays.performance_id, data_version
+    WHERE relays.id = {row}.relay_id AND data_version.id = 1
+    ON CONFLICT (team_id, season_id) DO UPDATE SET version = excluded.version;
+'''
+
+def create_change_tracking(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS shard_versions (
+            team_id INTEGER NOT NULL,
+            season_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (team_id, season_id)
+        )
+    ''')
+    triggers = {
+        'trg_perf_insert': ('AFTER INSERT ON performances', SHARD_BUMP.format(row='NEW')),
+        'trg_perf_delete': ('AFTER DELETE ON performances', SHARD_BUMP.format(row='OLD')),
+        'trg_perf_update': ('AFTER UPDATE ON performances',
+                            SHARD_BUMP.format(row='OLD') + SHARD_BUMP.format(row='NEW')),
+        'trg_legs_insert': ('AFTER INSERT ON relay_legs', RELAY_SHARD_BUMP.format(row='NEW')),
+        'trg_legs_delete': ('BEFORE DELETE ON relay_legs', RELAY_SHARD_BUMP.format(row='OLD')),
+        'trg_legs_update': ('AFTER UPDATE ON relay_legs', RELAY_SHARD_BUMP.format(row='NEW')),
+    }
+    for name, (when, body) in triggers.items():
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {when} BEGIN {body} END')
+
+# Change log for incremental clients (GET /changes).
+# Every insert, update and delete of a performance or an athlete appends (entity, entity_id,
+# op) under a new seq; a relay leg change logs an update of its performance. seq is
+# AUTOINCREMENT, so it never goes back or gets reused. change_log_info.epoch is new whenever
+# the log starts over (a new or wiped database). A client holding a version from another
+# epoch, or one older than what prune_change_log removed, has to reload everything.
+CHANGE_LOG_KEEP = 500000
+CHANGES_PAGE = 5000
+LOG_CHANGE = "INSERT INTO change_log (entity, entity_id, op) VALUES ('{entity}', {row}.id, '{op}');"
+LOG_RELAY_CHANGE = '''
+    INSERT INTO change_log (entity, entity_id, op)
+    SELECT 'performance', relays.performance_id, 'update' FROM relays WHERE relays.id = {row}.relay_id;
+'''
+
+def create_change_log(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log_info (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            epoch TEXT NOT NULL,
+            pruned_through INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO change_log_info (id, epoch) VALUES (1, lower(hex(randomblob(8))))")
+    triggers = {}
+    for table, entity in (('performances', 'performance'), ('athletes', 'athlete')):
+        triggers[f'trg_log_{table}_insert'] = (f'AFTER INSERT ON {table}', LOG_CHANGE.format(entity=entity, row='NEW', op='insert'))
+        triggers[f'trg_log_{table}_update'] = (f'AFTER UPDATE ON {table}', LOG_CHANGE.format(entity=entity, row='NEW', op='update'))
+        triggers[f'trg_log_{table}_delete'] = (f'AFTER DELETE ON {table}', LOG_CHANGE.format(entity=entity, row='OLD', op='delete'))
+    triggers['trg_log_legs_insert'] = ('AFTER INSERT ON relay_legs', LOG_RELAY_CHANGE.format(row='NEW'))
+    triggers['trg_log_legs_update'] = ('AFTER UPDATE ON relay_legs', LOG_RELAY_CHANGE.format(row='NEW'))
+    # BEFORE, so the relay row is still there to say which performance it was
+    triggers['trg_log_legs_delete'] = ('BEFORE DELETE ON relay_legs', LOG_RELAY_CHANGE.format(row='OLD'))
+    for name, (when, body) in triggers.items():
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {when} BEGIN {body} END')
+
+def prune_change_log(conn, keep=CHANGE_LOG_KEEP):
+    """Drops all but the newest `keep` entries. Returns how many were removed."""
+    latest = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+    cutoff = latest - keep
+    if cutoff <= 0:
+        return 0
+    removed = conn.execute('DELETE FROM change_log WHERE seq <= ?', (cutoff,)).rowcount
+    if removed:
+        conn.execute('UPDATE change_log_info SET pruned_through = MAX(pruned_through, ?) WHERE id = 1', (cutoff,))
+    return removed
+
+def changes_since(conn, since=0, epoch=None, limit=CHANGES_PAGE):
+    """
+    The performances and athletes changed after version `since`, as they are now. Rows that
+    still exist are "upserted" (in the /performances and /athletes shapes); the rest are
+    "deleted" (ids). At most `limit` log entries are read per call. `version` is where the
+    next call starts, and `more` says whether one is needed. `reset` means the client's
+    version can't be continued from (another epoch, or pruned). The client should reload
+    fully, then resume from `version`.
+    """
+    result = {"epoch": None, "version": 0, "latest": 0, "more": False, "reset": True,
+              "performances": {"upserted": [], "deleted": []}, "athletes": {"upserted": [], "deleted": []}}
+    # Databases from before the log get it at the next sync; until then every client reloads
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log_info'").fetchone():
+        return result
+    current_epoch, pruned_through = conn.execute(
+        'SELECT epoch, pruned_through FROM change_log_info WHERE id = 1').fetchone()
+    latest = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+    result.update(epoch=current_epoch, version=latest, latest=latest, reset=False)
+    if (epoch and epoch != current_epoch) or since < pruned_through or since > latest:
+        result["reset"] = True
+        return result
+
+    entries = conn.execute(queries.CHANGES_QUERY, (since, limit)).fetchall()
+    changed = {"performance": {}, "athlete": {}}  # entity -> ids in log order (dict as ordered set)
+    for seq, entity, entity_id, op in entries:
+        changed.setdefault(entity, {})[entity_id] = None
+    if entries:
+        result["version"] = entries[-1][0]
+        result["more"] = result["version"] < latest
+
+    for entity, key, ids_query in (("performance", "performances", queries.performances_by_id_query),
+                                   ("athlete", "athletes", queries.athletes_by_id_query)):
+        ids = list(changed[entity])
+        found = {}
+        # Chunk to stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            cursor = conn.execute(*ids_query(ids[start:start + 500]))
+            columns = [c[0] for c in cursor.description]
+            for row in cursor.fetchall():
+                found[row[0]] = dict(zip(columns, row))
+        result[key]["upserted"] = [found[i] for i in ids if i in found]
+        result[key]["deleted"] = [i for i in ids if i not in found]
+    attach_relay_legs(conn, result["performances"]["upserted"])
+    return result
+
+def data_version(conn):
+    row = conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()
+    return row[0] if row else 0
+
+def data_epoch(conn):
+    """Identifies this database's history: a wipe or a rebuild from empty gets a new one, and
+    the version counters start over with it. None on databases without the change log."""
+    try:
+        row = conn.execute('SELECT epoch FROM change_log_info WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+def shard_versions(conn):
+    """{(team_id, season_id): version}; ids are 0 where the row has NULL."""
+    return {(t, s): v for t, s, v in conn.execute('SELECT team_id, season_id, version FROM shard_versions')}
+
+def add_missing_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()}
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {decl}')
+
+def is_legacy_schema(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(performances)').fetchall()]
+    return 'team' in columns
+
+def read_only_uri(path):
+    """SQLite URI that opens path read-only (connect with uri=True, or ATTACH it)."""
+    path = os.path.abspath(path).replace(os.sep, '/')
+    if not path.startswith('/'):
+        path = '/' + path  # file:/C:/... on Windows
+    return f"file:{quote(path, safe='/:')}?mode=ro"
+
+# What the exporters read. They open the DB read-only, and only staged writers may migrate it
+EXPORT_TABLES = ("athletes", "teams", "meets", "events", "seasons", "performances", "relays", "relay_legs",
+                 "data_version", "shard_versions", "change_log_info")
+
+def require_current_schema(conn, db_path):
+    """Raises RuntimeError if the DB needs create_schema's migrations before it can be read."""
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    missing = [t for t in EXPORT_TABLES if t not in tables]
+    if missing or is_legacy_schema(conn):
+        problem = f"is missing {', '.join(missing)}" if missing else "has the legacy text-column schema"
+        raise RuntimeError(f"{db_path} {problem}. Migrate it first with an update scrape "
+                           "(python backend/run_update.py) or python backend/resync_db.py.")
+
+def split_season(season, year=None):
+    """'2025 Indoor' -> ('2025', 'Indoor'); ('Indoor', '2025') -> ('2025', 'Indoor')."""
+    season = (season or "").strip()
+    m = re.match(r'^(\d{4})\s+(.*)$', season)
+    if m:
+        return m.group(1), m.group(2)
+    return (str(year) if year else None), (season or None)
+
+def _get_or_create(cursor, table, cache, key, values):
+    """Looks up (or inserts) a dimension row by its unique columns and returns its id."""
+    if cache is not None and key in cache:
+        return cache[key]
+    where = ' AND '.join(f'{col} IS ?' for col in values)
+    row = cursor.execute(f'SELECT id FROM {table} WHERE {where}', tuple(values.values())).fetchone()
+    if row:
+        row_id = row[0]
+    else:
+        cols = ', '.join(values)
+        placeholders = ', '.join('?' * len(values))
+        cursor.execute(f'INSERT INTO {table} ({cols}) VALUES ({placeholders})', tuple(values.values()))
+        row_id = cursor.lastrowid
+    if cache is not None:
+        cache[key] = row_id
+    return row_id
+
+def get_or_create_team(cursor, name, cache=None):
+    return _get_or_create(cursor, 'teams', cache, name, {"name": name})
+
+def get_or_create_season(cursor, year, season, cache=None):
+    return _get_or_create(cursor, 'seasons', cache, (year, season), {"year": year, "season": season})
+
+def get_or_create_event(cursor, name, cache=None):
+    if cache is not None and name in cache:
+        return cache[name]
+    row = cursor.execute('SELECT id FROM events WHERE name = ?', (name,)).fetchone()
+    if row:
+        event_id = row[0]
+    else:
+        gender = name.split(' ', 1)[0] if name.split(' ', 1)[0] in ("Boys", "Girls", "Men", "Women") else None
+        cursor.execute('INSERT INTO events (name, gender, is_relay) VALUES (?, ?, ?)',
+                       (name, gender, int(is_relay_event(name))))
+        event_id = cursor.lastrowid
+    if cache is not None:
+        cache[name] = event_id
+    return event_id
+
+def get_or_create_meet(cursor, name, date=None, url=None, date_source=None, date_confidence=None):
+    """
+    Returns the meet id, filling in date/url on an existing row when they were unknown.
+    A date_source (from meet_dates.MeetDateResolver) replaces the stored resolution.
+    """
+    row = cursor.execute('SELECT id, date, url, date_source FROM meets WHERE name = ?', (name,)).fetchone()
+    if not row:
+        cursor.execute('''
+            INSERT INTO meets (name, date, url, date_source, date_confidence) VALUES (?, ?, ?, ?, ?)
+        ''', (name, date, url, date_source, date_confidence))
+        return cursor.lastrowid
+    meet_id, old_date, old_url, old_source = row[0], row[1], row[2], row[3]
+    if (date and date != old_date) or (url and url != old_url) or (date_source and date_source != old_source):
+        cursor.execute('''
+            UPDATE meets SET date = COALESCE(?, date), url = COALESCE(?, url),
+                             date_source = COALESCE(?, date_source),
+                             date_confidence = COALESCE(?, date_confidence)
+            WHERE id = ?
+        ''', (date or None, url or None, date_source, date_confidence, meet_id))
+    return meet_id
+
+def lookup_id(conn, table, **values):
+    """Resolves a filter value to its dimension id (None if it doesn't exist)."""
+    where = ' AND '.join(f'{col} = ?' for col in values)
+    row = conn.execute(f'SELECT id FROM {table} WHERE {where}', tuple(values.values())).fetchone()
+    return row[0] if row else None
+
+def lookup_season_ids(conn, year=None, season=None):
+    """Season ids matching an optional year and/or season type ('Indoor', 'Outdoor')."""
+    query = 'SELECT id FROM seasons WHERE 1=1'
+    params = []
+    if year:
+        query += ' AND year = ?'
+        params.append(year)
+    if season:
+        query += ' AND season = ?'
+        params.append(season)
+    return [row[0] for row in conn.execute(query, params).fetchall()]
+
+def migrate_to_dimensions(conn):
+    """
+    Rebuilds a legacy performances table (text team/event/meet_name/season/year columns)
+    into integer foreign keys on the dimension tables, then VACUUMs to reclaim the space.
+    Performance ids are preserved so relays keep pointing at the right rows.
+    """
+    cursor = conn.cursor()
+    total = cursor.execute('SELECT COUNT(*) FROM performances').fetchone()[0]
+    print(f"Migrating {total} performances to dimension tables...")
+
+    cursor.execute('''
+        CREATE TABLE performances_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            athlete_id INTEGER,
+            event_id INTEGER,
+            mark TEXT,
+            place TEXT,
+            team_id INTEGER,
+            date TEXT,
+            season_id INTEGER,
+            meet_id INTEGER,
+            splits TEXT,
+            FOREIGN KEY(athlete_id) REFERENCES athletes(id),
+            FOREIGN KEY(event_id) REFERENCES events(id),
+            FOREIGN KEY(team_id) REFERENCES teams(id),
+            FOREIGN KEY(season_id) REFERENCES seasons(id),
+            FOREIGN KEY(meet_id) REFERENCES meets(id)
+        )
+    ''')
+
+    # Meets take the earliest performance date and any known URL
+    meet_ids = {}
+    for name, date, url in cursor.execute('''
+        SELECT meet_name, MIN(substr(date, 1, 10)), MAX(meet_url)
+        FROM performances GROUP BY meet_name
+    ''').fetchall():
+        meet_ids[name] = get_or_create_meet(cursor, name, date or "Unknown", url or None)
+
+    team_cache, event_cache, season_cache = {}, {}, {}
+    rows = cursor.execute('''
+        SELECT id, athlete_id, event, mark, place, team, date, season, year, meet_name, splits
+        FROM performances
+    ''').fetchall()
+    converted = []
+    for perf_id, athlete_id, event, mark, place, team, date, season, year, meet_name, splits in rows:
+        season_year, season_type = split_season(season, year)
+        converted.append((
+            perf_id, athlete_id,
+            get_or_create_event(cursor, event or "", event_cache),
+            mark, place,
+            get_or_create_team(cursor, team or "Unknown", team_cache),
+            date,
+            get_or_create_season(cursor, season_year, season_type, season_cache),
+            meet_ids.get(meet_name),
+            splits
+        ))
+    cursor.executemany('''
+        INSERT INTO performances_v2
+        (id, athlete_id, event_id, mark, place, team_id, date, season_id, meet_id, splits)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', converted)
+
+    cursor.execute('DROP TABLE performances')
+    cursor.execute('ALTER TABLE performances_v2 RENAME TO performances')
+
+    # Relays no longer duplicate the team; it comes from the performance
+    relay_columns = [row[1] for row in cursor.execute('PRAGMA table_info(relays)').fetchall()]
+    if 'team' in relay_columns:
+        cursor.execute('''
+            CREATE TABLE relays_v2 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                performance_id INTEGER NOT NULL UNIQUE,
+                FOREIGN KEY(performance_id) REFERENCES performances(id) ON DELETE CASCADE
+            )
+        ''')
+        cursor.execute('INSERT INTO relays_v2 (id, performance_id) SELECT id, performance_id FROM relays')
+        cursor.execute('DROP TABLE relays')
+        cursor.execute('ALTER TABLE relays_v2 RENAME TO relays')
+
+    conn.commit()
+    conn.execute('VACUUM')
+    return total
+
+def is_relay_event(event):
+    ev = (event or "").lower()
+    return "relay" in ev or "4x" in ev
+
+def parse_split_seconds(split):
+    """'1:11.703' -> 71.703. Returns None for anything that isn't a time."""
+    try:
+        parts = str(split).split(':')
+        total = 0.0
+        for p in parts:
+            total = total * 60 + float(p)
+        return total
+    except (TypeError, ValueError):
+        return None
+
+BAD_MARKS = ('DNF', 'DNS', 'DQ', 'NH', 'ND', 'SCR', 'FOUL', 'X')
+_LEADING_FLOAT = re.compile(r'^\s*[+-]?(\d+\.?\d*|\.\d+)')
+
+def _js_float(text):
+    """parseFloat semantics: leading number or None."""
+    m = _LEADING_FLOAT.match(text)
+    return float(m.group(0)) if m else None
+
+def parse_mark(mark):
+    """
+    Numeric value of a mark, mirroring parseMark in ui/src/utils.js.
+    Returns (value, is_time): seconds for times, inches for distances, or None for DNF/DQ/etc.
+    """
+    if not mark:
+        return None
+    s = str(mark).upper().strip()
+    if any(s == b or s.startswith(b) for b in BAD_MARKS):
+        return None
+
+    if any(c in s for c in "'\"-") and re.search(r'\d', s):
+        feet = re.match(r"^(\d+)['\-]", s) or re.search(r"(\d+)'", s)
+        inches = re.search(r"['\-\s](\d+(\.\d+)?)", s) or re.search(r'(\d+(\.\d+)?)?"', s)
+        total = 0.0
+        if feet:
+            total += int(feet.group(1)) * 12
+        if inches and inches.group(1):
+            total += float(inches.group(1))
+        return total, False
+
+    total = 0.0
+    for part, scale in zip(reversed(s.split(':')), (1, 60, 3600)):
+        if part:
+            value = _js_float(part)
+            if value is None:
+                return None
+            total += value * scale
+    if total == 0:
+        return None
+    return total, True
+
+def mark_value(mark):
+    """parse_mark value rounded for storage/export (float noise like 71.69999... bloats payloads)."""
+    parsed = parse_mark(mark)
+    return round(parsed[0], 3) if parsed else None
+
+def format_split_seconds(seconds):
+    if seconds >= 60:
+        m = int(seconds // 60)
+        return f"{m}:{seconds - m * 60:06.3f}"
+    return f"{seconds:.3f}"
+
+def leg_splits(splits, leg_count):
+    """
+    Distributes a relay's lap splits across its legs.
+    Sub5 lists one split per lap, so a 4x400 timed every 200m has 8 splits for 4 legs.
+    Returns a list of per-leg split strings (or Nones when the laps don't divide evenly).
+    """
+    if not splits or not leg_count or len(splits) % leg_count != 0:
+        return [None] * leg_count
+    laps_per_leg = len(splits) // leg_count
+    if laps_per_leg == 1:
+        return list(splits)
+
+    result = []
+    for leg in range(leg_count):
+        chunk = [parse_split_seconds(s) for s in splits[leg * laps_per_leg:(leg + 1) * laps_per_leg]]
+        if any(c is None for c in chunk):
+            result.append(None)
+        else:
+            result.append(format_split_seconds(sum(chunk)))
+    return result
+
+def load_athlete_cache(cursor):
+    """{name: id} for every athlete, plus merged-away names pointing at the kept athlete."""
+    cache = dict(cursor.execute('SELECT alias, athlete_id FROM athlete_aliases').fetchall())
+    cache.update(cursor.execute('SELECT name, id FROM athletes').fetchall())
+    return cache
+
+def get_or_create_athlete(cursor, name, athlete_cache=None):
+    if athlete_cache is not None and name in athlete_cache:
+        return athlete_cache[name]
+    row = cursor.execute('SELECT id FROM athletes WHERE name = ?', (name,)).fetchone()
+    if not row:
+        row = cursor.execute('SELECT athlete_id FROM athlete_aliases WHERE alias = ?', (name,)).fetchone()
+    if row:
+        athlete_id = row[0]
+    else:
+        cursor.execute('INSERT INTO athletes (name) VALUES (?)', (name,))
+        athlete_id = cursor.lastrowid
+    if athlete_cache is not None:
+        athlete_cache[name] = athlete_id
+    return athlete_id
+
+def insert_relay(cursor, performance_id, runners, splits, athlete_cache=None):
+    """Records relay membership for an already-inserted relay performance."""
+    cursor.execute('INSERT INTO relays (performance_id) VALUES (?)', (performance_id,))
+    relay_id = cursor.lastrowid
+    per_leg = leg_splits(splits, len(runners))
+    for leg, runner in enumerate(runners):
+        athlete_id = get_or_create_athlete(cursor, runner, athlete_cache)
+        cursor.execute('''
+            INSERT INTO relay_legs (relay_id, leg, athlete_id, split)
+            VALUES (?, ?, ?, ?)
+        ''', (relay_id, leg + 1, athlete_id, per_leg[leg]))
+    return relay_id
+
+def delete_meet_performances(conn, meet_ids):
+    """Removes every result (and relay legs) of the given meets so they can be re-synced.
+    Returns the athletes that had results there."""
+    meet_ids = list(meet_ids)
+    athletes = set()
+    for start in range(0, len(meet_ids), 500):
+        chunk = meet_ids[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        perf_filter = f'SELECT id FROM performances WHERE meet_id IN ({marks})'
+        relay_filter = f'SELECT id FROM relays WHERE performance_id IN ({perf_filter})'
+        athletes.update(r[0] for r in conn.execute(
+            f'SELECT athlete_id FROM performances WHERE meet_id IN ({marks}) AND athlete_id IS NOT NULL', chunk))
+        athletes.update(r[0] for r in conn.execute(
+            f'SELECT athlete_id FROM relay_legs WHERE relay_id IN ({relay_filter})', chunk))
+        conn.execute(f'DELETE FROM relay_legs WHERE relay_id IN ({relay_filter})', chunk)
+        conn.execute(f'DELETE FROM relays WHERE performance_id IN ({perf_filter})', chunk)
+        conn.execute(f'DELETE FROM performances WHERE meet_id IN ({marks})', chunk)
+    return athletes
+
+def delete_orphan_athletes(conn, athlete_ids):
+    """Deletes the given athletes if nothing references them any more."""
+    deleted = []
+    for athlete_id in athlete_ids:
+        used = conn.execute('''
+            SELECT EXISTS (SELECT 1 FROM performances WHERE athlete_id = ?)
+                OR EXISTS (SELECT 1 FROM relay_legs WHERE athlete_id = ?)
+                OR EXISTS (SELECT 1 FROM athlete_aliases WHERE athlete_id = ?)
+        ''', (athlete_id, athlete_id, athlete_id)).fetchone()[0]
+        if not used:
+            conn.execute('DELETE FROM athletes WHERE id = ?', (athlete_id,))
+            if has_search_index(conn):
+                conn.execute('DELETE FROM search_index WHERE rowid = ?', (_search_rowid("athlete", athlete_id),))
+            deleted.append(athlete_id)
+    return deleted
+
+def migrate_relay_athletes(conn):
+    """
+    Converts legacy relay rows, stored against a fake athlete named
+    "A, B, C, D" or "{school} Relay", into relays / relay_legs.
+    Only needed for legacy (text column) databases, before migrate_to_dimensions.
+    """
+    cursor = conn.cursor()
+    legacy = cursor.execute('''
+        SELECT performances.id, performances.splits,
+               athletes.id AS fake_id, athletes.name
+        FROM performances
+        JOIN athletes ON performances.athlete_id = athletes.id
+        WHERE (performances.event LIKE '%Relay%' OR performances.event LIKE '%4x%')
+          AND performances.id NOT IN (SELECT performance_id FROM relays)
+    ''').fetchall()
+    if not legacy:
+        return 0
+
+    print(f"Migrating {len(legacy)} legacy relay rows to relay_legs...")
+    fake_ids = set()
+    for perf_id, splits_json, fake_id, name in legacy:
+        if name.endswith(" Relay") and "," not in name:
+            runners = []
+        else:
+            runners = [n.strip() for n in name.split(',') if n.strip()]
+        try:
+            splits = json.loads(splits_json) if splits_json else []
+        except ValueError:
+            splits = []
+
+        insert_relay(cursor, perf_id, runners, splits)
+        cursor.execute('UPDATE performances SET athlete_id = NULL WHERE id = ?', (perf_id,))
+        fake_ids.add(fake_id)
+
+    # Drop the placeholder athletes once nothing references them
+    for fake_id in fake_ids:
+        cursor.execute('''
+            DELETE FROM athletes WHERE id = ?
+              AND NOT EXISTS (SELECT 1 FROM performances WHERE athlete_id = ?)
+              AND NOT EXISTS (SELECT 1 FROM relay_legs WHERE athlete_id = ?)
+        ''', (fake_id, fake_id, fake_id))
+    return len(legacy)
+
+def attach_relay_legs(conn, performances):
+    """
+    Adds `relay_legs` to relay performance dicts and fills in a display `athlete_name`
+    ("A, B, C, D" or "{team} Relay") so older clients keep working.
+    """
+    relay_rows = [p for p in performances if p.get('athlete_id') is None]
+    if not relay_rows:
+        return performances
+
+    legs_by_perf = {}
+    ids = [p['id'] for p in relay_rows]
+    # Chunk to stay under SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        query, params = queries.relay_legs_query(chunk)
+        rows = conn.execute(query, params).fetchall()
+        for perf_id, leg, athlete_id, split, name in rows:
+            legs_by_perf.setdefault(perf_id, []).append({
+                "leg": leg, "athlete_id": athlete_id, "athlete_name": name, "split": split
+            })
+
+    for p in relay_rows:
+        legs = legs_by_perf.get(p['id'], [])
+        p['relay_legs'] = legs
+        if legs:
+            p['athlete_name'] = ", ".join(l['athlete_name'] for l in legs)
+        else:
+            p['athlete_name'] = f"{p.get('team') or 'Unknown'} Relay"
+    return performances
+
+# --- Typeahead search (FTS5) ---
+# One row per athlete, team and meet. The rowid encodes kind and id so a single
+# entity can be replaced without scanning the index.
+SEARCH_KINDS = {"athlete": 0, "team": 1, "meet": 2}
+
+def _search_rowid(kind, ref_id):
+    return ref_id * 4 + SEARCH_KINDS[kind]
+
+def has_search_index(conn):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'").fetchone()
+    return row is not None
+
+def create_search_index(conn):
+    """Creates the FTS5 table and fills it the first time. No-op if FTS5 isn't compiled in."""
+    existed = has_search_index(conn)
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                kind UNINDEXED, ref_id UNINDEXED, label, detail,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"[WARN] FTS5 unavailable, /search disabled: {e}")
+        return
+    # Names weigh 10x the detail column. Stored as the table's default rank so
+    # ORDER BY rank is served by FTS5 itself instead of a temp B-tree sort.
+    conn.execute("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(0.0, 0.0, 10.0, 1.0)')")
+    if not existed:
+        refresh_search_index(conn)
+
+def _athlete_teams(conn, athlete_ids=None):
+    """{athlete_id: [team names]} from individual results and relay legs."""
+    params = []
+    perf_filter = 'performances.athlete_id IS NOT NULL'
+    leg_filter = '1=1'
+    if athlete_ids is not None:
+        placeholders = ','.join('?' * len(athlete_ids))
+        perf_filter = f'performances.athlete_id IN ({placeholders})'
+        leg_filter = f'relay_legs.athlete_id IN ({placeholders})'
+        params = list(athlete_ids) * 2
+    rows = conn.execute(f'''
+        SELECT performances.athlete_id, teams.name FROM performances
+        JOIN teams ON teams.id = performances.team_id
+        WHERE {perf_filter}
+        UNION
+        SELECT relay_legs.athlete_id, teams.name FROM relay_legs
+        JOIN relays ON relays.id = relay_legs.relay_id
+        JOIN performances ON performances.id = relays.performance_id
+        JOIN teams ON teams.id = performances.team_id
+        WHERE {leg_filter}
+    ''', params).fetchall()
+    result = {}
+    for athlete_id, team in rows:
+        result.setdefault(athlete_id, []).append(team)
+    return result
+
+def refresh_search_index(conn, athlete_ids=None, team_ids=None, meet_ids=None):
+    """
+    Rebuilds search rows. With no ids everything is rebuilt; otherwise only the given
+    athletes, teams and meets are replaced (what sync_json_to_db touched).
+    """
+    if not has_search_index(conn):
+        return
+    full = athlete_ids is None and team_ids is None and meet_ids is None
+    if full:
+        conn.execute('DELETE FROM search_index')
+
+    def replace(kind, rows):
+        rows = list(rows)
+        if not full:
+            conn.executemany('DELETE FROM search_index WHERE rowid = ?',
+                             [(_search_rowid(kind, r[0]),) for r in rows])
+        conn.executemany(
+            'INSERT INTO search_index (rowid, kind, ref_id, label, detail) VALUES (?, ?, ?, ?, ?)',
+            [(_search_rowid(kind, ref_id), kind, ref_id, label, detail or '') for ref_id, label, detail in rows]
+        )
+
+    def select(table, columns, ids):
+        if ids is None:
+            return conn.execute(f'SELECT {columns} FROM {table}').fetchall() if full else []
+        ids = list(ids)
+        found = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            found.extend(conn.execute(
+                f'SELECT {columns} FROM {table} WHERE id IN ({",".join("?" * len(chunk))})', chunk
+            ).fetchall())
+        return found
+
+    athletes = select('athletes', 'id, name', athlete_ids)
+    if athletes:
+        if full:
+            teams_by_athlete = _athlete_teams(conn)
+        else:
+            teams_by_athlete = {}
+            ids = [a[0] for a in athletes]
+            for start in range(0, len(ids), 400):
+                teams_by_athlete.update(_athlete_teams(conn, ids[start:start + 400]))
+        replace("athlete", ((a_id, name, ", ".join(sorted(teams_by_athlete.get(a_id, []))))
+                            for a_id, name in athletes))
+    replace("team", ((t_id, name, None) for t_id, name in select('teams', 'id, name', team_ids)))
+    replace("meet", select('meets', 'id, name, date', meet_ids))
+
+def build_match_query(text):
+    """'ben bal' -> '"ben"* "bal"*' (every word must match as a prefix)."""
+    tokens = re.findall(r'\w+', text or '', re.UNICODE)
+    return ' '.join(f'"{t}"*' for t in tokens)
+
+def search(conn, text, limit=10):
+    match = build_match_query(text)
+    if not match:
+        return []
+    rows = conn.execute(queries.SEARCH_QUERY, (match, limit)).fetchall()
+    return [{"kind": kind, "id": ref_id, "name": label, "detail": detail} for kind, ref_id, label, detail in rows]
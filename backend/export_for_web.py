@@ -1,47 +1,418 @@
 import sqlite3
 import json
 import os
+import sys
+import gzip
+import hashlib
+import tempfile
+try:
+    from backend.database import require_current_schema, read_only_uri, data_epoch, data_version, shard_versions, parse_mark, mark_value
+    from backend.snapshot import build_snapshot, remove_stale_snapshots
+    from backend.run_report import RunReport, print_summary
+    from backend import queries
+    from backend.queries import EXPORT_SHARD_QUERY, EXPORT_SHARDS_QUERY
+except ImportError:
+    from database import require_current_schema, read_only_uri, data_epoch, data_version, shard_versions, parse_mark, mark_value
+    from snapshot import build_snapshot, remove_stale_snapshots
+    from run_report import RunReport, print_summary
+    import queries
+    from queries import EXPORT_SHARD_QUERY, EXPORT_SHARDS_QUERY
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-def export_data():
+# Static export for the dashboard (see EXPORT_SCHEMA.md):
+#   ui/public/data/manifest.json               dictionaries (teams, seasons, events, meets,
+#                                              athletes) and the shard list
+#   ui/public/data/shards/{team}-{season}.{hash}.json   one team's results for one season,
+#                                              stored column by column
+# The UI fetches the manifest, then only the shards of the team being viewed.
+# Shard names carry a hash of their content, so they can be cached forever.
+# Shards refer to dictionary entries by id; ui/src/data.js decodeShard turns them
+# back into the row objects GET /performances returns.
+# Every file also gets .gz and .br siblings at maximum compression, so a static host can
+# serve them as they are; size_report.json compares raw and compressed bytes.
+#   ui/public/data/snapshot.{hash}.db          read-only SQLite copy for WASM clients (snapshot.py)
+
+FORMAT = 2
+BATCH_SIZE = 500              # rows fetched (and relay legs looked up) at a time
+SPOOL_BYTES = 1024 * 1024     # a column is held in memory up to this size, then spills to disk
+CHUNK_SIZE = 64 * 1024
+PROGRESS_EVERY = 5000
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+SIZE_REPORT = 'size_report.json'
+
+COLUMNS = ("id", "athlete_id", "event_id", "meet_id", "date",
+           "mark", "mark_value", "place", "splits", "relay_legs")
+
+def shard_name(team_id, season_id, digest):
+    return f"shards/{team_id or 0}-{season_id or 0}.{digest[:12]}.json"
+
+def encode(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def parse_splits(splits):
+    if not splits:
+        return []
+    try:
+        return json.loads(splits)
+    except:
+        return []
+
+def relay_legs_by_performance(conn, performance_ids):
+    """{performance_id: [[athlete_id, split], ...]} in leg order."""
+    legs = {}
+    for start in range(0, len(performance_ids), 500):
+        query, params = queries.relay_legs_query(performance_ids[start:start + 500])
+        for perf_id, leg, athlete_id, split, _ in conn.execute(query, params):
+            legs.setdefault(perf_id, []).append([athlete_id, split])
+    return legs
+
+class HashingWriter:
+    """Writes to path + '.tmp' and hashes the bytes on the way; finish() moves it into place."""
+    def __init__(self, path):
+        self.tmp_path = path + '.tmp'
+        self.file = open(self.tmp_path, 'wb')
+        self.sha = hashlib.sha256()
+
+    def write(self, data):
+        self.file.write(data)
+        self.sha.update(data)
+
+    def copy_from(self, source):
+        source.seek(0)
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            self.write(chunk)
+
+    def close(self):
+        self.file.close()
+        return self.sha.hexdigest()
+
+    def finish(self, path):
+        os.replace(self.tmp_path, path)
+
+    def discard(self):
+        os.remove(self.tmp_path)
+
+def write_array(out, items):
+    out.write(b'[')
+    for i, item in enumerate(items):
+        out.write(b',' + encode(item) if i else encode(item))
+    out.write(b']')
+
+class Progress:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.reported = 0
+
+    def advance(self, count):
+        self.done += count
+        if self.done - self.reported >= PROGRESS_EVERY or (self.done >= self.total and self.reported < self.done):
+            print(f"  Exported {self.done}/{self.total} records...")
+            self.reported = self.done
+
+def write_shard(conn, output_dir, team_id, season_id, progress):
+    """
+    Streams one team-season to shards/ and returns (file, count).
+    Rows are read BATCH_SIZE at a time; each column is appended to its own spool, and the
+    spools are concatenated once the row count and date dictionary are known. The shard's
+    bytes are the same as json-encoding the whole columnar object at once.
+    """
+    spools = {name: tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) for name in COLUMNS}
+    dates = []
+    date_index = {}
+    count = 0
+    try:
+        cursor = conn.execute(EXPORT_SHARD_QUERY, (team_id, season_id))
+        while True:
+            batch = cursor.fetchmany(BATCH_SIZE)
+            if not batch:
+                break
+            relay_ids = [r['id'] for r in batch if r['athlete_id'] is None]
+            legs = relay_legs_by_performance(conn, relay_ids) if relay_ids else {}
+            for r in batch:
+                if r['date'] not in date_index:
+                    date_index[r['date']] = len(dates)
+                    dates.append(r['date'])
+                values = (r['id'], r['athlete_id'], r['event_id'], r['meet_id'], date_index[r['date']],
+                          r['mark'], mark_value(r['mark']), r['place'], parse_splits(r['splits']),
+                          legs.get(r['id'], []) if r['athlete_id'] is None else None)
+                for name, value in zip(COLUMNS, values):
+                    spools[name].write(b',' + encode(value) if count else encode(value))
+                count += 1
+            progress.advance(len(batch))
+
+        header = {"format": FORMAT, "team_id": team_id, "season_id": season_id, "count": count, "dates": dates}
+        out = HashingWriter(os.path.join(output_dir, 'shards', f"{team_id or 0}-{season_id or 0}"))
+        out.write(encode(header)[:-1] + b',"columns":{')
+        for i, name in enumerate(COLUMNS):
+            out.write((b',' if i else b'') + encode(name) + b':[')
+            out.copy_from(spools[name])
+            out.write(b']')
+        out.write(b'}}')
+        name = shard_name(team_id, season_id, out.close())
+        out.finish(os.path.join(output_dir, name))
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return name, count
+
+def event_directions(conn):
+    """{event_id: True if a lower mark is better}, from the first mark that parses."""
+    remaining = conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+    directions = {}
+    for event_id, mark in conn.execute('SELECT event_id, mark FROM performances'):
+        if event_id not in directions:
+            parsed = parse_mark(mark)
+            if parsed:
+                directions[event_id] = parsed[1]
+                remaining -= 1
+                if remaining <= 0:
+                    break
+    return directions
+
+def manifest_athletes(conn):
+    """Yields {"id", "name", "teams"} per athlete, grouped from a cursor sorted by athlete."""
+    entry = None
+    for athlete_id, name, team_id in conn.execute('''
+        SELECT athletes.id, athletes.name, performances.team_id FROM athletes
+        JOIN performances ON performances.athlete_id = athletes.id
+        UNION
+        SELECT athletes.id, athletes.name, performances.team_id FROM athletes
+        JOIN relay_legs ON relay_legs.athlete_id = athletes.id
+        JOIN relays ON relays.id = relay_legs.relay_id
+        JOIN performances ON performances.id = relays.performance_id
+        ORDER BY 1, 3
+    '''):
+        if entry is None or entry["id"] != athlete_id:
+            if entry is not None:
+                yield entry
+            entry = {"id": athlete_id, "name": name, "teams": []}
+        if team_id is not None:
+            entry["teams"].append(team_id)
+    if entry is not None:
+        yield entry
+
+def write_manifest(conn, out, shards, snapshot, db_version, db_epoch):
+    """Streams the manifest section by section (see EXPORT_SCHEMA.md)."""
+    directions = event_directions(conn)
+    sections = (
+        ("teams", ({"id": r[0], "name": r[1]} for r in conn.execute('SELECT id, name FROM teams ORDER BY id'))),
+        ("seasons", ({"id": r[0], "year": r[1], "season": r[2]}
+                     for r in conn.execute('SELECT id, year, season FROM seasons ORDER BY id'))),
+        ("events", ({"id": r[0], "name": r[1], "gender": r[2], "is_relay": bool(r[3]),
+                     "is_time": directions.get(r[0], True)}
+                    for r in conn.execute('SELECT id, name, gender, is_relay FROM events ORDER BY id'))),
+        ("meets", ({"id": r[0], "name": r[1], "date": r[2], "url": r[3] or ""}
+                   for r in conn.execute('SELECT id, name, date, url FROM meets ORDER BY id'))),
+        ("athletes", manifest_athletes(conn)),
+        ("shards", shards),
+    )
+    out.write(b'{"format":' + encode(FORMAT))
+    for key, items in sections:
+        out.write(b',' + encode(key) + b':')
+        write_array(out, items)
+    out.write(b',"snapshot":' + encode(snapshot))
+    out.write(b',"db_version":' + encode(db_version))
+    out.write(b',"db_epoch":' + encode(db_epoch) + b'}')
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+    except OSError:
+        return None
+    return sha.hexdigest()
+
+def chunks(path):
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b'')
+
+def write_gzip(path):
+    tmp_path = path + '.gz.tmp'
+    # mtime=0 and no filename: the same input always gives the same bytes
+    with open(tmp_path, 'wb') as raw, gzip.GzipFile(filename='', mode='wb', fileobj=raw,
+                                                   compresslevel=9, mtime=0) as out:
+        for chunk in chunks(path):
+            out.write(chunk)
+    os.replace(tmp_path, path + '.gz')
+
+def write_brotli(path):
+    tmp_path = path + '.br.tmp'
+    compressor = brotli.Compressor(quality=11)
+    with open(tmp_path, 'wb') as out:
+        for chunk in chunks(path):
+            out.write(compressor.process(chunk))
+        out.write(compressor.finish())
+    os.replace(tmp_path, path + '.br')
+
+def compress(path, force=False):
+    """Writes path.gz and path.br (when brotli is installed); force=False keeps existing siblings."""
+    if force or not os.path.exists(path + '.gz'):
+        write_gzip(path)
+    if brotli and (force or not os.path.exists(path + '.br')):
+        write_brotli(path)
+
+def artifact_sizes(output_dir, name):
+    path = os.path.join(output_dir, name)
+    sizes = {"file": name, "raw": os.path.getsize(path)}
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.exists(path + suffix):
+            sizes[suffix[1:]] = os.path.getsize(path + suffix)
+    return sizes
+
+def write_size_report(output_dir, names):
+    """size_report.json: raw/gz/br bytes per artifact and in total, largest first."""
+    artifacts = sorted((artifact_sizes(output_dir, name) for name in names), key=lambda a: -a["raw"])
+    totals = {}
+    for artifact in artifacts:
+        for key in ("raw", "gz", "br"):
+            if key in artifact:
+                totals[key] = totals.get(key, 0) + artifact[key]
+    report = {"totals": totals, "artifacts": artifacts}
+    with open(os.path.join(output_dir, SIZE_REPORT), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def format_sizes(sizes):
+    parts = [f"{sizes['raw'] / 1024:.1f} KB raw"]
+    for key in ("gz", "br"):
+        if key in sizes:
+            parts.append(f"{sizes[key] / 1024:.1f} KB {key} ({sizes[key] / max(sizes['raw'], 1):.0%})")
+    return ", ".join(parts)
+
+def remove_stale_shards(output_dir, keep):
+    shard_dir = os.path.join(output_dir, 'shards')
+    removed = 0
+    for filename in os.listdir(shard_dir):
+        base = filename
+        for suffix in COMPRESSED_SUFFIXES:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if f"shards/{base}" not in keep:
+            os.remove(os.path.join(shard_dir, filename))
+            removed += 1
+    return removed
+
+def load_previous(output_dir, epoch):
+    """
+    ({(team_id, season_id): shard entry}, snapshot entry) from the last manifest written,
+    if it is this format and was exported from the same database epoch. Versions restart
+    when the database is rebuilt, so they can only be compared within one epoch.
+    """
+    path = os.path.join(output_dir, 'manifest.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}, None
+    if manifest.get("format") != FORMAT or manifest.get("db_epoch") != epoch:
+        return {}, None
+    shards = {(s["team_id"] or 0, s["season_id"] or 0): s for s in manifest.get("shards", [])}
+    return shards, manifest.get("snapshot")
+
+def export_data(db_path=None, output_dir=None, full=False, run=None):
+    """
+    Writes the manifest and every shard whose data changed since the last export.
+    A shard is reused when the previous manifest has the same database epoch and shard
+    version (database.shard_versions) and its file is still there; full=True rebuilds everything.
+    Rows are streamed from the cursor to the files, so memory does not grow with the database.
+    Counters go to `run` (a run_report.RunReport) when given.
+    """
     backend_dir = os.path.dirname(__file__)
-    db_path = os.path.join(backend_dir, '..', 'track_app.db')
-    output_path = os.path.join(backend_dir, '..', 'ui', 'public', 'data.json')
-    
+    db_path = db_path or os.path.join(backend_dir, '..', 'track_app.db')
+    output_dir = output_dir or os.path.join(backend_dir, '..', 'ui', 'public', 'data')
+
     print(f"Reading database from {db_path}...")
-    conn = sqlite3.connect(db_path)
+    # Read-only: only staged writers change the live DB (staging.py)
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True)
     conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Fetch all performances with athlete names
-    query = '''
-        SELECT performances.*, athletes.name as athlete_name 
-        FROM performances 
-        JOIN athletes ON performances.athlete_id = athletes.id 
-        ORDER BY date DESC
-    '''
-    performances = cursor.execute(query).fetchall()
-    
-    data = []
-    for row in performances:
-        p = dict(row)
-        if p.get('splits'):
-            try:
-                p['splits'] = json.loads(p['splits'])
-            except:
-                p['splits'] = []
-        else:
-            p['splits'] = []
-        data.append(p)
-    
-    print(f"Exporting {len(data)} records to {output_path}...")
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
-        
+    require_current_schema(conn, db_path)
+    os.makedirs(os.path.join(output_dir, 'shards'), exist_ok=True)
+
+    if brotli is None:
+        print("  [WARN] brotli is not installed; writing .gz files only (pip install brotli).")
+
+    # One read transaction so versions and rows agree even if a sync is writing
+    conn.execute('BEGIN')
+    db_version = data_version(conn)
+    db_epoch = data_epoch(conn)
+    versions = shard_versions(conn)
+    previous_shards, previous_snapshot = ({}, None) if full else load_previous(output_dir, db_epoch)
+    progress = Progress(conn.execute('SELECT COUNT(*) FROM performances').fetchone()[0])
+
+    shards = []
+    rebuilt = 0
+    for team_id, season_id in conn.execute(EXPORT_SHARDS_QUERY).fetchall():
+        key = (team_id or 0, season_id or 0)
+        version = versions.get(key, 0)
+        old = previous_shards.get(key)
+        if old and old.get("version") == version and os.path.exists(os.path.join(output_dir, old["file"])):
+            compress(os.path.join(output_dir, old["file"]))
+            shards.append(old)
+            progress.advance(old["count"])
+            if run:
+                run.add(cache_hits=1, rows_skipped=old["count"])
+            continue
+
+        name, count = write_shard(conn, output_dir, team_id, season_id, progress)
+        compress(os.path.join(output_dir, name), force=True)
+        if run:
+            run.add(files=1, rows_inserted=count, bytes=os.path.getsize(os.path.join(output_dir, name)))
+        shards.append({"team_id": team_id, "season_id": season_id, "file": name,
+                       "count": count, "version": version})
+        rebuilt += 1
+
+    # SQLite snapshot for in-browser queries; no .gz/.br, since clients read it with Range requests
+    snapshot = previous_snapshot
+    # Keyed on epoch and version: versions start over when the database is rebuilt
+    if not (snapshot and snapshot.get("db_version") == db_version and snapshot.get("db_epoch") == db_epoch
+            and os.path.exists(os.path.join(output_dir, snapshot["file"]))):
+        snapshot = build_snapshot(db_path, output_dir)
+        print(f"  Wrote {snapshot['file']} ({snapshot['size'] / 1024:.1f} KB).")
+        if run:
+            run.add(files=1, bytes=snapshot["size"])
+    elif run:
+        run.add(cache_hits=1)
+
+    # Manifest last: until it is replaced the UI keeps reading the previous, complete set
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    out = HashingWriter(manifest_path)
+    try:
+        write_manifest(conn, out, shards, snapshot, db_version, db_epoch)
+    finally:
+        digest = out.close()
+    conn.rollback()
+    conn.close()
+    if digest == file_digest(manifest_path):
+        out.discard()
+        compress(manifest_path)
+    else:
+        out.finish(manifest_path)
+        compress(manifest_path, force=True)
+    removed = remove_stale_shards(output_dir, {s["file"] for s in shards})
+    remove_stale_snapshots(output_dir, snapshot["file"])
+    report = write_size_report(output_dir, ['manifest.json', snapshot["file"]] + [s["file"] for s in shards])
+
+    print(f"Exported {progress.done} records in {len(shards)} shards to {output_dir} "
+          f"({rebuilt} rebuilt, {len(shards) - rebuilt} unchanged, {removed} stale removed; db version {db_version}).")
+    print(f"Export size: {format_sizes(report['totals'])}; largest file {report['artifacts'][0]['file']}: "
+          f"{format_sizes(report['artifacts'][0])}. Per-file sizes in {SIZE_REPORT}.")
     print("Export Complete!")
 
 if __name__ == "__main__":
-    export_data()
+    full = "--full" in sys.argv
+    run = RunReport("export", full=full)
+    try:
+        with run.stage("export"):
+            export_data(full=full, run=run)
+    except Exception as e:
+        run.finish("error", error=str(e))
+        raise
+    path = run.finish()
+    print_summary(run.to_dict())
+    print(f"Run report: {path}")
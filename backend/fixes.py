@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+
+# manual_fixes.json compiled into lookups.
+#
+# Athlete corrections are exact (case-insensitive) names, so they become a dict.
+# Meet corrections match when their fragment appears anywhere in the meet name or
+# filename. Fragments are bucketed by their first PREFIX_LEN characters, so a lookup
+# only checks the fragments that start with the text at each position instead of all of them.
+#
+# The fixes applied at the last sync are stored in the applied_fixes table. Diffing the
+# file against it gives the meets and athletes a new or edited fix touches, and only
+# those are re-synced (Sub5Scraper.apply_fix_changes).
+
+PREFIX_LEN = 4
+
+class ManualFixes:
+    def __init__(self, fixes):
+        self.raw = fixes or {}
+        self.athletes = {}
+        for ac in self.raw.get('athlete_corrections', []):
+            self.athletes.setdefault(ac['old_name'].strip().casefold(), ac['new_name'])
+
+        # (order, fragment, date); order keeps "first listed fix wins"
+        self.meet_corrections = [
+            (order, mc['meet_name_fragment'].casefold(), mc['new_date'])
+            for order, mc in enumerate(self.raw.get('meet_corrections', []))
+            if mc.get('meet_name_fragment')
+        ]
+        self._by_prefix = {}
+        self._short = []
+        for entry in self.meet_corrections:
+            fragment = entry[1]
+            if len(fragment) < PREFIX_LEN:
+                self._short.append(entry)
+            else:
+                self._by_prefix.setdefault(fragment[:PREFIX_LEN], []).append(entry)
+
+    @classmethod
+    def load(cls, path):
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    return cls(json.load(f))
+            except Exception:
+                pass
+        return cls({"meet_corrections": [], "athlete_corrections": []})
+
+    def athlete_name(self, name):
+        if not name:
+            return ""
+        name = name.strip()
+        return self.athletes.get(name.casefold(), name)
+
+    def meet_date(self, *texts):
+        """Corrected date for the first fix whose fragment appears in any of texts, else None."""
+        best = None
+        for text in texts:
+            if not text:
+                continue
+            folded = text.casefold()
+            for pos in range(len(folded) - PREFIX_LEN + 1):
+                for entry in self._by_prefix.get(folded[pos:pos + PREFIX_LEN], ()):
+                    if (best is None or entry[0] < best[0]) and folded.startswith(entry[1], pos):
+                        best = entry
+            for entry in self._short:
+                if (best is None or entry[0] < best[0]) and entry[1] in folded:
+                    best = entry
+        return best[2] if best else None
+
+    def entries(self):
+        """{(kind, key): value} — the unit that is diffed against applied_fixes."""
+        entries = {("meet", fragment): date for _, fragment, date in reversed(self.meet_corrections)}
+        entries.update({("athlete", old): new for old, new in self.athletes.items()})
+        return entries
+
+def changed_fixes(conn, fixes):
+    """{(kind, key): (applied value or None, current value or None)} for fixes that differ."""
+    applied = {(kind, key): value for kind, key, value in
+               conn.execute('SELECT kind, key, value FROM applied_fixes')}
+    current = fixes.entries()
+    return {
+        k: (applied.get(k), current.get(k))
+        for k in set(applied) | set(current)
+        if applied.get(k) != current.get(k)
+    }
+
+def record_applied(conn, fixes):
+    conn.execute('DELETE FROM applied_fixes')
+    conn.executemany('INSERT INTO applied_fixes (kind, key, value) VALUES (?, ?, ?)',
+                     [(kind, key, value) for (kind, key), value in fixes.entries().items()])
+
+def casefold(text):
+    return text.casefold() if isinstance(text, str) else text
+
+def affected_meets(conn, changes):
+    """Meet ids a set of changed fixes can alter."""
+    # Keys are str.casefold()ed; SQLite's lower() only folds ASCII, so compare with the same function
+    conn.create_function('casefold', 1, casefold, deterministic=True)
+    meet_ids = set()
+    names = set()
+    for (kind, key), (old, new) in changes.items():
+        if kind == "meet":
+            meet_ids.update(r[0] for r in conn.execute(
+                'SELECT id FROM meets WHERE instr(casefold(name), ?) > 0', (key,)))
+        else:
+            names.update(n.strip().casefold() for n in (key, old, new) if n)
+
+    for name in names:
+        athlete_ids = [r[0] for r in conn.execute('''
+            SELECT id FROM athletes WHERE casefold(name) = ?
+            UNION SELECT athlete_id FROM athlete_aliases WHERE casefold(alias) = ?
+        ''', (name, name))]
+        for athlete_id in athlete_ids:
+            meet_ids.update(r[0] for r in conn.execute('''
+                SELECT meet_id FROM performances WHERE athlete_id = ?
+                UNION
+                SELECT performances.meet_id FROM relay_legs
+                JOIN relays ON relays.id = relay_legs.relay_id
+                JOIN performances ON performances.id = relays.performance_id
+                WHERE relay_legs.athlete_id = ?
+            ''', (athlete_id, athlete_id)))
+    meet_ids.discard(None)
+    return meet_ids
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from backend.scraper import Sub5Scraper
+
+    # Like a scrape, the re-sync writes to a staging copy that replaces the DB once it validates
+    scraper = Sub5Scraper()
+    scraper.begin_staging(wipe=False)
+    try:
+        count = scraper.apply_fix_changes()
+        scraper.publish_staging()
+    except Exception:
+        scraper.discard_staging()
+        raise
+    print(f"Re-synced {count} performances.")
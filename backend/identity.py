@@ -0,0 +1,392 @@
+import sqlite3
+import os
+import re
+import sys
+from difflib import SequenceMatcher
+try:
+    from backend.database import create_schema, refresh_search_index, has_search_index, _search_rowid, read_only_uri
+    from backend.staging import StagedDatabase
+except ImportError:
+    from database import create_schema, refresh_search_index, has_search_index, _search_rowid, read_only_uri
+    from staging import StagedDatabase
+
+# Athlete identity resolution.
+#
+# Duplicate athletes come from "Last, First" vs "First Last" orderings, misspellings and
+# names truncated by Hy-Tek's fixed-width columns. Comparing every athlete with every
+# other is O(n^2), so athletes are first grouped into small blocks that share a
+# phonetic surname/first-initial key (or phonetic first name/surname initial) AND a team.
+# Only pairs inside a block are scored. Parsed results don't carry the grade column,
+# so the "grade-year" part of the block is a career-span check: two names whose
+# seasons span more than a high-school career can't be the same athlete.
+#
+# Candidates go to athlete_merge_candidates for review. Approved merges repoint the
+# duplicate's results to the kept athlete and record its old name in athlete_aliases,
+# which sync_json_to_db loads into its name -> id cache (O(1) per row).
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'track_app.db')
+
+MIN_CONFIDENCE = 0.80
+MAX_CAREER_YEARS = 6  # 7th grade through 12th
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+def canonical_tokens(name):
+    """'Baldwin, Ben Jr.' -> ['ben', 'baldwin']"""
+    if not name:
+        return []
+    name = name.strip()
+    if ',' in name:
+        last, _, first = name.partition(',')
+        name = f"{first} {last}"
+    tokens = re.findall(r"[a-z]+", name.lower().replace("'", ""))
+    return [t for t in tokens if t not in NAME_SUFFIXES]
+
+def soundex(word):
+    if not word:
+        return ""
+    codes = {c: d for d, letters in
+             (("1", "bfpv"), ("2", "cgjkqsxz"), ("3", "dt"), ("4", "l"), ("5", "mn"), ("6", "r"))
+             for c in letters}
+    result = word[0].upper()
+    last = codes.get(word[0], "")
+    for c in word[1:]:
+        code = codes.get(c, "")
+        if code and code != last:
+            result += code
+            if len(result) == 4:
+                break
+        if c not in "hw":
+            last = code
+    return result.ljust(4, "0")
+
+def blocking_keys(tokens):
+    """Phonetic keys; the team is added by the caller."""
+    if len(tokens) < 2:
+        return {("solo", soundex(tokens[0]))} if tokens else set()
+    first, last = tokens[0], tokens[-1]
+    return {
+        ("last", soundex(last), first[0]),
+        ("first", soundex(first), last[0]),
+    }
+
+def name_similarity(a_tokens, b_tokens):
+    """Confidence (0-1) that two canonical token lists name the same person."""
+    if not a_tokens or not b_tokens:
+        return 0.0
+    if a_tokens == b_tokens:
+        return 1.0
+    if sorted(a_tokens) == sorted(b_tokens):
+        return 0.97
+    # Truncation: "Hopkins-Watr" vs "Hopkins-Watrous", "Chris Smith" vs "Christopher Smith"
+    if len(a_tokens) == len(b_tokens) and all(x.startswith(y) or y.startswith(x) for x, y in zip(a_tokens, b_tokens)):
+        return 0.92
+    # Middle name present on only one side
+    if a_tokens[0] == b_tokens[0] and a_tokens[-1] == b_tokens[-1]:
+        return 0.9
+    return round(SequenceMatcher(None, " ".join(a_tokens), " ".join(b_tokens)).ratio() * 0.95, 3)
+
+def load_athletes(conn):
+    """{athlete_id: profile} with teams, season years and (meet, event) entries."""
+    profiles = {}
+    for athlete_id, name in conn.execute('SELECT id, name FROM athletes'):
+        profiles[athlete_id] = {
+            "id": athlete_id, "name": name, "tokens": canonical_tokens(name),
+            "teams": set(), "years": set(), "entries": set(), "count": 0,
+        }
+
+    rows = conn.execute('''
+        SELECT performances.athlete_id, performances.team_id, seasons.year,
+               performances.meet_id, performances.event_id
+        FROM performances
+        LEFT JOIN seasons ON seasons.id = performances.season_id
+        WHERE performances.athlete_id IS NOT NULL
+        UNION ALL
+        SELECT relay_legs.athlete_id, performances.team_id, seasons.year, NULL, NULL
+        FROM relay_legs
+        JOIN relays ON relays.id = relay_legs.relay_id
+        JOIN performances ON performances.id = relays.performance_id
+        LEFT JOIN seasons ON seasons.id = performances.season_id
+    ''')
+    for athlete_id, team_id, year, meet_id, event_id in rows:
+        p = profiles.get(athlete_id)
+        if not p:
+            continue
+        p["teams"].add(team_id)
+        if year and str(year).isdigit():
+            p["years"].add(int(year))
+        if meet_id is not None:
+            p["entries"].add((meet_id, event_id))
+        p["count"] += 1
+    return profiles
+
+def build_blocks(profiles):
+    blocks = {}
+    for p in profiles.values():
+        for key in blocking_keys(p["tokens"]):
+            for team_id in p["teams"] or {None}:
+                blocks.setdefault((key, team_id), []).append(p["id"])
+    return blocks
+
+def compatible(a, b):
+    # Two entries in the same event at the same meet means two different people
+    if a["entries"] & b["entries"]:
+        return False
+    years = a["years"] | b["years"]
+    if years and max(years) - min(years) >= MAX_CAREER_YEARS:
+        return False
+    return True
+
+def find_candidates(conn, min_confidence=MIN_CONFIDENCE):
+    """Returns [(keep_id, merge_id, confidence, reason)] sorted by confidence."""
+    profiles = load_athletes(conn)
+    blocks = build_blocks(profiles)
+    seen = set()
+    candidates = []
+    compared = 0
+    for (key, team_id), ids in blocks.items():
+        if len(ids) < 2:
+            continue
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                pair = (min(ids[i], ids[j]), max(ids[i], ids[j]))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                compared += 1
+                a, b = profiles[pair[0]], profiles[pair[1]]
+                score = name_similarity(a["tokens"], b["tokens"])
+                if score < min_confidence or not compatible(a, b):
+                    continue
+                # Keep the athlete with more results; on a tie, the longer (less truncated) name
+                keep, merge = sorted((a, b), key=lambda p: (p["count"], len(p["name"])), reverse=True)
+                candidates.append((keep["id"], merge["id"], score, f"block {key[0]}:{key[1]} team {team_id}"))
+
+    print(f"Compared {compared} pairs across {len(blocks)} blocks "
+          f"({len(profiles)} athletes, all-pairs would be {len(profiles) * (len(profiles) - 1) // 2}).")
+    candidates.sort(key=lambda c: c[2], reverse=True)
+    return candidates
+
+def record_candidates(conn, candidates):
+    """Stores new candidates as pending; decisions already made are left alone."""
+    added = 0
+    for keep_id, merge_id, score, reason in candidates:
+        cur = conn.execute('''
+            INSERT OR IGNORE INTO athlete_merge_candidates (keep_id, merge_id, confidence, reason, status)
+            VALUES (?, ?, ?, ?, 'pending')
+        ''', (keep_id, merge_id, score, reason))
+        added += cur.rowcount
+    conn.commit()
+    return added
+
+def set_status(conn, candidate_ids, status):
+    conn.executemany('UPDATE athlete_merge_candidates SET status = ? WHERE id = ?',
+                     [(status, cid) for cid in candidate_ids])
+    conn.commit()
+
+def approve_above(conn, min_confidence):
+    cur = conn.execute('''
+        UPDATE athlete_merge_candidates SET status = 'approved'
+        WHERE status = 'pending' AND confidence >= ?
+    ''', (min_confidence,))
+    conn.commit()
+    return cur.rowcount
+
+def merge_athletes(conn, keep_id, merge_id):
+    """Moves every result from merge_id to keep_id and aliases the old name.
+    Returns False (and changes nothing) if either athlete no longer exists."""
+    row = conn.execute('SELECT name FROM athletes WHERE id = ?', (merge_id,)).fetchone()
+    if not row or keep_id == merge_id:
+        return False
+    if not conn.execute('SELECT 1 FROM athletes WHERE id = ?', (keep_id,)).fetchone():
+        return False
+    old_name = row[0]
+
+    # Drop results the kept athlete already has, then repoint the rest
+    conn.execute('''
+        DELETE FROM performances WHERE athlete_id = ? AND EXISTS (
+            SELECT 1 FROM performances AS kept
+            WHERE kept.athlete_id = ? AND kept.event_id = performances.event_id
+              AND kept.mark = performances.mark AND kept.date = performances.date
+        )
+    ''', (merge_id, keep_id))
+    conn.execute('UPDATE performances SET athlete_id = ? WHERE athlete_id = ?', (keep_id, merge_id))
+    conn.execute('UPDATE relay_legs SET athlete_id = ? WHERE athlete_id = ?', (keep_id, merge_id))
+
+    conn.execute('INSERT OR REPLACE INTO athlete_aliases (alias, athlete_id) VALUES (?, ?)', (old_name, keep_id))
+    # Aliases that pointed at the merged athlete follow it
+    conn.execute('UPDATE athlete_aliases SET athlete_id = ? WHERE athlete_id = ?', (keep_id, merge_id))
+    # Later candidates involving the merged athlete now refer to the kept one
+    conn.execute('''
+        UPDATE OR IGNORE athlete_merge_candidates SET keep_id = ?
+        WHERE keep_id = ? AND status IN ('pending', 'approved')
+    ''', (keep_id, merge_id))
+    # The rest can't be decided any more: the pair already exists for the kept athlete (the
+    # update above skipped it), or they would merge the merged athlete somewhere else
+    conn.execute('''
+        UPDATE athlete_merge_candidates SET status = 'superseded'
+        WHERE status IN ('pending', 'approved') AND (keep_id = ? OR merge_id = ? OR keep_id = merge_id)
+    ''', (merge_id, merge_id))
+    conn.execute('DELETE FROM athletes WHERE id = ?', (merge_id,))
+    if has_search_index(conn):
+        conn.execute('DELETE FROM search_index WHERE rowid = ?', (_search_rowid("athlete", merge_id),))
+    return True
+
+def apply_approved(conn):
+    """Applies approved merges. Returns the number of athletes merged. Candidates that an
+    earlier merge made moot are marked superseded."""
+    approved = conn.execute('''
+        SELECT id, keep_id, merge_id FROM athlete_merge_candidates
+        WHERE status = 'approved' ORDER BY confidence DESC
+    ''').fetchall()
+    merged = 0
+    merged_into = {}  # merge_id -> keep_id for merges done in this run
+
+    def current(athlete_id):
+        # A chain (1 <- 2, then 2 <- 3) sends 3 to where 2 went
+        while athlete_id in merged_into:
+            athlete_id = merged_into[athlete_id]
+        return athlete_id
+
+    for cid, keep_id, merge_id in approved:
+        keep_id = current(keep_id)
+        if merge_athletes(conn, keep_id, merge_id):
+            merged += 1
+            merged_into[merge_id] = keep_id
+            status = 'applied'
+        else:
+            status = 'superseded'
+        conn.execute("UPDATE athlete_merge_candidates SET status = ? WHERE id = ?", (status, cid))
+    kept = {current(keep_id) for keep_id in merged_into.values()}
+    if kept:
+        refresh_search_index(conn, athlete_ids=kept)
+    conn.commit()
+    return merged
+
+# Merges and review decisions across a wipe.
+# A full scrape or resync_db.py rebuilds the DB from empty, and athlete ids change. Before the
+# wipe, carry_identity reads aliases and open or rejected candidates from the old DB by name.
+# restore_aliases creates the kept athletes before the sync, so results under a merged name
+# land on them again. restore_candidates runs after the sync and maps the candidates to the
+# new ids. Applied and superseded candidates are history; their merges live on as aliases.
+CARRIED_STATUSES = ('pending', 'approved', 'rejected')
+
+def carry_identity(db_path):
+    """{"aliases": [(alias, kept name)], "candidates": [(keep name, merge name, confidence,
+    reason, status)]} from the DB at db_path; None if it has neither."""
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True)
+    try:
+        aliases = conn.execute('''
+            SELECT athlete_aliases.alias, athletes.name FROM athlete_aliases
+            JOIN athletes ON athletes.id = athlete_aliases.athlete_id
+        ''').fetchall()
+        candidates = conn.execute(f'''
+            SELECT keep.name, merge.name, c.confidence, c.reason, c.status
+            FROM athlete_merge_candidates c
+            JOIN athletes keep ON keep.id = c.keep_id
+            JOIN athletes merge ON merge.id = c.merge_id
+            WHERE c.status IN ({', '.join('?' * len(CARRIED_STATUSES))})
+        ''', CARRIED_STATUSES).fetchall()
+    except sqlite3.OperationalError:
+        return None  # a DB from before identity resolution
+    finally:
+        conn.close()
+    if not aliases and not candidates:
+        return None
+    return {"aliases": aliases, "candidates": candidates}
+
+def _athlete_id(conn, name):
+    row = conn.execute('SELECT id FROM athletes WHERE name = ?', (name,)).fetchone()
+    return row[0] if row else None
+
+def restore_aliases(conn, carried):
+    """Creates the kept athletes and their aliases in a freshly wiped DB. Returns their ids."""
+    kept = set()
+    for alias, name in carried["aliases"]:
+        conn.execute('INSERT OR IGNORE INTO athletes (name) VALUES (?)', (name,))
+        athlete_id = _athlete_id(conn, name)
+        conn.execute('INSERT OR REPLACE INTO athlete_aliases (alias, athlete_id) VALUES (?, ?)', (alias, athlete_id))
+        kept.add(athlete_id)
+    return kept
+
+def restore_candidates(conn, carried, kept):
+    """After the sync: re-adds the carried candidates whose athletes both came back, and removes
+    kept athletes (from restore_aliases) that got no results, with their aliases."""
+    for keep_name, merge_name, confidence, reason, status in carried["candidates"]:
+        keep_id, merge_id = _athlete_id(conn, keep_name), _athlete_id(conn, merge_name)
+        if keep_id and merge_id and keep_id != merge_id:
+            conn.execute('''
+                INSERT OR IGNORE INTO athlete_merge_candidates (keep_id, merge_id, confidence, reason, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (keep_id, merge_id, confidence, reason, status))
+    unused = [athlete_id for athlete_id in kept if not conn.execute('''
+        SELECT EXISTS (SELECT 1 FROM performances WHERE athlete_id = ?)
+            OR EXISTS (SELECT 1 FROM relay_legs WHERE athlete_id = ?)
+    ''', (athlete_id, athlete_id)).fetchone()[0]]
+    for athlete_id in unused:
+        conn.execute('DELETE FROM athlete_aliases WHERE athlete_id = ?', (athlete_id,))
+        conn.execute('DELETE FROM athletes WHERE id = ?', (athlete_id,))
+        if has_search_index(conn):
+            conn.execute('DELETE FROM search_index WHERE rowid = ?', (_search_rowid("athlete", athlete_id),))
+    conn.commit()
+
+def print_candidates(conn, status='pending'):
+    rows = conn.execute('''
+        SELECT c.id, c.confidence, COALESCE(keep.name, '#' || c.keep_id), COALESCE(merge.name, '#' || c.merge_id), c.reason
+        FROM athlete_merge_candidates c
+        -- Applied and superseded candidates can refer to athletes merged away since
+        LEFT JOIN athletes keep ON keep.id = c.keep_id
+        LEFT JOIN athletes merge ON merge.id = c.merge_id
+        WHERE c.status = ? ORDER BY c.confidence DESC
+    ''', (status,)).fetchall()
+    for cid, score, keep_name, merge_name, reason in rows:
+        print(f"  #{cid:<5} {score:.2f}  keep '{keep_name}'  <-  '{merge_name}'   ({reason})")
+    print(f"{len(rows)} {status} candidates.")
+
+if __name__ == "__main__":
+    usage = """Usage:
+  python backend/identity.py scan                 Find merge candidates (stored as pending)
+  python backend/identity.py list [status]        Show candidates (pending/approved/rejected/applied/superseded)
+  python backend/identity.py approve ID [ID...]   Approve candidates
+  python backend/identity.py reject ID [ID...]    Reject candidates
+  python backend/identity.py approve-above SCORE  Approve every pending candidate >= SCORE
+  python backend/identity.py apply                Merge approved candidates"""
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    cmd = sys.argv[1]
+    if cmd == "list":
+        conn = sqlite3.connect(read_only_uri(DB_PATH), uri=True)
+        print_candidates(conn, sys.argv[2] if len(sys.argv) > 2 else 'pending')
+        conn.close()
+        sys.exit(0)
+    if cmd not in ("scan", "approve", "reject", "approve-above", "apply"):
+        print(usage)
+        sys.exit(1)
+
+    # Writes go to a staging copy that replaces the DB once it validates, like a scrape's
+    # (staging.py); this fails instead of racing a scrape that is staging already
+    staged = StagedDatabase(DB_PATH)
+    conn = sqlite3.connect(staged.begin())
+    try:
+        create_schema(conn)
+        if cmd == "scan":
+            found = find_candidates(conn)
+            print(f"Found {len(found)} candidates, {record_candidates(conn, found)} new.")
+            print_candidates(conn)
+        elif cmd in ("approve", "reject"):
+            set_status(conn, [int(x) for x in sys.argv[2:]], "approved" if cmd == "approve" else "rejected")
+        elif cmd == "approve-above":
+            print(f"Approved {approve_above(conn, float(sys.argv[2]))} candidates.")
+        elif cmd == "apply":
+            merged = apply_approved(conn)
+            staged.removed["athletes"] = merged
+            print(f"Merged {merged} athletes.")
+        conn.close()
+        staged.publish()
+    except Exception:
+        conn.close()
+        staged.discard()
+        raise
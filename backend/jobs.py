@@ -0,0 +1,319 @@
+import json
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+try:
+    from backend.run_report import RunReport, print_summary
+except ImportError:
+    from run_report import RunReport, print_summary
+
+# Background jobs for the API: scrapes, with one sub-job per season.
+#
+# A job goes queued -> running -> succeeded | failed | cancelled. Top-level jobs run one at a
+# time in the order they were submitted, since they all write the same database. Their
+# sub-jobs run in parallel on a pool of SUBJOB_WORKERS threads. State changes, messages and
+# progress are published to subscribers, and GET /jobs/events streams them as Server-Sent
+# Events, so clients don't have to poll.
+#
+# Cancelling is cooperative. A queued job never starts. A running one stops at its next
+# progress report: the progress callback raises JobCancelled once the job or its parent
+# has been cancelled. The last KEEP_JOBS finished top-level jobs are kept for GET /jobs;
+# their run reports are saved to disk as before.
+
+KEEP_JOBS = 50
+SUBJOB_WORKERS = 4
+PROGRESS_INTERVAL = 0.25   # seconds between progress events per job; state changes always go out
+KEEPALIVE = 15             # seconds between SSE comments on an idle stream
+SUBSCRIBER_BACKLOG = 1000  # events queued for a slow client before new ones are dropped
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    def __init__(self, kind, params, parent=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.parent = parent
+        self.children = []
+        self.state = QUEUED
+        self.message = "Queued"
+        self.progress = 0
+        self.result = None
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = threading.Event()
+        # Part of the job's 0-100 that the current step's own 0-100 progress maps to
+        self.span = (0, 100)
+        self.published = 0.0
+
+    def cancelled(self):
+        job = self
+        while job is not None:
+            if job.cancel_requested.is_set():
+                return True
+            job = job.parent
+        return False
+
+    def to_dict(self, children=True):
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "parent": self.parent.id if self.parent else None,
+            "state": self.state,
+            "message": self.message,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if children:
+            data["children"] = [child.to_dict(children=False) for child in self.children]
+        return data
+
+class JobManager:
+    def __init__(self, workers=SUBJOB_WORKERS, keep=KEEP_JOBS):
+        self.keep = keep
+        self.lock = threading.RLock()
+        self.jobs = OrderedDict()  # id -> top-level Job, oldest first
+        self.index = {}            # id -> Job, sub-jobs included
+        self.pending = queue.Queue()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='subjob')
+        self.subscribers = set()
+        self.local = threading.local()  # the job running on this thread, for progress()
+        self.runner = None
+
+    def submit(self, kind, target, **params):
+        """Queues a top-level job. target(manager, job) does the work; what it returns is job.result."""
+        job = Job(kind, params)
+        with self.lock:
+            self.jobs[job.id] = job
+            self.index[job.id] = job
+            if self.runner is None or not self.runner.is_alive():
+                self.runner = threading.Thread(target=self._run_queue, daemon=True)
+                self.runner.start()
+        self.pending.put((job, target))
+        self.publish(job)
+        return job
+
+    def spawn(self, parent, kind, target, **params):
+        """Starts a sub-job of `parent` on the pool. Returns (job, future); the future never raises."""
+        job = Job(kind, params, parent=parent)
+        with self.lock:
+            parent.children.append(job)
+            self.index[job.id] = job
+        self.publish(job)
+        return job, self.pool.submit(self._execute, job, target)
+
+    def _run_queue(self):
+        while True:
+            job, target = self.pending.get()
+            self._execute(job, target)
+            with self.lock:
+                self._trim()
+
+    def _execute(self, job, target):
+        if job.cancelled():
+            self.update(job, state=CANCELLED, message="Cancelled", finished_at=_now())
+            return
+        self.local.job = job
+        self.update(job, state=RUNNING, message="Running", started_at=_now())
+        error = None
+        try:
+            result = target(self, job)
+            state, message = SUCCEEDED, "Finished"
+        except JobCancelled:
+            result, state, message = None, CANCELLED, "Cancelled"
+        except Exception as e:
+            traceback.print_exc()
+            result, state, message, error = None, FAILED, f"Error: {e}", str(e)
+        finally:
+            self.local.job = None
+        self.update(job, state=state, message=message, result=result, error=error, finished_at=_now(),
+                    progress=100 if state == SUCCEEDED else job.progress)
+
+    def _trim(self):
+        finished = [job for job in self.jobs.values() if job.state in FINISHED]
+        for job in finished[:max(0, len(finished) - self.keep)]:
+            del self.jobs[job.id]
+            for j in [job] + job.children:
+                self.index.pop(j.id, None)
+
+    def progress(self, message, progress=None):
+        """Progress callback for work running inside a job (Sub5Scraper's progress_callback).
+        Raises JobCancelled once the job has been cancelled."""
+        job = getattr(self.local, 'job', None)
+        if job is None:
+            return
+        if job.cancelled():
+            raise JobCancelled(job.id)
+        fields = {"message": message}
+        if progress is not None:
+            low, high = job.span
+            fields["progress"] = int(low + (high - low) * progress / 100)
+        self.update(job, throttle=True, **fields)
+
+    def update(self, job, throttle=False, **fields):
+        with self.lock:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            now = time.monotonic()
+            if throttle and now - job.published < PROGRESS_INTERVAL:
+                return
+            job.published = now
+            parent = job.parent
+            if parent is not None and parent.state == RUNNING:
+                # A parent's progress is its children's average, within the parent's span
+                done = [100 if child.state == SUCCEEDED else child.progress for child in parent.children]
+                low, high = parent.span
+                parent.progress = int(low + (high - low) * sum(done) / len(done) / 100)
+        self.publish(job)
+        if parent is not None and parent.state == RUNNING:
+            self.publish(parent)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.index.get(job_id)
+
+    def list(self, limit=20):
+        """Top-level jobs, newest first."""
+        with self.lock:
+            return [job.to_dict() for job in reversed(self.jobs.values())][:limit]
+
+    def latest(self, kind):
+        with self.lock:
+            for job in reversed(self.jobs.values()):
+                if job.kind == kind:
+                    return job
+        return None
+
+    def cancel(self, job_id):
+        """Cancels a job and its sub-jobs. Returns the job, or None if there is no such job."""
+        job = self.get(job_id)
+        if job is None or job.state in FINISHED:
+            return job
+        job.cancel_requested.set()
+        for j in [job] + job.children:
+            if j.state == QUEUED:
+                self.update(j, state=CANCELLED, message="Cancelled", finished_at=_now())
+            elif j.state == RUNNING:
+                self.update(j, message="Cancelling...")
+        return job
+
+    def publish(self, job):
+        event = job.to_dict(children=False)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                pass
+
+    @contextmanager
+    def subscribe(self):
+        events = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        with self.lock:
+            self.subscribers.add(events)
+        try:
+            yield events
+        finally:
+            with self.lock:
+                self.subscribers.discard(events)
+
+    def events(self, job_id=None, keepalive=KEEPALIVE):
+        """Server-Sent Events: the current state of the matching jobs, then every change to them.
+        With job_id, only that job and its sub-jobs; otherwise every job."""
+        with self.subscribe() as events:
+            if job_id:
+                job = self.get(job_id)
+                snapshot = [job] + job.children if job else []
+            else:
+                with self.lock:
+                    snapshot = [j for j in self.index.values() if j.state not in FINISHED]
+            for job in snapshot:
+                yield sse(job.to_dict(children=False))
+            while True:
+                try:
+                    event = events.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if job_id is None or job_id in (event["id"], event["parent"]):
+                    yield sse(event)
+
+def sse(event):
+    return f"event: job\ndata: {json.dumps(event)}\n\n"
+
+def run_scrape(manager, job, scraper, wipe):
+    """A scrape as a job (the target for JobManager.submit, with scraper and wipe bound).
+    Schema and fixes run here; then one sub-job per season downloads and parses, all at once,
+    and syncs once the season before it has synced, so seasons reach the DB in order."""
+    scraper.run = RunReport("scrape", wipe=wipe, job=job.id)
+    try:
+        job.span = (0, 5)
+        synced_meets = scraper.prepare_scrape(wipe)
+        job.span = (5, 95)
+        seasons = scraper.seasons()
+        turns = [threading.Event() for _ in seasons]
+
+        def season_job(index, config):
+            def target(manager, sub):
+                try:
+                    sub.span = (0, 10)
+                    scraper.download_season(config, synced_meets)
+                    sub.span = (10, 50)
+                    scraper.parse_season(config)
+                    if index:
+                        manager.progress("Waiting for the previous season to sync...")
+                        turns[index - 1].wait()
+                    sub.span = (50, 100)
+                    return {"inserted": scraper.sync_season(config)}
+                finally:
+                    # Never let a later season sync alongside an earlier one
+                    if index:
+                        turns[index - 1].wait()
+                    turns[index].set()
+            return target
+
+        futures = [manager.spawn(job, "season", season_job(i, config), year=config["year"], season=config["season"])[1]
+                   for i, config in enumerate(seasons)]
+        for future in futures:
+            future.result()
+
+        if job.cancelled():
+            raise JobCancelled(job.id)
+        failed = [f"{child.params['season']} {child.params['year']}" for child in job.children if child.state != SUCCEEDED]
+        if failed:
+            raise RuntimeError(f"{', '.join(failed)} failed")
+        job.span = (95, 100)
+        scraper.finish_scrape()
+    except JobCancelled:
+        scraper.discard_staging()
+        scraper.run.finish("cancelled")
+        raise
+    except Exception as e:
+        scraper.discard_staging()
+        scraper.run.finish("error", error=str(e))
+        raise
+    path = scraper.run.finish()
+    print_summary(scraper.run.to_dict())
+    print(f"Run report: {path}")
+    inserted = sum(child.result["inserted"] for child in job.children)
+    return {"inserted": inserted, "report": path}
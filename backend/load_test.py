@@ -0,0 +1,363 @@
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import requests
+try:
+    from backend.synth_corpus import SEASONS, generate_corpus
+    from backend.scraper import Sub5Scraper, BASE_URL_ENV, DATA_DIR_ENV
+    from backend.replay_server import ReplayServer
+    from backend.run_report import REPORTS_DIR, save_report
+except ImportError:
+    from synth_corpus import SEASONS, generate_corpus
+    from scraper import Sub5Scraper, BASE_URL_ENV, DATA_DIR_ENV
+    from replay_server import ReplayServer
+    from run_report import REPORTS_DIR, save_report
+
+# Load test for the read API against a seeded database.
+#
+#   python backend/load_test.py [--scale 1] [--seed 1] [--concurrency 8] [--duration 15]
+#                               [--workers 4] [--mix search,athlete_performances] [--contention]
+#
+# The database is built from the synthetic corpus (synth_corpus.py) by the real parse and sync,
+# and cached in LOAD_DIR by scale and seed. The app runs on a uvicorn thread in this process,
+# or with --workers N as a uvicorn subprocess with N workers. In-process, the client threads
+# and the server share one GIL, so use --workers for throughput numbers and in-process runs
+# for profiling (SUB5_PROFILE=api).
+#
+# `concurrency` client threads send requests back to back, drawn from MIX with a seeded RNG;
+# parameters (team names, athlete ids, name prefixes) come from the database. The result is
+# requests, errors, RPS and p50/p95/p99 latency per endpoint, plus the peak RSS of the server.
+#
+# --contention measures an idle phase, then POSTs /scrape/sub5 with the scraper pointed at a
+# replay_server.py of the same corpus (SUB5_BASE_URL, SUB5_DATA_DIR). The database is seeded
+# without the last season, so the scrape has a season to download, parse and sync while the
+# readers keep going. The second phase lasts until the scrape's run report is written.
+# Reports go to LOAD_DIR/reports.
+
+LOAD_DIR = os.path.join(os.path.dirname(__file__), 'data', 'loadtest')
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Endpoint weights, roughly what the dashboard sends
+MIX = {"teams": 1, "athletes": 3, "athletes_season": 2, "athlete_performances": 6,
+       "performances": 1, "search": 6}
+SCRAPE_TIMEOUT = 900  # seconds to wait for the contention scrape
+MEMORY_EVERY = 0.5
+
+def quiet(message, progress):
+    pass
+
+def fixture_path(scale, seed, seasons):
+    return os.path.join(LOAD_DIR, f"scale{scale:g}-seed{seed}-{seasons[0]}-{seasons[-1]}.db")
+
+def build_fixture(scale, seed, seasons):
+    """Parses and syncs the synthetic corpus into a database, once per (scale, seed, seasons)."""
+    path = fixture_path(scale, seed, seasons)
+    if os.path.exists(path):
+        return path
+    os.makedirs(LOAD_DIR, exist_ok=True)
+    print(f"Building {path} from the synthetic corpus...")
+    work_dir = tempfile.mkdtemp(prefix='sub5-load-')
+    tmp_path = path + '.tmp'
+    try:
+        corpus = generate_corpus(os.path.join(work_dir, 'corpus'), scale, seed, seasons)
+        scraper = Sub5Scraper(db_path=tmp_path, progress_callback=quiet, data_dir=os.path.join(work_dir, 'data'))
+        scraper.initialize_db(wipe=True)
+        for year, season in corpus.items():
+            json_dir = os.path.join(work_dir, 'parsed', year)
+            scraper.parse_all_files(season["dir"], json_dir)
+            scraper.sync_json_to_db(json_dir, season="Indoor", year=year)
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return path
+
+class RequestPool:
+    """Draws (endpoint, path, params) from MIX with parameters taken from the database."""
+    def __init__(self, db_path, mix):
+        conn = sqlite3.connect(db_path)
+        self.teams = [r[0] for r in conn.execute('SELECT name FROM teams ORDER BY id')]
+        self.athletes = [r[0] for r in conn.execute('SELECT id FROM athletes ORDER BY id')]
+        self.names = [r[0] for r in conn.execute('SELECT name FROM athletes ORDER BY id LIMIT 5000')]
+        self.years = [r[0] for r in conn.execute('SELECT DISTINCT year FROM seasons ORDER BY year')]
+        conn.close()
+        self.mix = {name: weight for name, weight in MIX.items() if name in mix}
+
+    def draw(self, rng):
+        name = rng.choices(list(self.mix), list(self.mix.values()))[0]
+        if name == "teams":
+            return name, "/teams", {}
+        if name == "athletes":
+            return name, "/athletes", {"team": rng.choice(self.teams)}
+        if name == "athletes_season":
+            return name, "/athletes", {"year": rng.choice(self.years), "season": "Indoor"}
+        if name == "athlete_performances":
+            return name, f"/athletes/{rng.choice(self.athletes)}/performances", {}
+        if name == "performances":
+            return name, "/performances", {"team": rng.choice(self.teams)}
+        word = rng.choice(rng.choice(self.names).split())
+        return name, "/search", {"q": word[:rng.randint(2, max(2, len(word)))]}
+
+def drive(base_url, pool, concurrency, stop, seed):
+    """Sends requests from `concurrency` threads until `stop` is set. Returns (samples, wall seconds)."""
+    samples = []  # (endpoint, seconds, ok)
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(f"{seed}-{index}")
+        session = requests.Session()
+        local = []
+        while not stop.is_set():
+            name, path, params = pool.draw(rng)
+            start = time.perf_counter()
+            try:
+                ok = session.get(base_url + path, params=params, timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            local.append((name, time.perf_counter() - start, ok))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def summarize(samples, wall):
+    """{endpoint or "all": {"requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"}}"""
+    groups = {"all": samples}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    summary = {}
+    for name, group in groups.items():
+        latencies = sorted(s[1] for s in group)
+        summary[name] = {
+            "requests": len(group),
+            "errors": sum(1 for s in group if not s[2]),
+            "rps": round(len(group) / wall, 1) if wall else 0.0,
+            **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+        }
+    return summary
+
+def rss_mb(pids):
+    """Resident memory of the given processes, from /proc (Linux); None elsewhere."""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except OSError:
+            if not os.path.exists("/proc"):
+                return None
+    return round(total / 1024, 1)
+
+def process_tree(pid):
+    """pid and its descendants (uvicorn's worker processes)."""
+    pids = {pid}
+    try:
+        entries = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return pids
+    changed = True
+    while changed:
+        changed = False
+        for entry in entries:
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            if ppid in pids and entry not in pids:
+                pids.add(entry)
+                changed = True
+    return pids
+
+class MemorySampler:
+    def __init__(self, pids):
+        self.pids = pids  # callable returning the pids to measure
+        self.peak = None
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stop.wait(MEMORY_EVERY):
+            value = rss_mb(self.pids())
+            if value is not None and (self.peak is None or value > self.peak):
+                self.peak = value
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+class InProcessApp:
+    """backend.main:app on a uvicorn thread in this process."""
+    def __init__(self, db_path):
+        import uvicorn
+        os.environ["SUB5_DB_PATH"] = db_path
+        try:
+            from backend import main
+        except ImportError:
+            import main
+        self.port = free_port()
+        self.server = uvicorn.Server(uvicorn.Config(main.app, host='127.0.0.1', port=self.port, log_level='warning'))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def pids(self):
+        return [os.getpid()]
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+class WorkerApp:
+    """`uvicorn backend.main:app --workers N` in a subprocess; settings go through the environment."""
+    def __init__(self, db_path, workers, env):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.command = [sys.executable, '-m', 'uvicorn', 'backend.main:app', '--host', '127.0.0.1',
+                        '--port', str(self.port), '--workers', str(workers), '--log-level', 'warning']
+        self.env = {**os.environ, "SUB5_DB_PATH": db_path, **env}
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, cwd=REPO_DIR, env=self.env)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(self.url + '/health', timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("uvicorn did not start")
+
+    def pids(self):
+        return process_tree(self.process.pid)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+def run_phase(app, pool, concurrency, seed, duration=None, until=None):
+    """Drives load for `duration` seconds, or until `until()` returns true. Returns the phase summary."""
+    stop = threading.Event()
+    with MemorySampler(app.pids) as memory:
+        def timer():
+            deadline = time.monotonic() + (duration or SCRAPE_TIMEOUT)
+            while time.monotonic() < deadline and not (until and until()):
+                time.sleep(0.2)
+            stop.set()
+        threading.Thread(target=timer, daemon=True).start()
+        samples, wall = drive(app.url, pool, concurrency, stop, seed)
+    return {"wall_s": round(wall, 2), "peak_rss_mb": memory.peak, "endpoints": summarize(samples, wall)}
+
+def scrape_reports():
+    return set(os.listdir(REPORTS_DIR)) if os.path.isdir(REPORTS_DIR) else set()
+
+def print_phase(name, phase):
+    print(f"\n{name}: {phase['wall_s']:.1f}s, peak RSS {phase['peak_rss_mb']} MB")
+    print(f"  {'endpoint':<22}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, s in phase["endpoints"].items():
+        print(f"  {endpoint:<22}{s['requests']:>9}{s['errors']:>8}{s['rps']:>9.1f}"
+              f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}")
+
+def run_load_test(scale=1.0, seed=1, concurrency=8, duration=15.0, workers=0, mix=tuple(MIX),
+                  contention=False):
+    seasons = SEASONS[:-1] if contention else SEASONS
+    db_path = build_fixture(scale, seed, seasons)
+    work_dir = tempfile.mkdtemp(prefix='sub5-load-')
+    replay = None
+    env = {}
+    if contention:
+        # The scrape writes to a copy; the cached fixture stays as built
+        db_path = shutil.copy(db_path, os.path.join(work_dir, 'contention.db'))
+        generate_corpus(os.path.join(work_dir, 'corpus'), scale, seed, SEASONS)
+        replay = ReplayServer(os.path.join(work_dir, 'corpus')).start()
+        env = {BASE_URL_ENV: replay.url, DATA_DIR_ENV: os.path.join(work_dir, 'data')}
+        os.environ.update(env)
+
+    report = {"kind": "load", "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+              "scale": scale, "seed": seed, "concurrency": concurrency, "workers": workers,
+              "mix": list(mix), "db": os.path.basename(db_path), "phases": {}}
+    app = WorkerApp(db_path, workers, env) if workers else InProcessApp(db_path)
+    pool = RequestPool(db_path, mix)
+    app.start()
+    try:
+        report["phases"]["idle"] = run_phase(app, pool, concurrency, seed, duration=duration)
+        if contention:
+            before = scrape_reports()
+            started = time.monotonic()
+            requests.post(app.url + '/scrape/sub5', timeout=30).raise_for_status()
+            done = lambda: any(n.endswith('-scrape.json') for n in scrape_reports() - before)
+            report["phases"]["contention"] = run_phase(app, pool, concurrency, seed + 1, until=done)
+            report["scrape_s"] = round(time.monotonic() - started, 1) if done() else None
+    finally:
+        app.stop()
+        if replay:
+            replay.stop()
+            report["replay"] = replay.stats
+        shutil.rmtree(work_dir, ignore_errors=True)
+    save_report(report, os.path.join(LOAD_DIR, 'reports'))
+    return report
+
+def parse_args(argv):
+    options = {}
+    types = {"--scale": ("scale", float), "--seed": ("seed", int), "--concurrency": ("concurrency", int),
+             "--duration": ("duration", float), "--workers": ("workers", int),
+             "--mix": ("mix", lambda v: tuple(n for n in v.split(',') if n in MIX))}
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--contention":
+            options["contention"] = True
+            i += 1
+        elif argv[i] in types and i + 1 < len(argv):
+            key, convert = types[argv[i]]
+            options[key] = convert(argv[i + 1])
+            i += 2
+        else:
+            print(f"Unknown option {argv[i]}")
+            sys.exit(2)
+    return options
+
+if __name__ == "__main__":
+    report = run_load_test(**parse_args(sys.argv[1:]))
+    mode = f"{report['workers']} uvicorn workers" if report["workers"] else "in-process"
+    print(f"\nload test: {report['db']}, {mode}, concurrency {report['concurrency']}")
+    for name, phase in report["phases"].items():
+        print_phase(name, phase)
+    if "scrape_s" in report:
+        print(f"\nScrape finished in {report['scrape_s']}s" if report["scrape_s"] else "\nScrape did not finish")
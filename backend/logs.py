@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Leveled logging for the scraper and parsers.
+#
+#   SUB5_LOG_LEVEL=DEBUG        console level (default INFO)
+#   SUB5_LOG_JSON=run.jsonl     also write every record, DEBUG included, as JSON lines
+#
+# Per-file and per-event diagnostics (detected format, where a date came from, ...) are
+# not logged one by one. They call count() instead, and the caller logs one summary line
+# (see log_counters) and puts the counts in the run report. Warnings are rate-limited per
+# unformatted message, so pass values as arguments (log.warning("... %s", name)): after
+# WARN_BURST in WARN_WINDOW seconds the rest are only counted, and the next one that gets
+# through says how many were suppressed.
+
+LOGGER_NAME = "sub5"
+LEVEL_ENV = "SUB5_LOG_LEVEL"
+JSON_ENV = "SUB5_LOG_JSON"
+WARN_BURST = 5
+WARN_WINDOW = 60.0
+
+counters = Counter()
+_counters_lock = threading.Lock()
+_configured = False
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus any `fields` passed via extra."""
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if getattr(record, 'suppressed', 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class ConsoleFormatter(logging.Formatter):
+    """Messages look like the old prints; warnings and errors get a [WARN]/[ERROR] tag."""
+    TAGS = {logging.WARNING: "[WARN] ", logging.ERROR: "[ERROR] ", logging.CRITICAL: "[ERROR] "}
+
+    def format(self, record):
+        message = self.TAGS.get(record.levelno, "") + record.getMessage()
+        if getattr(record, 'suppressed', 0):
+            message += f" ({record.suppressed} similar warnings suppressed)"
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+class RateLimitFilter(logging.Filter):
+    """Lets WARN_BURST warnings per (logger, template) through per WARN_WINDOW seconds."""
+    def __init__(self, burst=WARN_BURST, window=WARN_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.state = {}  # (logger, template) -> [window start, emitted, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        # Shared by every handler: decide once per record
+        if hasattr(record, 'rate_allowed'):
+            return record.rate_allowed
+        record.rate_allowed = self._allow(record)
+        return record.rate_allowed
+
+    def _allow(self, record):
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            state = self.state.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self.state[key] = [now, 1, 0]
+                record.suppressed = suppressed
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+        count("log.suppressed")
+        return False
+
+def setup(level=None, json_path=None):
+    """Configures the sub5 loggers once. Arguments override the environment."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    root = logging.getLogger(LOGGER_NAME)
+    root.propagate = False
+    rate_limit = RateLimitFilter()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel((level or os.environ.get(LEVEL_ENV) or "INFO").upper())
+    console.setFormatter(ConsoleFormatter())
+    console.addFilter(rate_limit)
+    root.addHandler(console)
+
+    json_path = json_path or os.environ.get(JSON_ENV)
+    if json_path:
+        handler = logging.FileHandler(json_path, encoding='utf-8')
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(JsonLinesFormatter())
+        handler.addFilter(rate_limit)
+        root.addHandler(handler)
+
+    # The logger level is the lowest any handler wants, so disabled debug() calls return
+    # before a record is built
+    root.setLevel(min(h.level for h in root.handlers))
+
+def get_logger(name):
+    setup()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+def count(key, n=1):
+    with _counters_lock:
+        counters[key] += n
+
+def drain_counters():
+    """Returns the counts since the last drain and resets them."""
+    with _counters_lock:
+        drained = dict(counters)
+        counters.clear()
+    return drained
+
+def log_counters(logger, title, counts):
+    """One INFO line per group: 'title: date.web=3, date.content=10' (grouped by key prefix)."""
+    if not counts:
+        return
+    groups = {}
+    for key, value in sorted(counts.items()):
+        groups.setdefault(key.split('.', 1)[0], []).append(f"{key.split('.', 1)[-1]}={value}")
+    for group, items in groups.items():
+        logger.info(f"  {title} {group}: {', '.join(items)}", extra={"fields": {
+            "summary": title, "group": group,
+            "counts": {k: v for k, v in counts.items() if k.split('.', 1)[0] == group}}})
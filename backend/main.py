@@ -1,16 +1,33 @@
 import sqlite3
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 import os
-import requests
-from bs4 import BeautifulSoup
 import re
 try:
-    from backend.scraper import Sub5Scraper
+    from backend.database import attach_relay_legs, lookup_id, lookup_season_ids, has_search_index, search, changes_since
+    from backend.team_names import TeamNameNormalizer
+    from backend.meet_dates import unknown_date_meets
+    from backend.run_report import load_reports
+    from backend.profiling import profiled
+    from backend.jobs import JobManager, run_scrape
+    from backend.staging import ConnectionPool
+    from backend import queries
 except ImportError:
-    from scraper import Sub5Scraper
+    from database import attach_relay_legs, lookup_id, lookup_season_ids, has_search_index, search, changes_since
+    from team_names import TeamNameNormalizer
+    from meet_dates import unknown_date_meets
+    from run_report import load_reports
+    from profiling import profiled
+    from jobs import JobManager, run_scrape
+    from staging import ConnectionPool
+    import queries
+
+# Only what the read endpoints need is imported here. requests, BeautifulSoup and the
+# scraper (with the parser stack behind it) are imported by the endpoints that use them, on
+# first call, which keeps cold starts short (bench_startup.py measures them).
 
 app = FastAPI()
 
@@ -23,50 +40,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'track_app.db')
+# SUB5_DB_PATH points the API (and the scrapes it starts) at another database, e.g. load_test.py's
+DB_PATH = os.environ.get("SUB5_DB_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'track_app.db')
+
+# Read connections are pooled; a scrape publishes its staged DB through the pool, so requests
+# move to the new data between queries and never wait on the writer (staging.py)
+pool = ConnectionPool(DB_PATH)
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-# Global status for progress tracking
-scrape_status = {
-    "is_active": False,
-    "message": "Idle",
-    "progress": 0,
-    "inserted": 0
-}
+    return pool.connect()
+
+# Scrapes run as jobs: queued, one sub-job per season, cancellable, pushed over SSE (jobs.py)
+jobs = JobManager()
 
 @app.get("/athletes")
+@profiled("api")
 def get_athletes(team: Optional[str] = None, year: Optional[str] = None, season: Optional[str] = None):
     conn = get_db_connection()
-    query = '''
-        SELECT DISTINCT athletes.* 
-        FROM athletes 
-        JOIN performances ON athletes.id = performances.athlete_id 
-        WHERE 1=1
-    '''
-    params = []
+    # Resolve text filters to dimension ids up front so the joins are integer lookups
+    team_id = None
+    season_ids = None
     if team and team != 'All':
-        query += ' AND performances.team = ?'
-        params.append(team)
-    if year and year != 'All':
-        query += ' AND performances.season LIKE ?'
-        params.append(f'{year}%')
-    if season and season != 'All':
-        query += ' AND performances.season LIKE ?'
-        params.append(f'%{season}')
-    
+        team_id = lookup_id(conn, 'teams', name=team)
+        if team_id is None:
+            conn.close()
+            return []
+    if (year and year != 'All') or (season and season != 'All'):
+        season_ids = lookup_season_ids(conn,
+                                       year if year != 'All' else None,
+                                       season if season != 'All' else None)
+        if not season_ids:
+            conn.close()
+            return []
+
+    query, params = queries.athletes_query(team_id, season_ids)
     athletes = conn.execute(query, params).fetchall()
     conn.close()
     return [dict(ix) for ix in athletes]
 
 @app.get("/teams")
+@profiled("api")
 def get_teams():
     conn = get_db_connection()
     # Fetch teams and apply a basic filter to exclude likely junk (like stray athlete names)
-    raw_teams = conn.execute('SELECT DISTINCT team FROM performances WHERE team IS NOT NULL AND team != "Unknown" AND team != "" ORDER BY team').fetchall()
+    query, params = queries.teams_query()
+    raw_teams = conn.execute(query, params).fetchall()
     conn.close()
     
     filtered_teams = []
@@ -85,34 +103,70 @@ def get_teams():
     return filtered_teams
 
 @app.get("/athletes/{athlete_id}/performances")
+@profiled("api")
 def get_athlete_performances(athlete_id: int, team: Optional[str] = None):
     conn = get_db_connection()
-    query = 'SELECT * FROM performances WHERE athlete_id = ?'
-    params = [athlete_id]
+    team_id = None
     if team:
-        query += ' AND team = ?'
-        params.append(team)
-    query += ' ORDER BY date DESC'
-    performances = conn.execute(query, params).fetchall()
+        team_id = lookup_id(conn, 'teams', name=team)
+        if team_id is None:
+            conn.close()
+            return []
+    query, params = queries.athlete_performances_query(athlete_id, team_id)
+    performances = [dict(ix) for ix in conn.execute(query, params).fetchall()]
+    attach_relay_legs(conn, performances)
     conn.close()
-    return [dict(ix) for ix in performances]
+    return performances
 
 @app.get("/performances")
+@profiled("api")
 def get_all_performances(team: Optional[str] = None):
     conn = get_db_connection()
-    query = '''
-        SELECT performances.*, athletes.name as athlete_name 
-        FROM performances 
-        JOIN athletes ON performances.athlete_id = athletes.id 
-    '''
-    params = []
+    team_id = None
     if team:
-        query += ' WHERE performances.team = ?'
-        params.append(team)
-    query += ' ORDER BY date DESC'
-    performances = conn.execute(query, params).fetchall()
+        team_id = lookup_id(conn, 'teams', name=team)
+        if team_id is None:
+            conn.close()
+            return []
+    query, params = queries.performances_query(team_id)
+    performances = [dict(ix) for ix in conn.execute(query, params).fetchall()]
+    attach_relay_legs(conn, performances)
     conn.close()
-    return [dict(ix) for ix in performances]
+    return performances
+
+@app.get("/search")
+@profiled("api")
+def search_entities(q: str = "", limit: int = 10):
+    """Typeahead over athlete, team and meet names (prefix match, best match first)."""
+    limit = max(1, min(limit, 50))
+    conn = get_db_connection()
+    try:
+        if not has_search_index(conn):
+            raise HTTPException(status_code=503, detail="Search index unavailable (SQLite built without FTS5)")
+        return search(conn, q, limit)
+    finally:
+        conn.close()
+
+@app.get("/changes")
+@profiled("api")
+def get_changes(since: int = 0, epoch: Optional[str] = None, limit: int = 5000):
+    """Performances and athletes changed after version `since` (database.changes_since).
+    Pass back the `epoch` and `version` from the previous response; on `reset`, reload
+    /performances and /athletes and continue from the new `version`."""
+    conn = get_db_connection()
+    try:
+        return changes_since(conn, since, epoch, max(1, min(limit, 50000)))
+    finally:
+        conn.close()
+
+@app.get("/meets/unknown-dates")
+def get_unknown_date_meets():
+    """Meets whose date could not be resolved; each needs a manual_fixes.json entry."""
+    conn = get_db_connection()
+    try:
+        return unknown_date_meets(conn)
+    finally:
+        conn.close()
 
 class PerformanceListRequest(BaseModel):
     url: str
@@ -135,6 +189,7 @@ PVC_SMALL_SCHOOLS = {
     "Sumner": "Sumner",
     "Washington A": "Washington Academy"
 }
+PVC_NORMALIZER = TeamNameNormalizer(PVC_SMALL_SCHOOLS)
 
 def parse_sub5_text(text, current_results, season):
     # Pattern to identify event headers: e.g. "Girls 55m Dash"
@@ -178,7 +233,7 @@ def parse_sub5_text(text, current_results, season):
                 season_year = perf_match.group(8)
             
             # Filter for PVC Small Schools
-            matched_pvc = next((full for abbrev, full in PVC_SMALL_SCHOOLS.items() if abbrev.lower() in team.lower()), None)
+            matched_pvc = PVC_NORMALIZER.find(team)
             
             if matched_pvc:
                 current_results.append({
@@ -209,7 +264,7 @@ def parse_sub5_text(text, current_results, season):
                 season_year = relay_match.group(7)
             
             # Filter for PVC Small Schools
-            matched_pvc = next((full for abbrev, full in PVC_SMALL_SCHOOLS.items() if abbrev.lower() in team.lower()), None)
+            matched_pvc = PVC_NORMALIZER.find(team)
             
             if matched_pvc:
                 current_results.append({
@@ -227,6 +282,8 @@ def parse_sub5_text(text, current_results, season):
 @app.post("/analyze-performance-list")
 def analyze_performance_list(request: PerformanceListRequest):
     print(f"Analyzing URL: {request.url}")
+    import requests
+    from bs4 import BeautifulSoup
     try:
         headers = {'User-Agent': 'Mozilla/5.0'}
         response = requests.get(request.url, headers=headers)
@@ -244,6 +301,8 @@ def analyze_performance_list(request: PerformanceListRequest):
 
 @app.post("/analyze-latest-emitl")
 def analyze_latest_emitl():
+    import requests
+    from bs4 import BeautifulSoup
     configs = [
         {"url": "https://sub5.com/youth-pages/indoor-track/", "season": "Indoor"},
         {"url": "https://sub5.com/youth-pages/outdoor-track/", "season": "Outdoor"}
@@ -286,40 +345,67 @@ def analyze_latest_emitl():
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-def run_scrape_in_background(full=False):
-    global scrape_status
-    scrape_status["is_active"] = True
-    scrape_status["message"] = "Starting scrape..."
-    scrape_status["progress"] = 0
-    scrape_status["inserted"] = 0
-    
-    def on_progress(msg, prog):
-        scrape_status["message"] = msg
-        if prog is not None:
-            scrape_status["progress"] = prog
-
+def load_scraper():
     try:
-        scraper = Sub5Scraper(progress_callback=on_progress)
-        count = scraper.run_full_scrape(wipe=full)
-        scrape_status["inserted"] = count
-        scrape_status["message"] = f"Finished. {count} results updated."
-    except Exception as e:
-        scrape_status["message"] = f"Error: {str(e)}"
-    finally:
-        scrape_status["is_active"] = False
+        from backend.scraper import Sub5Scraper
+    except ImportError:
+        from scraper import Sub5Scraper
+    return Sub5Scraper
+
+def start_scrape(full=False):
+    def target(manager, job):
+        Sub5Scraper = load_scraper()
+        scraper = Sub5Scraper(db_path=DB_PATH, progress_callback=manager.progress, publish=pool.publish)
+        return run_scrape(manager, job, scraper, wipe=full)
+    return jobs.submit("scrape", target, full=full)
 
 @app.post("/scrape/sub5")
-def scrape_sub5(background_tasks: BackgroundTasks, full: bool = False):
-    """Scrapes only the current 2025-2026 indoor season."""
-    if scrape_status["is_active"]:
-        return {"status": "busy", "message": "Scrape already in progress"}
-    
-    background_tasks.add_task(run_scrape_in_background, full=full)
-    return {"status": "started"}
+def scrape_sub5(full: bool = False):
+    """Queues a scrape of every season; it starts once any earlier scrape has finished."""
+    latest = jobs.latest("scrape")
+    busy = latest is not None and latest.state in ("queued", "running")
+    job = start_scrape(full=full)
+    return {"status": "queued" if busy else "started", "job_id": job.id}
 
 @app.get("/scrape/status")
-def get_scrape_status():
-    return scrape_status
+def get_scrape_status(reports: int = 5):
+    """Status of the latest scrape job plus the last `reports` run reports (run_report.py)."""
+    job = jobs.latest("scrape")
+    status = {"is_active": False, "message": "Idle", "progress": 0, "inserted": 0, "job": None}
+    if job is not None:
+        status.update(is_active=job.state in ("queued", "running"), message=job.message,
+                      progress=job.progress, inserted=(job.result or {}).get("inserted", 0),
+                      job=job.to_dict())
+    return {**status, "reports": load_reports(max(0, min(reports, 50)))}
+
+@app.post("/jobs/scrape")
+def submit_scrape_job(full: bool = False):
+    return start_scrape(full=full).to_dict()
+
+@app.get("/jobs")
+def list_jobs(limit: int = 20):
+    """Current and recent jobs, newest first, with their sub-jobs."""
+    return jobs.list(max(1, min(limit, 50)))
+
+@app.get("/jobs/events")
+def job_events(job: Optional[str] = None):
+    """Server-Sent Events ("job" events, one per change) for every job, or one job and its sub-jobs."""
+    return StreamingResponse(jobs.events(job), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 @app.get("/health")
 def health_check():
@@ -328,6 +414,7 @@ def health_check():
 @app.get("/meet-data")
 def get_meet_data():
     sheet_url = "https://docs.google.com/spreadsheets/d/1iWUERpoQgetunqBOCZM2ep8HOhdX1RcLw59uJaA5hCY/export?format=csv"
+    import requests
     try:
         response = requests.get(sheet_url)
         response.raise_for_status()
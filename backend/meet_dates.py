@@ -0,0 +1,212 @@
+import os
+import re
+import sys
+import json
+import sqlite3
+from datetime import date as Date, datetime
+try:
+    from backend import queries
+    from backend.database import create_schema
+    from backend.logs import get_logger, count
+except ImportError:
+    import queries
+    from database import create_schema
+    from logs import get_logger, count
+
+log = get_logger("meet_dates")
+
+# Meet date resolution.
+#
+# A meet's date is resolved once, when it is first synced. The chosen date, where it
+# came from and a confidence are stored on the meets row. Re-syncs reuse it, and
+# GET /meets/unknown-dates lists the meets that still need a manual fix.
+# Sources, in priority order:
+
+WEB_DATES_PATH = os.path.join(os.path.dirname(__file__), 'web_date_mapping.json')
+
+SOURCE_CONFIDENCE = {
+    "manual": 1.0,    # manual_fixes.json meet_corrections
+    "web": 0.9,       # date column of the sub5 index page (web_date_mapping.json)
+    "content": 0.8,   # date printed in the results file
+    "filename": 0.6,  # "27dec2025" / "12-27-2025" in the file name
+    "unknown": 0.0,
+}
+
+MONTHS = {'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'may': '05', 'jun': '06',
+          'jul': '07', 'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'}
+FILENAME_DMY = re.compile(r'(\d{1,2})([a-z]{3})(\d{4})')
+FILENAME_MDY = re.compile(r'(\d{1,2})[-_](\d{1,2})[-_](\d{4})')
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+# Month DD, YYYY or Month DD-DD, YYYY
+WEB_DATE = re.compile(r'([A-Z][a-z]+ \d{1,2}(?:-\d{1,2})?, \d{4})')
+
+def web_dates_from_soup(soup):
+    """
+    {result filename: 'December 27, 2025'} from a parsed sub5 index page.
+    Tables on sub5 often look like <tr><td>Date</td><td><a href="results.htm">Meet</a></td></tr>;
+    a date row applies to the links below it until the next date.
+    """
+    mapping = {}
+    for table in soup.find_all('table'):
+        current_date = None
+        for row in table.find_all('tr'):
+            if not row.find(['td', 'th']):
+                continue
+            date_match = WEB_DATE.search(row.get_text())
+            if date_match:
+                current_date = date_match.group(1)
+            if not current_date:
+                continue
+            for a in row.find_all('a', href=True):
+                filename = os.path.basename(a['href'])
+                if filename.endswith(('.htm', '.html')):
+                    mapping[filename] = current_date
+    return mapping
+
+def load_web_dates(path=WEB_DATES_PATH):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {}
+
+def save_web_dates(mapping, path=WEB_DATES_PATH):
+    # Write-then-rename so an interrupted crawl never leaves a truncated file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(mapping, f, indent=4)
+    os.replace(tmp_path, path)
+
+def parse_web_date(date_str):
+    """Converts 'December 27, 2025' or 'Dec 20-22, 2025' to YYYY-MM-DD."""
+    if not date_str: return None
+    # Handle ranges like "December 20-22, 2025" -> take first day
+    date_str = re.sub(r'(\d{1,2})-\d{1,2}', r'\1', date_str)
+    for fmt in ("%B %d, %Y", "%b %d, %Y"):
+        try:
+            return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return None
+
+def normalize_date(date_str):
+    """Manual fixes may be written as 1/10/2025; everything stored is YYYY-MM-DD."""
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+        except (TypeError, ValueError):
+            pass
+    return date_str
+
+def season_bounds(season, year):
+    """(first, last) ISO day of a season, or None when any date is accepted."""
+    year_val = int(year)
+    if season == "Indoor":
+        # Indoor Y goes from Nov (Y-1) to Mar (Y)
+        return f"{year_val - 1}-11-01", f"{year_val}-03-31"
+    if season == "Outdoor":
+        # Outdoor Y goes from Mar (Y) to June (Y)
+        return f"{year_val}-03-01", f"{year_val}-06-30"
+    return None
+
+def in_season(date_str, bounds):
+    """ISO strings compare in date order, so this is two string comparisons."""
+    if not date_str or not ISO_DATE.match(date_str):
+        return False
+    try:
+        Date.fromisoformat(date_str)
+    except ValueError:
+        return False
+    return bounds is None or bounds[0] <= date_str <= bounds[1]
+
+def filename_date(filename):
+    fn_low = filename.lower()
+    m1 = FILENAME_DMY.search(fn_low)
+    if m1:
+        d_part, m_part, y_part = m1.group(1).zfill(2), m1.group(2), m1.group(3)
+        return f"{y_part}-{MONTHS[m_part]}-{d_part}" if m_part in MONTHS else None
+    m2 = FILENAME_MDY.search(fn_low)
+    if m2:
+        return f"{m2.group(3)}-{m2.group(1).zfill(2)}-{m2.group(2).zfill(2)}"
+    return None
+
+class MeetDateResolver:
+    def __init__(self, web_date_mapping, fixes):
+        self.web_date_mapping = web_date_mapping
+        self.fixes = fixes
+        self._bounds = {}
+
+    def bounds(self, season, year):
+        key = (season, year)
+        if key not in self._bounds:
+            try:
+                self._bounds[key] = season_bounds(season, year)
+            except (TypeError, ValueError):
+                self._bounds[key] = None
+        return self._bounds[key]
+
+    def resolve(self, filename, meet_name, content_date, season, year):
+        """Returns (date, source, confidence). date is "Unknown" when nothing fits."""
+        # Manual Fixes take priority over everything
+        fixed = self.fixes.meet_date(meet_name, filename)
+        if fixed:
+            log.debug("Applied manual fix for %s: %s", filename, fixed)
+            count("date.manual")
+            return normalize_date(fixed), "manual", SOURCE_CONFIDENCE["manual"]
+
+        bounds = self.bounds(season, year)
+        web_raw = self.web_date_mapping.get(filename) or self.web_date_mapping.get(os.path.splitext(filename)[0] + ".htm")
+        if web_raw:
+            web_date = parse_web_date(web_raw)
+            if in_season(web_date, bounds):
+                log.debug("Using web date mapping for %s: %s", filename, web_date)
+                count("date.web")
+                return web_date, "web", SOURCE_CONFIDENCE["web"]
+
+        if in_season(content_date, bounds):
+            count("date.content")
+            return content_date, "content", SOURCE_CONFIDENCE["content"]
+        if content_date:
+            log.debug("Rejecting content date %s for %s (outside %s %s)", content_date, filename, season, year)
+            count("date.content_rejected")
+
+        fn_date = filename_date(filename)
+        if in_season(fn_date, bounds):
+            count("date.filename")
+            return fn_date, "filename", SOURCE_CONFIDENCE["filename"]
+
+        count("date.unknown")
+        return "Unknown", "unknown", SOURCE_CONFIDENCE["unknown"]
+
+def stored_meet_dates(cursor):
+    """{meet name: (date, source, confidence)} for meets already resolved to a real date."""
+    cursor.execute('''
+        SELECT name, date, date_source, date_confidence FROM meets
+        WHERE date_source IS NOT NULL AND date_source != 'unknown'
+    ''')
+    return {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+
+def unknown_date_meets(conn):
+    rows = conn.execute(queries.UNKNOWN_DATE_MEETS_QUERY).fetchall()
+    return [{"id": r[0], "name": r[1], "url": r[2] or "", "performances": r[3]} for r in rows]
+
+def print_unknown_dates(conn):
+    meets = unknown_date_meets(conn)
+    if not meets:
+        return
+    print(f"\n!!! [ALERT] {len(meets)} meets have no valid date (content, filename, web mapping or manual_fixes.json).")
+    print("!!! PLEASE ADD THESE TO backend/manual_fixes.json meet_corrections:")
+    for meet in meets:
+        print(f"!!! {{ \"meet_name_fragment\": \"{meet['name']}\", \"new_date\": \"YYYY-MM-DD\" }}  ({meet['performances']} results)")
+    print()
+
+if __name__ == "__main__":
+    db = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.dirname(__file__)), 'track_app.db')
+    conn = sqlite3.connect(db)
+    create_schema(conn)
+    meets = unknown_date_meets(conn)
+    print_unknown_dates(conn)
+    print(f"{len(meets)} meets with unknown dates.")
+    conn.close()
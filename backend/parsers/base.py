@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
 import re
+try:
+    from backend.logs import get_logger, count
+except ImportError:
+    from logs import get_logger, count
+
+log = get_logger("parsers")
 
 class BaseParser(ABC):
     def __init__(self, scraper=None):
@@ -83,7 +89,8 @@ class BaseParser(ABC):
                 header = base_header
         
         if '<HTML>' in header:
-             print(f"!!! BAD HEADER DETECTED IN get_meet_details: '{header}'")
+             count("parse.bad_header")
+             log.warning("Bad header detected in get_meet_details: %r", header)
              
         # Try to find date
         date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{2,4})', text)
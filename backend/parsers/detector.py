@@ -2,6 +2,12 @@ from bs4 import BeautifulSoup
 import re
 from .hytek import HyTekStandardParser, HyTekSMAAParser
 from .formats import FormatDetector as ContentFormatDetector, FormatType
+try:
+    from backend.logs import get_logger, count
+except ImportError:
+    from logs import get_logger, count
+
+log = get_logger("parsers")
 
 class FormatDetector:
     def __init__(self, scraper=None):
@@ -18,13 +24,15 @@ class FormatDetector:
         # Detect format based on content analysis
         fmt = self.detector.detect(text)
         
+        # Counted, not printed per file; the scraper logs the totals
         if fmt == FormatType.SMAA:
-            print(f"  Detected Format: SMAA (No Grade Column)")
+            count("format.smaa")
             return HyTekSMAAParser(self.scraper)
         elif fmt == FormatType.STANDARD:
-            print(f"  Detected Format: Standard Hy-Tek")
+            count("format.standard")
             return HyTekStandardParser(self.scraper)
         else:
             # Fallback to Standard but log warning
-            print(f"  Detected Format: UNKNOWN (Defaulting to Standard)")
+            count("format.unknown")
+            log.warning("Unknown results format in %s (defaulting to Standard Hy-Tek)", url)
             return HyTekStandardParser(self.scraper)
@@ -0,0 +1,148 @@
+import atexit
+import cProfile
+import functools
+import os
+import pstats
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Opt-in profiling for the scraper, parser and API hot paths.
+#
+#   SUB5_PROFILE=all python backend/run_update.py
+#   SUB5_PROFILE=parser,sync python backend/scraper.py
+#   SUB5_PROFILE=api uvicorn backend.main:app
+#   python backend/profiling.py --targets parse,sync backend/run_update.py
+#
+# Targets: parse (Sub5Scraper.parse_all_files), sync (Sub5Scraper.sync_json_to_db),
+# parser (Sub5ColumnParser.parse, once per file) and api (the routes marked @profiled("api")).
+# The decision is made when a module is imported. With the variable unset, @profiled returns
+# the function itself, so a disabled run costs nothing.
+#
+# Each target gets a deterministic profile (cProfile) and a stack sampler. Both accumulate
+# over every call in the process. They are written to PROFILE_DIR as
+# {run}-{target}.prof (pstats: python -m pstats, snakeviz) and
+# {run}-{target}.folded (collapsed stacks: flamegraph.pl, speedscope).
+# A call that starts while another target is being profiled on the same thread is not
+# profiled again; its time shows up inside the outer profile. Calls to one target are
+# serialized while profiling, since a cProfile.Profile can only follow one thread at a time.
+
+PROFILE_ENV = "SUB5_PROFILE"
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'profiles')
+TARGETS = ("parse", "sync", "parser", "api")
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+FLUSH_EVERY = 2.0        # seconds; artifacts are also written at exit
+
+def enabled_targets(value=None):
+    value = os.environ.get(PROFILE_ENV, "") if value is None else value
+    names = {t.strip().lower() for t in value.split(',') if t.strip()}
+    if names & {"1", "all", "true", "yes"}:
+        return set(TARGETS)
+    return names & set(TARGETS)
+
+ENABLED = enabled_targets()
+RUN_ID = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+class _Target:
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+
+_targets = {}
+_active = threading.local()
+
+def _target(name):
+    if name not in _targets:
+        _targets[name] = _Target(name)
+    return _targets[name]
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+def _sample(thread_id, stop, stacks, root_code):
+    """Records the profiled thread's stack every SAMPLE_INTERVAL until stop is set."""
+    while not stop.wait(SAMPLE_INTERVAL):
+        frame = sys._current_frames().get(thread_id)
+        labels = []
+        while frame is not None and frame.f_code is not root_code:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if labels:
+            stacks[';'.join(reversed(labels))] += 1
+
+def _run_profiled(target, func, args, kwargs):
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample, daemon=True,
+                               args=(threading.get_ident(), stop, target.stacks, _run_profiled.__code__))
+    with target.lock:
+        _active.name = target.name
+        sampler.start()
+        target.profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            target.profile.disable()
+            stop.set()
+            sampler.join()
+            _active.name = None
+            target.calls += 1
+            if time.monotonic() - target.last_flush >= FLUSH_EVERY:
+                _flush(target)
+
+def profiled(target_name):
+    """Decorator: profiles the function when target_name is enabled, otherwise returns it unchanged."""
+    def decorate(func):
+        if target_name not in ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_active, 'name', None):
+                return func(*args, **kwargs)
+            return _run_profiled(_target(target_name), func, args, kwargs)
+        return wrapper
+    return decorate
+
+def _flush(target):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{RUN_ID}-{target.name}")
+    try:
+        pstats.Stats(target.profile).dump_stats(base + '.prof')
+    except TypeError:
+        return  # nothing recorded yet
+    with open(base + '.folded', 'w') as f:
+        for stack, count in sorted(target.stacks.items()):
+            f.write(f"{stack} {count}\n")
+    target.last_flush = time.monotonic()
+
+def flush_all():
+    for target in list(_targets.values()):
+        if target.calls:
+            _flush(target)
+            print(f"[profile] {target.name}: {target.calls} calls -> "
+                  f"{os.path.join(PROFILE_DIR, RUN_ID)}-{target.name}.prof/.folded")
+
+if ENABLED:
+    atexit.register(flush_all)
+
+if __name__ == "__main__":
+    # python backend/profiling.py [--targets a,b] script.py [args...]
+    argv = sys.argv[1:]
+    targets = "all"
+    if len(argv) >= 2 and argv[0] == "--targets":
+        targets, argv = argv[1], argv[2:]
+    if not argv:
+        print("usage: python backend/profiling.py [--targets parse,sync,parser,api] script.py [args...]")
+        sys.exit(2)
+    os.environ[PROFILE_ENV] = targets
+    sys.argv = argv
+    # Set before the script imports anything, so its @profiled decorators see it
+    sys.path.insert(0, os.path.dirname(os.path.abspath(argv[0])))
+    runpy.run_path(argv[0], run_name="__main__")
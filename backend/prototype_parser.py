@@ -3,6 +3,10 @@ from bs4 import BeautifulSoup
 import json
 import os
 import sys
+try:
+    from backend.profiling import profiled
+except ImportError:
+    from profiling import profiled
 
 class Sub5ColumnParser:
     def __init__(self, file_path):
@@ -36,6 +40,7 @@ class Sub5ColumnParser:
         
         return best_match
         
+    @profiled("parser")
     def parse(self):
         if not os.path.exists(self.file_path):
             return []
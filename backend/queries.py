@@ -0,0 +1,152 @@
+# SQL used by the API, the exporter and the sync dedup checks.
+# Kept in one place so audit_query_plans.py can EXPLAIN exactly what production runs.
+
+def athletes_query(team_id=None, season_ids=None):
+    """Athletes with an individual result, or a relay leg, matching the filters."""
+    filters = ''
+    params = []
+    if team_id is not None:
+        filters += ' AND performances.team_id = ?'
+        params.append(team_id)
+    if season_ids:
+        filters += f' AND performances.season_id IN ({",".join("?" * len(season_ids))})'
+        params.extend(season_ids)
+
+    query = f'''
+        SELECT athletes.*
+        FROM athletes
+        JOIN performances ON athletes.id = performances.athlete_id
+        WHERE 1=1 {filters}
+        UNION
+        SELECT athletes.*
+        FROM performances
+        JOIN relays ON relays.performance_id = performances.id
+        JOIN relay_legs ON relay_legs.relay_id = relays.id
+        JOIN athletes ON athletes.id = relay_legs.athlete_id
+        WHERE performances.athlete_id IS NULL {filters}
+    '''
+    return query, params + params
+
+def teams_query():
+    query = '''
+        SELECT name AS team FROM teams
+        WHERE name IS NOT NULL AND name != 'Unknown' AND name != ''
+          AND EXISTS (SELECT 1 FROM performances WHERE performances.team_id = teams.id)
+        ORDER BY name
+    '''
+    return query, []
+
+def athlete_performances_query(athlete_id, team_id=None):
+    """Individual results plus relays the athlete ran a leg on (both index lookups)."""
+    team_filter = ''
+    params = [athlete_id, athlete_id]
+    if team_id is not None:
+        # Unary + keeps the planner on the athlete index; a team has far more rows than an athlete
+        team_filter = ' AND +team_id = ?'
+        params = [athlete_id, team_id, athlete_id, team_id]
+    query = f'''
+        SELECT * FROM performance_details WHERE athlete_id = ?{team_filter}
+        UNION ALL
+        SELECT performance_details.* FROM relay_legs
+        JOIN relays ON relays.id = relay_legs.relay_id
+        JOIN performance_details ON performance_details.id = relays.performance_id
+        WHERE relay_legs.athlete_id = ?{team_filter}
+        ORDER BY date DESC
+    '''
+    return query, params
+
+def performances_query(team_id=None):
+    query = '''
+        SELECT performance_details.*, athletes.name as athlete_name
+        FROM performance_details
+        LEFT JOIN athletes ON performance_details.athlete_id = athletes.id
+    '''
+    params = []
+    if team_id is not None:
+        query += ' WHERE performance_details.team_id = ?'
+        params.append(team_id)
+    query += ' ORDER BY date DESC'
+    return query, params
+
+def performances_by_id_query(performance_ids):
+    """/performances rows for a set of ids (GET /changes)."""
+    placeholders = ','.join('?' * len(performance_ids))
+    query = f'''
+        SELECT performance_details.*, athletes.name as athlete_name
+        FROM performance_details
+        LEFT JOIN athletes ON performance_details.athlete_id = athletes.id
+        WHERE performance_details.id IN ({placeholders})
+    '''
+    return query, list(performance_ids)
+
+def athletes_by_id_query(athlete_ids):
+    placeholders = ','.join('?' * len(athlete_ids))
+    return f'SELECT athletes.* FROM athletes WHERE athletes.id IN ({placeholders})', list(athlete_ids)
+
+def relay_legs_query(performance_ids):
+    placeholders = ','.join('?' * len(performance_ids))
+    query = f'''
+        SELECT relays.performance_id, relay_legs.leg, relay_legs.athlete_id,
+               relay_legs.split, athletes.name
+        FROM relays
+        JOIN relay_legs ON relay_legs.relay_id = relays.id
+        JOIN athletes ON athletes.id = relay_legs.athlete_id
+        WHERE relays.performance_id IN ({placeholders})
+        ORDER BY relays.performance_id, relay_legs.leg
+    '''
+    return query, list(performance_ids)
+
+# export_for_web: one shard per (team, season)
+EXPORT_SHARDS_QUERY = '''
+    SELECT DISTINCT team_id, season_id FROM performances
+    ORDER BY team_id, season_id
+'''
+
+EXPORT_SHARD_QUERY = '''
+    SELECT performance_details.*, athletes.name as athlete_name
+    FROM performance_details
+    LEFT JOIN athletes ON performance_details.athlete_id = athletes.id
+    WHERE performance_details.team_id IS ? AND performance_details.season_id IS ?
+    ORDER BY date DESC
+'''
+
+SYNCED_MEETS_QUERY = '''
+    SELECT name FROM meets
+    WHERE EXISTS (SELECT 1 FROM performances WHERE performances.meet_id = meets.id)
+'''
+
+PERFORMANCE_EXISTS_QUERY = '''
+    SELECT id FROM performances
+    WHERE athlete_id=? AND event_id=? AND mark=? AND date=?
+'''
+
+# Meets still waiting for a manual date fix (see meet_dates.py)
+UNKNOWN_DATE_MEETS_QUERY = '''
+    SELECT meets.id, meets.name, meets.url,
+           (SELECT COUNT(*) FROM performances WHERE performances.meet_id = meets.id) AS performances
+    FROM meets
+    WHERE meets.date_source = 'unknown' OR meets.date IS NULL OR meets.date = 'Unknown'
+    ORDER BY meets.name
+'''
+
+# Relays have no athlete, so the team tells them apart
+RELAY_EXISTS_QUERY = '''
+    SELECT id FROM performances
+    WHERE athlete_id IS NULL AND event_id=? AND mark=? AND date=? AND team_id=?
+'''
+
+# Typeahead: rank is the bm25 weighting configured in database.create_search_index
+SEARCH_QUERY = '''
+    SELECT kind, ref_id, label, detail FROM search_index
+    WHERE search_index MATCH ?
+    ORDER BY rank
+    LIMIT ?
+'''
+
+# GET /changes: a page of the change log (database.changes_since)
+CHANGES_QUERY = '''
+    SELECT seq, entity, entity_id, op FROM change_log
+    WHERE seq > ?
+    ORDER BY seq
+    LIMIT ?
+'''
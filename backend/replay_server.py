@@ -0,0 +1,204 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+# Local stand-in for sub5.com, for offline and repeatable scraper runs.
+#
+#   python backend/replay_server.py [ROOT] [--port 8555] [--latency 50] [--jitter 20]
+#                                   [--error-rate 0.05] [--fail-first 1] [--rate 20] [--bandwidth 256]
+#   SUB5_BASE_URL=http://127.0.0.1:8555 python backend/scraper.py
+#
+# ROOT is laid out like backend/data/sub5_archive (the default): {year}/*.htm result files,
+# plus optional {year}.html index pages (synth_corpus.py writes both). A season page
+# (/youth-pages/indoor-track/{year}-indoor-results/) is served from {year}.html, or else
+# generated with a link to every file in {year}/. Any other path is served by its last two
+# segments ({year}/{file}), so the links in real and generated index pages both work.
+#
+# Faults, all deterministic for a given --seed and request order:
+#   latency/jitter  milliseconds before each response
+#   error_rate      fraction of requests answered with 500
+#   fail_first      the first N requests for each path get a 503, for exercising retries
+#   rate            requests per second over all clients; the excess gets a 429 with Retry-After
+#   bandwidth       KB/s per response body
+# Counts of requests, bytes and each kind of failure are kept in ReplayServer.stats.
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(__file__), 'data', 'sub5_archive')
+DEFAULT_PORT = 8555
+SEASON_PAGE = re.compile(r'/(20\d{2})-indoor-results/?$')
+CHUNK_SIZE = 16 * 1024
+
+class ReplayServer:
+    def __init__(self, root=DEFAULT_ROOT, port=0, latency=0, jitter=0, error_rate=0.0,
+                 fail_first=0, rate=None, bandwidth=None, seed=1):
+        self.root = root
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.rate = rate
+        self.bandwidth = bandwidth * 1024 if bandwidth else None
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.seen = {}           # path -> requests so far
+        self.window = (0.0, 0)   # (second, requests in it) for the rate limit
+        self.stats = dict.fromkeys(("requests", "bytes", "not_found", "errors", "fail_first", "throttled"), 0)
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self.handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        """Serves from a background thread; returns self so it can be used in a with block."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def resolve(self, path):
+        """(body bytes, content type) for a request path, or None."""
+        season = SEASON_PAGE.search(path)
+        if season:
+            year = season.group(1)
+            index_path = os.path.join(self.root, f"{year}.html")
+            if os.path.exists(index_path):
+                with open(index_path, 'rb') as f:
+                    return f.read(), "text/html"
+            year_dir = os.path.join(self.root, year)
+            if os.path.isdir(year_dir):
+                return generated_index(year, sorted(os.listdir(year_dir)), self.years()).encode('utf-8'), "text/html"
+            return None
+        parts = [p for p in path.split('/') if p]
+        if len(parts) >= 2:
+            file_path = os.path.join(self.root, parts[-2], parts[-1])
+            if os.path.isfile(file_path) and '..' not in parts:
+                with open(file_path, 'rb') as f:
+                    return f.read(), "text/html"
+        return None
+
+    def years(self):
+        return sorted(n for n in os.listdir(self.root) if re.fullmatch(r'20\d{2}', n))
+
+    def fault(self, path):
+        """Waits out the latency, counts the request and returns (status, headers) to fail it with, or None."""
+        with self.lock:
+            self.stats["requests"] += 1
+            seen = self.seen.get(path, 0)
+            self.seen[path] = seen + 1
+            delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+            failure = None
+            if self.rate:
+                second = int(time.monotonic())
+                start, count = self.window
+                count = count + 1 if start == second else 1
+                self.window = (second, count)
+                if count > self.rate:
+                    self.stats["throttled"] += 1
+                    failure = 429, {"Retry-After": "1"}
+            if failure is None and seen < self.fail_first:
+                self.stats["fail_first"] += 1
+                failure = 503, {}
+            if failure is None and self.error_rate and self.rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                failure = 500, {}
+        if delay > 0:
+            time.sleep(delay)
+        return failure
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = unquote(urlparse(self.path).path)
+                failure = server.fault(path)
+                if failure:
+                    status, headers = failure
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                found = server.resolve(path)
+                if found is None:
+                    with server.lock:
+                        server.stats["not_found"] += 1
+                    self.send_error(404)
+                    return
+                body, content_type = found
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                for i in range(0, len(body), CHUNK_SIZE):
+                    chunk = body[i:i + CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    if server.bandwidth:
+                        time.sleep(len(chunk) / server.bandwidth)
+                with server.lock:
+                    server.stats["bytes"] += len(body)
+
+            def log_message(self, format, *args):
+                pass  # one line per request drowns the scraper's output
+
+        return Handler
+
+def generated_index(year, filenames, years):
+    """A season page like sub5's: links to the other seasons, then one row per result file."""
+    seasons = " - ".join(f'<a href="/youth-pages/indoor-track/{y}-indoor-results/">{y}</a>' for y in years)
+    rows = "\n".join(f'<tr><td><a href="/results/{year}/{name}">{name}</a></td></tr>'
+                     for name in filenames if name.lower().endswith(('.htm', '.html')))
+    return (f"<html><body><h1>{year} Indoor Results</h1>\n<p>{seasons}</p>\n<table>\n{rows}\n</table>\n"
+            "</body></html>\n")
+
+def parse_args(argv):
+    """Returns (root, port, ReplayServer keyword arguments)."""
+    options = {}
+    root = DEFAULT_ROOT
+    port = DEFAULT_PORT
+    numeric = {"--latency": ("latency", float), "--jitter": ("jitter", float),
+               "--error-rate": ("error_rate", float), "--fail-first": ("fail_first", int),
+               "--rate": ("rate", float), "--bandwidth": ("bandwidth", float), "--seed": ("seed", int)}
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--port" and i + 1 < len(argv):
+            port = int(argv[i + 1])
+            i += 2
+        elif argv[i] in numeric and i + 1 < len(argv):
+            key, convert = numeric[argv[i]]
+            options[key] = convert(argv[i + 1])
+            i += 2
+        else:
+            root = argv[i]
+            i += 1
+    return root, port, options
+
+if __name__ == "__main__":
+    root, port, options = parse_args(sys.argv[1:])
+    server = ReplayServer(root, port, **options)
+    print(f"Replaying {os.path.abspath(root)} at {server.url}")
+    print(f"  SUB5_BASE_URL={server.url} python backend/scraper.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print("  " + ", ".join(f"{k}={v}" for k, v in server.stats.items()))
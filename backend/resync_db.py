@@ -1,17 +1,28 @@
-from scraper import Sub5Scraper
 import os
+try:
+    from backend.scraper import Sub5Scraper
+except ImportError:
+    from scraper import Sub5Scraper
+
+YEARS = ["2023", "2024", "2025", "2026"]
+
+def resync(scraper, years=YEARS):
+    """Wipes and re-syncs from the parsed JSON in the scraper's data dir, into a staging copy
+    that replaces the DB only if it validates (staging.py)."""
+    scraper.begin_staging(wipe=True)
+    try:
+        scraper.initialize_db(wipe=True)
+        for year in years:
+            json_dir = os.path.join(scraper.data_dir, 'parsed_results', year)
+            if os.path.exists(json_dir):
+                scraper.sync_json_to_db(json_dir, season="Indoor", year=year)
+        scraper.record_applied_fixes()
+        scraper.publish_staging()
+    except Exception:
+        # Drop the half-built copy and the writer lock; the live DB was never touched
+        scraper.discard_staging()
+        raise
 
 if __name__ == "__main__":
-    scraper = Sub5Scraper()
-    # Wipe and re-sync from existing JSON files
-    scraper.initialize_db(wipe=True)
-    
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    years = ["2023", "2024", "2025", "2026"]
-    
-    for year in years:
-        json_dir = os.path.join(base_dir, f'backend/data/parsed_results/{year}')
-        if os.path.exists(json_dir):
-            scraper.sync_json_to_db(json_dir, season="Indoor", year=year)
-            
+    resync(Sub5Scraper())
     print("Sync complete.")
@@ -0,0 +1,201 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Timing and counters for one pipeline run (scrape or export).
+#
+# A run is made of stages (index, download, parse, sync, export), each tagged with the
+# season it belongs to. A stage records wall time, CPU time and counters: files, bytes,
+# rows_inserted, rows_skipped, cache_hits, retries, errors. Files processed inside a
+# stage are timed too. The SLOWEST_FILES slowest per stage are kept in the report, so
+# its size doesn't grow with the archive.
+#
+# finish() writes the report to REPORTS_DIR as JSON; GET /scrape/status returns the latest ones.
+# Stages may run on several threads at once (the per-season jobs in jobs.py): the current
+# stage and file are tracked per thread, so add() counts toward the caller's own stage.
+
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), 'data', 'run_reports')
+KEEP_REPORTS = 50
+SLOWEST_FILES = 10
+COUNTERS = ("files", "bytes", "rows_inserted", "rows_skipped", "cache_hits", "retries", "errors")
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+class Metrics:
+    """Wall/CPU time plus counters for a stage or a file."""
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._start = None
+
+    def start(self):
+        self._start = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        wall, cpu = self._start
+        self.wall += time.perf_counter() - wall
+        self.cpu += time.process_time() - cpu
+
+    def to_dict(self, skip_zero=False):
+        data = {"name": self.name, **self.labels,
+                "wall_s": round(self.wall, 4), "cpu_s": round(self.cpu, 4)}
+        data.update((k, v) for k, v in self.counts.items() if v or not skip_zero)
+        return data
+
+class RunReport:
+    def __init__(self, kind, **info):
+        self.kind = kind
+        self.info = info
+        self.started_at = _now()
+        self.stages = []
+        self.files = {}  # id(stage) -> [file Metrics], trimmed to the slowest
+        self._local = threading.local()
+        self.finished_at = None
+        self.status = "running"
+        self.error = None
+        self.total = Metrics(kind)
+        self.total.start()
+
+    @property
+    def current(self):
+        return getattr(self._local, 'stage', None)
+
+    @current.setter
+    def current(self, stage):
+        self._local.stage = stage
+
+    @property
+    def current_file(self):
+        return getattr(self._local, 'file', None)
+
+    @current_file.setter
+    def current_file(self, metrics):
+        self._local.file = metrics
+
+    @contextmanager
+    def stage(self, name, **labels):
+        stage = Metrics(name, **labels)
+        self.stages.append(stage)
+        previous, self.current = self.current, stage
+        stage.start()
+        try:
+            yield stage
+        except Exception:
+            stage.counts["errors"] += 1
+            raise
+        finally:
+            stage.stop()
+            self.current = previous
+
+    @contextmanager
+    def file(self, name):
+        metrics = Metrics(name)
+        self.add(files=1)
+        previous, self.current_file = self.current_file, metrics
+        metrics.start()
+        try:
+            yield metrics
+        finally:
+            metrics.stop()
+            self.current_file = previous
+            if self.current is not None:
+                files = self.files.setdefault(id(self.current), [])
+                files.append(metrics)
+                if len(files) > SLOWEST_FILES * 4:
+                    files.sort(key=lambda m: -m.wall)
+                    del files[SLOWEST_FILES:]
+
+    def add(self, **counts):
+        """Adds to the current stage and file (no-op outside a stage)."""
+        for target in (self.current, self.current_file):
+            if target is not None:
+                for key, value in counts.items():
+                    target.counts[key] = target.counts.get(key, 0) + value
+
+    def to_dict(self):
+        stages = []
+        for stage in self.stages:
+            data = stage.to_dict()
+            files = sorted(self.files.get(id(stage), []), key=lambda m: -m.wall)[:SLOWEST_FILES]
+            if files:
+                data["slowest_files"] = [f.to_dict(skip_zero=True) for f in files]
+            stages.append(data)
+        totals = dict.fromkeys(COUNTERS, 0)
+        for stage in self.stages:
+            for key in COUNTERS:
+                totals[key] += stage.counts.get(key, 0)
+        by_name = {}
+        for stage in self.stages:
+            entry = by_name.setdefault(stage.name, {"wall_s": 0.0, "cpu_s": 0.0})
+            entry["wall_s"] = round(entry["wall_s"] + stage.wall, 4)
+            entry["cpu_s"] = round(entry["cpu_s"] + stage.cpu, 4)
+        return {
+            "kind": self.kind,
+            **self.info,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "status": self.status,
+            "error": self.error,
+            "wall_s": round(self.total.wall, 4),
+            "cpu_s": round(self.total.cpu, 4),
+            "totals": totals,
+            "stage_totals": by_name,
+            "stages": stages,
+        }
+
+    def finish(self, status="ok", error=None, reports_dir=None):
+        """Stops the clock and writes the report. Returns its path."""
+        self.total.stop()
+        self.finished_at = _now()
+        self.status = status
+        self.error = error
+        return save_report(self.to_dict(), reports_dir)
+
+def save_report(report, reports_dir=None):
+    reports_dir = reports_dir or REPORTS_DIR
+    os.makedirs(reports_dir, exist_ok=True)
+    stamp = report["started_at"].replace(':', '').replace('+0000', 'Z')
+    path = os.path.join(reports_dir, f"{stamp}-{report['kind']}.json")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+
+    names = sorted(n for n in os.listdir(reports_dir) if n.endswith('.json'))
+    for old in names[:-KEEP_REPORTS]:
+        os.remove(os.path.join(reports_dir, old))
+    return path
+
+def load_reports(limit=5, reports_dir=None):
+    """The newest `limit` reports, newest first."""
+    reports_dir = reports_dir or REPORTS_DIR
+    if not os.path.isdir(reports_dir):
+        return []
+    reports = []
+    for name in sorted((n for n in os.listdir(reports_dir) if n.endswith('.json')), reverse=True)[:limit]:
+        try:
+            with open(os.path.join(reports_dir, name), 'r') as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return reports
+
+def print_summary(report):
+    print(f"{report['kind']} run: {report['status']} in {report['wall_s']:.1f}s wall, {report['cpu_s']:.1f}s CPU")
+    for name, t in report["stage_totals"].items():
+        print(f"  {name:<10} {t['wall_s']:8.2f}s wall {t['cpu_s']:8.2f}s CPU")
+    print("  " + ", ".join(f"{k}={v}" for k, v in report["totals"].items()))
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for report in load_reports(limit):
+        print(f"\n{report['started_at']}")
+        print_summary(report)
@@ -5,15 +5,45 @@ import re
 import os
 import json
 import shutil
+import threading
 from datetime import datetime
 try:
     from backend.prototype_parser import Sub5ColumnParser
+    from backend.team_names import TeamNameNormalizer
+    from backend.fixes import ManualFixes, changed_fixes, record_applied, affected_meets
+    from backend.run_report import RunReport, print_summary
+    from backend.staging import StagedDatabase
+    from backend.identity import carry_identity, restore_aliases, restore_candidates
+    from backend.profiling import profiled
+    from backend.logs import get_logger, drain_counters, log_counters
+    from backend.meet_dates import (
+        MeetDateResolver, parse_web_date, in_season, stored_meet_dates, print_unknown_dates,
+        web_dates_from_soup, load_web_dates, save_web_dates, WEB_DATES_PATH
+    )
 except ImportError:
     from prototype_parser import Sub5ColumnParser
+    from team_names import TeamNameNormalizer
+    from fixes import ManualFixes, changed_fixes, record_applied, affected_meets
+    from run_report import RunReport, print_summary
+    from staging import StagedDatabase
+    from identity import carry_identity, restore_aliases, restore_candidates
+    from profiling import profiled
+    from logs import get_logger, drain_counters, log_counters
+    from meet_dates import (
+        MeetDateResolver, parse_web_date, in_season, stored_meet_dates, print_unknown_dates,
+        web_dates_from_soup, load_web_dates, save_web_dates, WEB_DATES_PATH
+    )
 
 # Configuration
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'track_app.db')
 FIXES_PATH = os.path.join(os.path.dirname(__file__), 'manual_fixes.json')
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+# Set SUB5_BASE_URL (or pass base_url) to crawl a mirror, e.g. replay_server.py, and
+# SUB5_DATA_DIR (or data_dir) to keep that run's files out of backend/data
+BASE_URL = "https://sub5.com"
+BASE_URL_ENV = "SUB5_BASE_URL"
+DATA_DIR_ENV = "SUB5_DATA_DIR"
+SEASON_PATH = "/youth-pages/indoor-track/{year}-indoor-results/"
 
 TEAM_MAPPING = {
     "George Steve": "George Stevens Academy",
@@ -96,35 +126,79 @@ TEAM_MAPPING = {
     "Erskine": "Erskine Academy",
 }
 
+TEAM_NORMALIZER = TeamNameNormalizer(TEAM_MAPPING)
+
+log = get_logger("scraper")
+
 try:
     from backend.parsers.detector import FormatDetector
 except ImportError:
     from parsers.detector import FormatDetector
 
+try:
+    from backend.database import (
+        create_schema, insert_relay, get_or_create_team, get_or_create_event,
+        get_or_create_season, get_or_create_meet, load_athlete_cache, refresh_search_index,
+        delete_meet_performances, delete_orphan_athletes, prune_change_log
+    )
+    from backend import queries
+except ImportError:
+    from database import (
+        create_schema, insert_relay, get_or_create_team, get_or_create_event,
+        get_or_create_season, get_or_create_meet, load_athlete_cache, refresh_search_index,
+        delete_meet_performances, delete_orphan_athletes, prune_change_log
+    )
+    import queries
+
 class Sub5Scraper:
-    def __init__(self, db_path=DB_PATH, progress_callback=None):
+    def __init__(self, db_path=DB_PATH, progress_callback=None, base_url=None, data_dir=None, publish=None):
         self.db_path = db_path
+        # Scrapes write to a staging copy that is validated and swapped in at the end (staging.py).
+        # `publish` replaces the plain file swap; the API passes its ConnectionPool's.
+        self.publish = publish
+        self.staging = None
+        # Identity merges read before a wipe, restored after the sync (identity.carry_identity)
+        self.carried = None
+        self.base_url = (base_url or os.environ.get(BASE_URL_ENV) or BASE_URL).rstrip('/')
+        # Archive, parsed JSON and index-page dates; a scratch dir keeps replay runs out of backend/data
+        data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+        self.data_dir = data_dir or DATA_DIR
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.web_dates_path = os.path.join(data_dir, 'web_date_mapping.json') if data_dir else WEB_DATES_PATH
         self.headers = {'User-Agent': 'Mozilla/5.0'}
         self.manual_fixes = self.load_manual_fixes()
+        self.fixes = ManualFixes(self.manual_fixes)
         self.web_date_mapping = self.load_web_date_mapping()
+        self.web_dates_lock = threading.Lock()
+        self.date_resolver = MeetDateResolver(self.web_date_mapping, self.fixes)
         self.progress_callback = progress_callback
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Stage timings and counters (run_report.py); run_full_scrape starts a fresh one
+        self.run = RunReport("scrape")
 
     def _get_with_retry(self, url, max_retries=3):
         for i in range(max_retries):
             try:
                 response = self.session.get(url, timeout=30)
                 response.raise_for_status()
+                self.run.add(bytes=len(response.content))
                 return response
             except Exception as e:
                 if i == max_retries - 1:
                     print(f"Failed to fetch {url} after {max_retries} attempts: {e}")
                     raise
+                self.run.add(retries=1)
                 import time
                 time.sleep(2 ** i) # Exponential backoff
         return None
 
+    def flush_diagnostics(self, title):
+        """Logs the hot-path counters (logs.count) as one summary and adds them to the run report."""
+        counts = drain_counters()
+        log_counters(log, title, counts)
+        self.run.add(**counts)
+
     def report_progress(self, message, progress=None):
         if self.progress_callback:
             self.progress_callback(message, progress)
@@ -133,31 +207,26 @@ class Sub5Scraper:
             print(f"{message}{p_str}")
 
     def load_web_date_mapping(self):
-        mapping_path = os.path.join(os.path.dirname(__file__), 'web_date_mapping.json')
-        if os.path.exists(mapping_path):
-            try:
-                with open(mapping_path, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
+        return load_web_dates(self.web_dates_path)
+
+    def record_web_dates(self, dates):
+        """Adds newly seen index-page dates to web_date_mapping.json (shared with date_resolver)."""
+        # Seasons are fetched in parallel under the job manager
+        with self.web_dates_lock:
+            changed = {k: v for k, v in dates.items() if self.web_date_mapping.get(k) != v}
+            if not changed:
+                return 0
+            self.web_date_mapping.update(changed)
+            save_web_dates(self.web_date_mapping, self.web_dates_path)
+        print(f"Recorded {len(changed)} new web dates.")
+        return len(changed)
+
+    def season_url(self, year):
+        return self.base_url + SEASON_PATH.format(year=year)
 
     def parse_web_date(self, date_str):
         """Converts 'December 27, 2025' or 'Dec 20-22, 2025' to YYYY-MM-DD."""
-        if not date_str: return None
-        # Handle ranges like "December 20-22, 2025" -> take first day
-        date_str = re.sub(r'(\d{1,2})-\d{1,2}', r'\1', date_str)
-        try:
-            # Try full month name
-            dt = datetime.strptime(date_str, "%B %d, %Y")
-            return dt.strftime("%Y-%m-%d")
-        except:
-            try:
-                # Try abbreviated month name
-                dt = datetime.strptime(date_str, "%b %d, %Y")
-                return dt.strftime("%Y-%m-%d")
-            except:
-                return None
+        return parse_web_date(date_str)
 
     def load_manual_fixes(self):
         if os.path.exists(FIXES_PATH):
@@ -171,51 +240,23 @@ class Sub5Scraper:
     def apply_manual_fixes(self, results):
         for r in results:
             # Meet Date Corrections
-            for mc in self.manual_fixes.get('meet_corrections', []):
-                if mc['meet_name_fragment'].lower() in r['meet_name'].lower() or \
-                   mc['meet_name_fragment'].lower() in r.get('meet_url', '').lower():
-                    r['date'] = mc['new_date']
-                    # Adjust season if necessary (shorthand logic)
-                    if '2025' in mc['new_date']:
-                        r['season'] = r['season'].replace('2024', '2025')
+            new_date = self.fixes.meet_date(r['meet_name'], r.get('meet_url', ''))
+            if new_date:
+                r['date'] = new_date
+                # Adjust season if necessary (shorthand logic)
+                if '2025' in new_date:
+                    r['season'] = r['season'].replace('2024', '2025')
         return results
 
     def normalize_team_name(self, name):
-        if not name: return "Unknown"
-        name = name.strip()
-        name = re.sub(r'\s+J[\d\.\-\':]+.*', '', name)
-        for key, val in TEAM_MAPPING.items():
-            if name.lower().startswith(key.lower()):
-                return val
-        return name
+        return TEAM_NORMALIZER.normalize(name)
 
     def normalize_athlete_name(self, name):
-        if not name: return ""
-        name = name.strip()
-        for ac in self.manual_fixes.get('athlete_corrections', []):
-            if ac['old_name'].lower() == name.lower():
-                return ac['new_name']
-        return name
+        return self.fixes.athlete_name(name)
 
     def is_date_in_season(self, date_str, season, year):
         """Strictly validates if a date belongs to a given season."""
-        if not date_str: return False
-        try:
-            dt = datetime.strptime(date_str, "%Y-%m-%d")
-            year_val = int(year)
-            if season == "Indoor":
-                # Indoor Y goes from Nov (Y-1) to Mar (Y)
-                start_date = datetime(year_val - 1, 11, 1)
-                end_date = datetime(year_val, 3, 31)
-                return start_date <= dt <= end_date
-            elif season == "Outdoor":
-                # Outdoor Y goes from Mar (Y) to June (Y)
-                start_date = datetime(year_val, 3, 1)
-                end_date = datetime(year_val, 6, 30)
-                return start_date <= dt <= end_date
-            return True
-        except:
-            return False
+        return in_season(date_str, self.date_resolver.bounds(season, year))
 
     def is_likely_athlete_name(self, name):
         if not name: return True
@@ -268,56 +309,40 @@ class Sub5Scraper:
         else:
             print("Ensuring Database Schema...")
         
+        # A wipe rebuilds athlete ids, so approved merges are carried over by name
+        self.carried = None
+        if wipe:
+            live_path = self.staging.db_path if self.staging else self.db_path
+            self.carried = carry_identity(live_path)
+
         conn = self.get_db_connection()
         try:
-            if wipe:
-                conn.execute('DROP TABLE IF EXISTS performances')
-                conn.execute('DROP TABLE IF EXISTS athletes')
-                conn.execute('DROP TABLE IF EXISTS scraper_history')
-            
-            # Create Tables
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS athletes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE
-                )
-            ''')
-            
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS performances (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    athlete_id INTEGER,
-                    event TEXT,
-                    mark TEXT,
-                    place TEXT,
-                    team TEXT,
-                    date TEXT,
-                    season TEXT,
-                    year TEXT,
-                    meet_name TEXT,
-                    meet_url TEXT,
-                    splits TEXT,
-                    FOREIGN KEY(athlete_id) REFERENCES athletes(id)
-                )
-            ''')
-            
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS scraper_history (
-                    url TEXT PRIMARY KEY,
-                    scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Add Indexes for performance
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_athlete_name ON athletes(name)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_athlete_id ON performances(athlete_id)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_meet_name ON performances(meet_name)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_composite ON performances(athlete_id, event, mark, date)')
-            conn.commit()
+            create_schema(conn, wipe=wipe)
+            if self.carried:
+                self.carried["kept"] = restore_aliases(conn, self.carried)
+                conn.commit()
+                print(f"Carried over {len(self.carried['aliases'])} athlete aliases and "
+                      f"{len(self.carried['candidates'])} merge candidates.")
             print("Database initialized successfully.")
         finally:
             conn.close()
 
+    def restore_identity(self):
+        """Maps the merge candidates carried over a wipe to the rebuilt athletes (after the sync)."""
+        carried, self.carried = self.carried, None
+        if not carried:
+            return
+        conn = self.get_db_connection()
+        try:
+            restore_candidates(conn, carried, carried["kept"])
+        finally:
+            conn.close()
+
+
+    def get_synced_meets(self, cursor):
+        """Names of meets that already have performances in the DB."""
+        cursor.execute(queries.SYNCED_MEETS_QUERY)
+        return {row[0] for row in cursor.fetchall()}
 
     def get_meet_links(self, year_url):
         print(f"Fetching meet links from: {year_url}")
@@ -325,6 +350,9 @@ class Sub5Scraper:
             response = self._get_with_retry(year_url)
             soup = BeautifulSoup(response.text, 'html.parser')
             links = []
+
+            # The same parse feeds the date store (formerly a separate extract_web_dates.py crawl)
+            self.record_web_dates(web_dates_from_soup(soup))
             
             # Sub5 pages sometimes have frames
             frames = soup.find_all(['frame', 'iframe'], src=True)
@@ -348,15 +376,17 @@ class Sub5Scraper:
             return list(set(links))
         except Exception as e:
             print(f"Error fetching meet links from {year_url}: {e}")
+            self.run.add(errors=1)
             return []
 
-    def download_missing_files(self, index_url, archive_dir, synced_meets=None):
-        """Downloads new .htm/.html files from the index URL to the archive directory."""
+    def download_missing_files(self, index_url, archive_dir, synced_meets=None, links=None):
+        """Downloads new .htm/.html files from the index URL (or the given links) to the archive directory."""
         if not os.path.exists(archive_dir):
             os.makedirs(archive_dir)
             
-        print(f"Checking for new files at {index_url}...")
-        links = self.get_meet_links(index_url)
+        if links is None:
+            print(f"Checking for new files at {index_url}...")
+            links = self.get_meet_links(index_url)
         print(f"Found {len(links)} meet links.")
         
         saved_files = []
@@ -372,22 +402,26 @@ class Sub5Scraper:
 
             # SKIP if already in DB (unless force override which we don't have yet)
             if synced_meets and meet_name in synced_meets:
+                self.run.add(cache_hits=1)
                 continue
             
             if not os.path.exists(save_path):
-                print(f"Downloading {filename}...")
-                try:
-                    res = self._get_with_retry(link)
-                    with open(save_path, 'wb') as f:
-                        f.write(res.content)
-                    saved_files.append(save_path)
-                except Exception as e:
-                    print(f"Failed to download {link}: {e}")
+                log.info("Downloading %s...", filename)
+                with self.run.file(filename):
+                    try:
+                        res = self._get_with_retry(link)
+                        with open(save_path, 'wb') as f:
+                            f.write(res.content)
+                        saved_files.append(save_path)
+                    except Exception as e:
+                        log.warning("Failed to download %s: %s", link, e)
+                        self.run.add(errors=1)
             else:
-                pass # Already exists
+                self.run.add(cache_hits=1) # Already exists
                 
         return saved_files
 
+    @profiled("parse")
     def parse_all_files(self, archive_dir, json_dir):
         """Runs the Sub5ColumnParser on all files in the archive dir."""
         if not os.path.exists(json_dir):
@@ -403,27 +437,48 @@ class Sub5Scraper:
             output_filename = os.path.splitext(filename)[0] + ".json"
             output_path = os.path.join(json_dir, output_filename)
             
-            try:
-                # Skip if already parsed (Always re-parse for now)
-                # if os.path.exists(output_path):
-                #     continue
-
-                parser = Sub5ColumnParser(input_path)
-                events = parser.parse()
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(events, f, indent=4, ensure_ascii=False)
-                parsed_count += 1
-                
-                if i % 5 == 0 or i == total - 1:
-                    prog = int(((i + 1) / total) * 100)
-                    self.report_progress(f"Parsed {i+1}/{total} files", prog)
-            except Exception as e:
-                print(f"Error parsing {filename}: {e}")
+            with self.run.file(filename):
+                try:
+                    # Skip if already parsed (Always re-parse for now)
+                    # if os.path.exists(output_path):
+                    #     continue
+
+                    self.run.add(bytes=os.path.getsize(input_path))
+                    parser = Sub5ColumnParser(input_path)
+                    events = parser.parse()
+                    with open(output_path, "w", encoding="utf-8") as f:
+                        json.dump(events, f, indent=4, ensure_ascii=False)
+                    parsed_count += 1
+                except Exception as e:
+                    log.warning("Error parsing %s: %s", filename, e)
+                    self.run.add(errors=1)
+
+            # Outside the try: a cancelled job stops here (see jobs.py)
+            if i % 5 == 0 or i == total - 1:
+                prog = int(((i + 1) / total) * 100)
+                self.report_progress(f"Parsed {i+1}/{total} files", prog)
                 
+        self.flush_diagnostics(f"Parse {os.path.basename(archive_dir)}")
         return parsed_count
 
-    def sync_json_to_db(self, json_dir, season="Indoor", year="2026"):
-        """Reads parsed JSON files and inserts them into the database."""
+    @profiled("sync")
+    def sync_json_to_db(self, json_dir, season="Indoor", year="2026", only=None, conn=None):
+        """Reads parsed JSON files and inserts them into the database.
+        `only` limits the sync to a set of meet names (file names without extension).
+        With `conn`, the sync is part of the caller's transaction: nothing is committed, and
+        a file that fails raises instead of being skipped."""
+        if conn is not None:
+            return self._sync_json(conn, json_dir, season, year, only, strict=True)
+        conn = self.get_db_connection()
+        try:
+            total = self._sync_json(conn, json_dir, season, year, only, strict=False)
+            conn.commit()
+            return total
+        finally:
+            # Also when the sync raises (a cancelled job), so a staging copy can be removed
+            conn.close()
+
+    def _sync_json(self, conn, json_dir, season, year, only, strict):
         if not os.path.exists(json_dir):
             print("No JSON directory found.")
             return 0
@@ -431,14 +486,13 @@ class Sub5Scraper:
         files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
         print(f"Syncing {len(files)} JSON files to DB for {season} {year}...")
         
-        conn = self.get_db_connection()
         cursor = conn.cursor()
         
         total_performances = 0
         
         # We need to map the JSON structure to DB structure:
         # JSON: { event: "...", gender: "...", results: [{athlete, school, result, type, splits?}] }
-        # DB: athlete_id, event, mark, place, team, date, season, year, meet_name, meet_url
+        # DB: athlete_id, event_id, mark, place, team_id, date, season_id, meet_id (see database.py)
         
         # Since JSONs don't currently store the "Date" or "Meet Name" explicitly in the event object (they rely on filename context maybe?),
         # We might need to extract date from the filename or the file content if `Sub5ColumnParser` extracted it.
@@ -457,20 +511,27 @@ class Sub5Scraper:
         # I will iterate files and try to map filenames to dates if possible, or just default to "2025-2026" season.
         
         files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
+        if only is not None:
+            files = [f for f in files if os.path.splitext(f)[0] in only]
         total = len(files)
         self.report_progress(f"Syncing {total} JSON files to DB", 0)
         
         # In-memory athlete cache to avoid thousands of SELECTs
-        athlete_cache = {} # {name: id}
-        cursor.execute("SELECT name, id FROM athletes")
-        for row in cursor.fetchall():
-            athlete_cache[row['name']] = row['id']
+        # Includes aliases of merged duplicates (see identity.py)
+        athlete_cache = load_athlete_cache(cursor) # {name: id}
 
         # Get list of already synced meet names to skip them
-        synced_meets = set()
-        cursor.execute("SELECT DISTINCT meet_name FROM performances")
-        for row in cursor.fetchall():
-            synced_meets.add(row['meet_name'])
+        synced_meets = self.get_synced_meets(cursor)
+        stored_dates = stored_meet_dates(cursor)
+
+        # Dimension caches: {name: id}
+        team_cache = {}
+        event_cache = {}
+        season_id = get_or_create_season(cursor, year, season)
+
+        # Entities whose search rows need refreshing after this sync
+        touched_athletes = set()
+        touched_meets = set()
 
         for i, filename in enumerate(files):
             file_path = os.path.join(json_dir, filename)
@@ -478,237 +539,351 @@ class Sub5Scraper:
 
             # OPTIMIZATION: Skip if already synced
             if meet_name in synced_meets:
+                self.run.add(cache_hits=1)
                 continue
 
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    file_data = json.load(f)
+            with self.run.file(filename):
+                try:
+                    inserted_before = total_performances
+                    skipped = cache_hits = 0
+                    self.run.add(bytes=os.path.getsize(file_path))
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        file_data = json.load(f)
                     
-                # Check format of JSON
-                # Use filename as meet name as requested
-                meet_name = os.path.splitext(filename)[0]
-
-                # Check format of JSON
-                if isinstance(file_data, dict) and "events" in file_data:
-                    # New Format
-                    parsed_events = file_data.get("events", [])
-                    date = file_data.get("date")
-                else:
-                    # Old Format (List)
-                    parsed_events = file_data if isinstance(file_data, list) else []
-                    date = None
-
-                # 0. Try Web Date Mapping (User's preferred source)
-                date = None
-                web_date_raw = self.web_date_mapping.get(filename) or self.web_date_mapping.get(os.path.splitext(filename)[0] + ".htm")
-                if web_date_raw:
-                    date = self.parse_web_date(web_date_raw)
-                    if not self.is_date_in_season(date, season, year):
-                        date = None
+                    # Check format of JSON
+                    # Use filename as meet name as requested
+                    meet_name = os.path.splitext(filename)[0]
+
+                    # Check format of JSON
+                    if isinstance(file_data, dict) and "events" in file_data:
+                        # New Format
+                        parsed_events = file_data.get("events", [])
+                        content_date = file_data.get("date")
                     else:
-                        print(f"  [INFO] Using web date mapping for {filename}: {date}")
-
-                # 1. Try Parsed Date (Content)
-                if not date:
-                    date = file_data.get("date") if isinstance(file_data, dict) else None
-                    if not self.is_date_in_season(date, season, year):
-                        if date: print(f"  [INFO] Rejecting content date {date} for {filename} (outside {season} {year})")
-                        date = None
-
-                # 2. Filename Date Fallback
-                if not date:
-                    fn_low = filename.lower()
-                    m1 = re.search(r'(\d{1,2})([a-z]{3})(\d{4})', fn_low)
-                    m2 = re.search(r'(\d{1,2})[-_](\d{1,2})[-_](\d{4})', fn_low)
-                    
-                    fn_date = None
-                    month_map = {'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'may': '05', 'jun': '06',
-                                'jul': '07', 'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'}
-                    
-                    if m1:
-                        d_part, m_part, y_part = m1.group(1).zfill(2), m1.group(2), m1.group(3)
-                        if m_part in month_map: fn_date = f"{y_part}-{month_map[m_part]}-{d_part}"
-                    elif m2:
-                        m_part, d_part, y_part = m2.group(1).zfill(2), m2.group(2).zfill(2), m2.group(3)
-                        fn_date = f"{y_part}-{m_part}-{d_part}"
-                    
-                    if self.is_date_in_season(fn_date, season, year):
-                        date = fn_date
-                
-                # 3. Apply manual fixes (Manual Fixes take priority over everything)
-                for mc in self.manual_fixes.get('meet_corrections', []):
-                    # Check if fragment matches meet_name or filename
-                    if mc['meet_name_fragment'].lower() in meet_name.lower() or \
-                       mc['meet_name_fragment'].lower() in filename.lower():
-                        date = mc['new_date']
-                        print(f"  [INFO] Applied manual fix for {filename}: {date}")
-                        break
-
-                # 4. Final Fallback Alert
-                if not date:
-                    date = "Unknown"
-                    print(f"\n!!! [ALERT] MISSING DATE: {filename}")
-                    print(f"!!! Meet Name: {meet_name}")
-                    print(f"!!! No valid date found in content, filename, or manual_fixes.json.")
-                    print(f"!!! PLEASE ADD THIS TO backend/manual_fixes.json:")
-                    print(f"!!! {{ \"meet_name_fragment\": \"{os.path.splitext(filename)[0]}\", \"new_date\": \"YYYY-MM-DD\" }}\n")
-                
-                for event_block in parsed_events:
-                    # Construct full event name: "Girls 55 Meter Dash"
-                    gender = event_block.get("gender", "")
-                    event_name = event_block.get("event", "")
-                    full_event = f"{gender} {event_name}".strip()
+                        # Old Format (List)
+                        parsed_events = file_data if isinstance(file_data, list) else []
+                        content_date = None
+
+                    # Resolved once per meet; re-syncs reuse the stored date (see meet_dates.py)
+                    if meet_name in stored_dates:
+                        date, date_source, date_confidence = stored_dates[meet_name]
+                        cache_hits += 1
+                    else:
+                        date, date_source, date_confidence = self.date_resolver.resolve(
+                            filename, meet_name, content_date, season, year)
+
+                    meet_id = get_or_create_meet(cursor, meet_name, date,
+                                                 date_source=date_source, date_confidence=date_confidence)
+                    touched_meets.add(meet_id)
+
+                    for event_block in parsed_events:
+                        # Construct full event name: "Girls 55 Meter Dash"
+                        gender = event_block.get("gender", "")
+                        event_name = event_block.get("event", "")
+                        full_event = f"{gender} {event_name}".strip()
+                        event_id = get_or_create_event(cursor, full_event, event_cache)
                     
-                    for r in event_block.get("results", []):
-                        athlete_name = r.get("athlete", "")
-                        school = r.get("school", "")
-                        mark = r.get("result", "")
+                        for r in event_block.get("results", []):
+                            athlete_name = r.get("athlete", "")
+                            school = r.get("school", "")
+                            mark = r.get("result", "")
                         
-                        # Handle Relays: Use list of athletes if available, else school name
-                        relay_athletes = r.get("athletes", [])
-                        if event_block.get("is_relay"):
-                            if relay_athletes:
-                                athlete_name = ", ".join(relay_athletes)
+                            # Handle Relays: runners go to relay_legs, not a combined "athlete"
+                            is_relay = bool(event_block.get("is_relay"))
+                            relay_athletes = []
+                            if is_relay:
+                                relay_athletes = [self.normalize_athlete_name(a) for a in r.get("athletes", [])]
+                                relay_athletes = [a for a in relay_athletes if a]
                             else:
-                                athlete_name = f"{school} Relay"
-
-                        # Apply Athlete Name Fixes
-                        athlete_name = self.normalize_athlete_name(athlete_name)
+                                # Apply Athlete Name Fixes
+                                athlete_name = self.normalize_athlete_name(athlete_name)
 
-                        # Validation
-                        if not athlete_name or not mark or mark.upper() in ["DNS", "SCR"]:
-                            continue
+                            # Validation
+                            if (not is_relay and not athlete_name) or not mark or mark.upper() in ["DNS", "SCR"]:
+                                skipped += 1
+                                continue
                             
-                        # Normalize Team
-                        team_norm = self.normalize_team_name(school)
+                            # Normalize Team
+                            team_norm = self.normalize_team_name(school)
+                            team_id = get_or_create_team(cursor, team_norm, team_cache)
                         
-                        # Skip if it is still a likely athlete name (bad parse)
-                        if self.is_likely_athlete_name(team_norm):
-                             # Actually `Sub5ColumnParser` is pretty good, but safety first
-                             pass
+                            # Skip if it is still a likely athlete name (bad parse)
+                            if self.is_likely_athlete_name(team_norm):
+                                 # Actually `Sub5ColumnParser` is pretty good, but safety first
+                                 pass
                         
-                        # Insert Athlete (using cache)
-                        if athlete_name in athlete_cache:
-                            athlete_id = athlete_cache[athlete_name]
-                        else:
-                            cursor.execute('INSERT INTO athletes (name) VALUES (?)', (athlete_name,))
-                            athlete_id = cursor.lastrowid
-                            athlete_cache[athlete_name] = athlete_id
+                            # Insert Athlete (using cache)
+                            if is_relay:
+                                athlete_id = None
+                            elif athlete_name in athlete_cache:
+                                athlete_id = athlete_cache[athlete_name]
+                                cache_hits += 1
+                            else:
+                                cursor.execute('INSERT INTO athletes (name) VALUES (?)', (athlete_name,))
+                                athlete_id = cursor.lastrowid
+                                athlete_cache[athlete_name] = athlete_id
                         
-                        # Handle Date Sorting (Prelims vs Finals)
-                        performance_date = date
-                        if date and date != "Unknown":
-                            res_type = r.get("type", "").lower()
-                            if "prelim" in res_type:
-                                performance_date = f"{date}T09:00:00"
-                            elif "final" in res_type:
-                                performance_date = f"{date}T15:00:00"
+                            # Handle Date Sorting (Prelims vs Finals)
+                            performance_date = date
+                            if date and date != "Unknown":
+                                res_type = r.get("type", "").lower()
+                                if "prelim" in res_type:
+                                    performance_date = f"{date}T09:00:00"
+                                elif "final" in res_type:
+                                    performance_date = f"{date}T15:00:00"
+                                else:
+                                    performance_date = f"{date}T12:00:00"
+
+                            # Handle Splits
+                            splits = r.get("splits", [])
+                            splits_json = json.dumps(splits)
+
+                            # Insert Performance
+                            # Deduplication check (relays have no athlete, so the team tells them apart)
+                            if is_relay:
+                                cursor.execute(queries.RELAY_EXISTS_QUERY, (event_id, mark, performance_date, team_id))
                             else:
-                                performance_date = f"{date}T12:00:00"
-
-                        # Handle Splits
-                        splits_json = json.dumps(r.get("splits", []))
-
-                        # Insert Performance
-                        # Deduplication check?
-                        cursor.execute('''
-                            SELECT id FROM performances 
-                            WHERE athlete_id=? AND event=? AND mark=? AND date=?
-                        ''', (athlete_id, full_event, mark, performance_date))
+                                cursor.execute(queries.PERFORMANCE_EXISTS_QUERY, (athlete_id, event_id, mark, performance_date))
                         
-                        if not cursor.fetchone():
-                            cursor.execute('''
-                                INSERT INTO performances 
-                                (athlete_id, event, mark, team, date, season, year, meet_name, meet_url, splits)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (athlete_id, full_event, mark, team_norm, performance_date, season, year, meet_name, "", splits_json))
-                            total_performances += 1
-                            
-                if i % 10 == 0 or i == total - 1:
-                    prog = int(((i + 1) / total) * 100)
-                    self.report_progress(f"Synced {i+1}/{total} files", prog)
+                            if not cursor.fetchone():
+                                cursor.execute('''
+                                    INSERT INTO performances 
+                                    (athlete_id, event_id, mark, team_id, date, season_id, meet_id, splits)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                                ''', (athlete_id, event_id, mark, team_id, performance_date, season_id, meet_id, splits_json))
+                                if is_relay:
+                                    insert_relay(cursor, cursor.lastrowid, relay_athletes, splits, athlete_cache)
+                                    touched_athletes.update(athlete_cache[a] for a in relay_athletes)
+                                else:
+                                    touched_athletes.add(athlete_id)
+                                total_performances += 1
+                            else:
+                                skipped += 1
 
-            except Exception as e:
-                print(f"Error syncing {filename}: {e}")
+                    self.run.add(rows_inserted=total_performances - inserted_before,
+                                 rows_skipped=skipped, cache_hits=cache_hits)
+
+                except Exception as e:
+                    self.run.add(errors=1)
+                    if strict:
+                        raise
+                    log.warning("Error syncing %s: %s", filename, e)
+
+            # Outside the try: a cancelled job stops here and the uncommitted sync is rolled back
+            if i % 10 == 0 or i == total - 1:
+                prog = int(((i + 1) / total) * 100)
+                self.report_progress(f"Synced {i+1}/{total} files", prog)
                 
-        conn.commit()
-        conn.close()
+        self.flush_diagnostics(f"Sync {season} {year}")
+        print_unknown_dates(conn)
+
+        unmapped = TEAM_NORMALIZER.pop_unmapped()
+        if unmapped:
+            print(f"  [ALERT] {len(unmapped)} team names not in TEAM_MAPPING:")
+            for raw, rows in unmapped.most_common():
+                print(f"    '{raw}' ({rows} rows)")
+
+        # Keep typeahead search in step with what was just inserted
+        if touched_athletes or touched_meets:
+            refresh_search_index(conn, athlete_ids=touched_athletes,
+                                 team_ids=set(team_cache.values()), meet_ids=touched_meets)
+        # The triggers logged every row this sync wrote for GET /changes; keep the log bounded
+        prune_change_log(conn)
         return total_performances
 
+    def apply_fix_changes(self):
+        """
+        Re-syncs only the meets affected by fixes added, edited or removed in
+        manual_fixes.json since the last sync. Returns the number of performances re-inserted.
+        Deleting the old results, re-syncing them and recording the fixes as applied is one
+        transaction: if a re-sync fails, nothing changes and the next run tries again.
+        """
+        conn = self.get_db_connection()
+        try:
+            changes = changed_fixes(conn, self.fixes)
+            if not changes:
+                return 0
+            print(f"{len(changes)} manual fixes changed since the last sync.")
+
+            # Which season directory each meet's JSON lives in
+            targets = {}
+            meet_ids = set()
+            missing = []
+            for meet_id in affected_meets(conn, changes):
+                row = conn.execute('''
+                    SELECT meets.name, seasons.year, seasons.season FROM meets
+                    JOIN performances ON performances.meet_id = meets.id
+                    JOIN seasons ON seasons.id = performances.season_id
+                    WHERE meets.id = ? LIMIT 1
+                ''', (meet_id,)).fetchone()
+                if not row:
+                    continue
+                json_path = os.path.join(self.data_dir, 'parsed_results', row['year'], row['name'] + '.json')
+                if not os.path.exists(json_path):
+                    # Its results can't be rebuilt, so leave them as they are
+                    missing.append(row['name'])
+                    continue
+                meet_ids.add(meet_id)
+                targets.setdefault((row['year'], row['season']), set()).add(row['name'])
+
+            athletes = delete_meet_performances(conn, meet_ids)
+            # Their dates are resolved again with the new fixes
+            conn.executemany('UPDATE meets SET date_source = NULL WHERE id = ?', [(m,) for m in meet_ids])
+
+            total = 0
+            for (year, season), meet_names in targets.items():
+                print(f"Re-syncing {len(meet_names)} meets for {season} {year}: {', '.join(sorted(meet_names))}")
+                json_dir = os.path.join(self.data_dir, 'parsed_results', year)
+                total += self.sync_json_to_db(json_dir, season=season, year=year, only=meet_names, conn=conn)
+
+            # Corrected athletes whose old name no longer has any results
+            removed = delete_orphan_athletes(conn, athletes)
+            if removed:
+                print(f"Removed {len(removed)} athletes left without results.")
+
+            if missing:
+                # Not recorded, so these fixes are retried once the JSON is back
+                print(f"  [WARN] No parsed JSON for {len(missing)} affected meets, left unchanged: "
+                      f"{', '.join(sorted(missing))}")
+            else:
+                record_applied(conn, self.fixes)
+            conn.commit()
+        finally:
+            # Without the commit above (a re-sync raised), closing rolls all of it back
+            conn.close()
+        return total
+
+    def record_applied_fixes(self):
+        """Marks the current manual_fixes.json as fully applied (after a full sync)."""
+        conn = self.get_db_connection()
+        try:
+            record_applied(conn, self.fixes)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def seasons(self):
+        """The seasons a scrape covers, oldest first."""
+        return [
+            {"year": year, "season": "Indoor", "url": self.season_url(year)}
+            for year in ("2023", "2024", "2025", "2026")
+        ]
+
     def run_full_scrape(self, wipe=True):
         """MAIN ENTRY POINT."""
-        # Define the seasons to scrape
-        seasons_to_scrape = [
-            {
-                "year": "2023",
-                "season": "Indoor",
-                "url": "https://sub5.com/youth-pages/indoor-track/2023-indoor-results/"
-            },
-            {
-                "year": "2024",
-                "season": "Indoor",
-                "url": "https://sub5.com/youth-pages/indoor-track/2024-indoor-results/"
-            },
-            {
-                "year": "2025",
-                "season": "Indoor",
-                "url": "https://sub5.com/youth-pages/indoor-track/2025-indoor-results/"
-            },
-            {
-                "year": "2026",
-                "season": "Indoor",
-                "url": "https://sub5.com/youth-pages/indoor-track/2026-indoor-results/"
-            }
-        ]
+        self.run = RunReport("scrape", wipe=wipe)
+        try:
+            total_count = self._scrape_seasons(self.seasons(), wipe)
+        except Exception as e:
+            self.discard_staging()
+            self.run.finish("error", error=str(e))
+            raise
+        path = self.run.finish()
+        print_summary(self.run.to_dict())
+        print(f"Run report: {path}")
+        return total_count
+
+    def _scrape_seasons(self, seasons_to_scrape, wipe):
+        synced_meets = self.prepare_scrape(wipe)
+        total_count = 0
+
+        total_seasons = len(seasons_to_scrape)
+        for s_idx, config in enumerate(seasons_to_scrape):
+            self.report_progress(f"Processing {config['season']} {config['year']}...", int((s_idx / total_seasons) * 100))
+            self.download_season(config, synced_meets)
+            self.parse_season(config)
+            total_count += self.sync_season(config)
+
+        self.finish_scrape()
+        return total_count
+
+    # The steps of a scrape. run_full_scrape runs the seasons one after another; the API's
+    # job manager (jobs.py) runs download and parse for several seasons at once, then syncs
+    # them in order. Returns the meets already in the DB (downloads skip them).
+    def prepare_scrape(self, wipe):
+        self.begin_staging(wipe)
 
         # 1. Initialize DB
         if wipe:
             self.report_progress("Initializing Database (Fresh Start)...", 0)
         else:
             self.report_progress("Ensuring Database Schema...", 0)
-        self.initialize_db(wipe=wipe)
-        
+        with self.run.stage("schema"):
+            self.initialize_db(wipe=wipe)
+
+        # Fixes edited since the last run only re-sync the meets they touch
+        if not wipe:
+            with self.run.stage("fixes"):
+                self.apply_fix_changes()
+
         # Get list of already synced meets to skip downloads
         synced_meets = set()
         if not wipe:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             try:
-                cursor.execute("SELECT DISTINCT meet_name FROM performances")
-                for row in cursor.fetchall():
-                    synced_meets.add(row['meet_name'])
+                synced_meets = self.get_synced_meets(cursor)
             except Exception:
                 pass # Table might not exist or be empty
             conn.close()
-
-        total_count = 0
-        base_dir = os.path.dirname(os.path.dirname(__file__))
-
-        total_seasons = len(seasons_to_scrape)
-        for s_idx, config in enumerate(seasons_to_scrape):
-            year = config["year"]
-            season = config["season"]
-            index_url = config["url"]
-
-            self.report_progress(f"Processing {season} {year}...", int((s_idx / total_seasons) * 100))
-
-            # 2. Directories ...
-            archive_dir = os.path.join(base_dir, f'backend/data/sub5_archive/{year}')
-            json_dir = os.path.join(base_dir, f'backend/data/parsed_results/{year}')
-            
-            # 3. Download New Files
-            self.report_progress(f"Downloading files for {year}...")
-            self.download_missing_files(index_url, archive_dir, synced_meets=synced_meets)
-            
-            # 4. Parse All Files -> JSON
-            self.parse_all_files(archive_dir, json_dir)
-            
-            # 5. Sync JSON to DB
-            count = self.sync_json_to_db(json_dir, season=season, year=year)
-            total_count += count
-        
+        return synced_meets
+
+    def season_dirs(self, config):
+        """(archive_dir, json_dir) for a season."""
+        year = config["year"]
+        return (os.path.join(self.data_dir, 'sub5_archive', year),
+                os.path.join(self.data_dir, 'parsed_results', year))
+
+    def download_season(self, config, synced_meets):
+        # 2. Download New Files
+        label = f"{config['season']} {config['year']}"
+        archive_dir, _ = self.season_dirs(config)
+        self.report_progress(f"Downloading files for {config['year']}...")
+        with self.run.stage("index", season=label):
+            links = self.get_meet_links(config["url"])
+        with self.run.stage("download", season=label):
+            self.download_missing_files(config["url"], archive_dir, synced_meets=synced_meets, links=links)
+
+    def parse_season(self, config):
+        # 3. Parse All Files -> JSON
+        archive_dir, json_dir = self.season_dirs(config)
+        with self.run.stage("parse", season=f"{config['season']} {config['year']}"):
+            return self.parse_all_files(archive_dir, json_dir)
+
+    def sync_season(self, config):
+        # 4. Sync JSON to DB
+        _, json_dir = self.season_dirs(config)
+        with self.run.stage("sync", season=f"{config['season']} {config['year']}"):
+            return self.sync_json_to_db(json_dir, season=config["season"], year=config["year"])
+
+    def finish_scrape(self):
+        self.record_applied_fixes()
+        self.report_progress("Validating and publishing the database...")
+        self.publish_staging()
         self.report_progress("Scrape Complete!", 100)
-        return total_count
+
+    def begin_staging(self, wipe):
+        """Points the scraper at a fresh staging copy of the DB until publish_staging or discard_staging."""
+        staging = StagedDatabase(self.db_path, wipe=wipe, publish=self.publish)
+        with self.run.stage("stage"):
+            self.db_path = staging.begin()
+        # Only once begin() succeeded: discarding a copy that another writer holds would delete it
+        self.staging = staging
+
+    def publish_staging(self):
+        """Validates the staging copy and swaps it in; raises StagingError if it is rejected."""
+        self.restore_identity()
+        staging, self.staging = self.staging, None
+        self.db_path = staging.db_path
+        with self.run.stage("publish"):
+            self.run.info["rows"] = staging.publish()
+
+    def discard_staging(self):
+        self.carried = None
+        if self.staging:
+            self.db_path = self.staging.db_path
+            self.staging.discard()
+            self.staging = None
 
 if __name__ == "__main__":
     scraper = Sub5Scraper()
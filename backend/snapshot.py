@@ -0,0 +1,166 @@
+import hashlib
+import os
+import sqlite3
+import sys
+try:
+    from backend.database import require_current_schema, read_only_uri, create_search_index, mark_value, parse_mark
+except ImportError:
+    from database import require_current_schema, read_only_uri, create_search_index, mark_value, parse_mark
+
+# Read-only SQLite snapshot for querying in the browser (sql.js-httpvfs and similar).
+#
+# The snapshot has the normalized schema from track_app.db without the scraper's
+# bookkeeping tables. Performances also carry a numeric mark_value, and there are indexes
+# for the dashboard's filters. A WASM SQLite client that reads the file over HTTP Range
+# requests fetches one page per request. A small page size keeps each fetch close to
+# what a query actually touches. The file is VACUUMed so pages are packed and in B-tree
+# order, and it uses journal_mode=delete because a static host can't serve a -wal file.
+
+PAGE_SIZE = 1024
+SNAPSHOT_VERSION = 2  # PRAGMA user_version; bump when the snapshot schema changes
+
+SCHEMA = '''
+    CREATE TABLE snapshot_info (db_version INTEGER, db_epoch TEXT, exported_at TEXT);
+    CREATE TABLE athletes (id INTEGER PRIMARY KEY, name TEXT);
+    CREATE TABLE teams (id INTEGER PRIMARY KEY, name TEXT);
+    CREATE TABLE seasons (id INTEGER PRIMARY KEY, year TEXT, season TEXT);
+    CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT, gender TEXT, is_relay INTEGER, is_time INTEGER);
+    CREATE TABLE meets (id INTEGER PRIMARY KEY, name TEXT, date TEXT, url TEXT);
+    CREATE TABLE performances (
+        id INTEGER PRIMARY KEY,
+        athlete_id INTEGER,
+        event_id INTEGER,
+        mark TEXT,
+        mark_value REAL,
+        place TEXT,
+        team_id INTEGER,
+        date TEXT,
+        season_id INTEGER,
+        meet_id INTEGER,
+        splits TEXT
+    );
+    CREATE TABLE relays (id INTEGER PRIMARY KEY, performance_id INTEGER NOT NULL UNIQUE);
+    CREATE TABLE relay_legs (
+        relay_id INTEGER NOT NULL,
+        leg INTEGER NOT NULL,
+        athlete_id INTEGER NOT NULL,
+        split TEXT,
+        PRIMARY KEY (relay_id, leg)
+    ) WITHOUT ROWID;
+'''
+
+COPY = '''
+    INSERT INTO snapshot_info
+        SELECT COALESCE((SELECT version FROM source.data_version WHERE id = 1), 0),
+               (SELECT epoch FROM source.change_log_info WHERE id = 1), datetime('now');
+    INSERT INTO athletes SELECT id, name FROM source.athletes;
+    INSERT INTO teams SELECT id, name FROM source.teams;
+    INSERT INTO seasons SELECT id, year, season FROM source.seasons;
+    INSERT INTO events SELECT id, name, gender, is_relay, NULL FROM source.events;
+    INSERT INTO meets SELECT id, name, date, COALESCE(url, '') FROM source.meets;
+    INSERT INTO performances
+        SELECT id, athlete_id, event_id, mark, mark_value(mark), place,
+               team_id, date, season_id, meet_id, splits
+        FROM source.performances ORDER BY id;
+    INSERT INTO relays SELECT id, performance_id FROM source.relays;
+    INSERT INTO relay_legs SELECT relay_id, leg, athlete_id, split FROM source.relay_legs;
+'''
+
+# Built after the copy so each B-tree is written once, in order
+INDEXES = '''
+    CREATE INDEX idx_perf_athlete_date ON performances(athlete_id, date);
+    CREATE INDEX idx_perf_team_season ON performances(team_id, season_id, date);
+    CREATE INDEX idx_perf_season ON performances(season_id, athlete_id);
+    CREATE INDEX idx_perf_meet ON performances(meet_id);
+    CREATE INDEX idx_perf_event_value ON performances(event_id, mark_value);
+    CREATE INDEX idx_relay_legs_athlete ON relay_legs(athlete_id, relay_id);
+    CREATE INDEX idx_athletes_name ON athletes(name COLLATE NOCASE);
+
+    -- Event direction (lower is better for times), from the parsed marks
+    UPDATE events SET is_time = COALESCE(
+        (SELECT mark_is_time(mark) FROM performances
+         WHERE performances.event_id = events.id AND mark_value IS NOT NULL LIMIT 1), 1);
+
+    CREATE VIEW performance_details AS
+    SELECT performances.id, performances.athlete_id, athletes.name AS athlete_name,
+           events.name AS event, performances.mark, performances.mark_value, performances.place,
+           teams.name AS team, performances.date,
+           seasons.season AS season, seasons.year AS year,
+           meets.name AS meet_name, meets.url AS meet_url, performances.splits,
+           performances.event_id, performances.team_id,
+           performances.season_id, performances.meet_id
+    FROM performances
+    LEFT JOIN athletes ON athletes.id = performances.athlete_id
+    LEFT JOIN events ON events.id = performances.event_id
+    LEFT JOIN teams ON teams.id = performances.team_id
+    LEFT JOIN seasons ON seasons.id = performances.season_id
+    LEFT JOIN meets ON meets.id = performances.meet_id;
+'''
+
+def _mark_is_time(mark):
+    parsed = parse_mark(mark)
+    return int(parsed[1]) if parsed else None
+
+def snapshot_name(digest):
+    return f"snapshot.{digest[:12]}.db"
+
+def build_snapshot(db_path, output_dir):
+    """
+    Writes snapshot.{hash}.db to output_dir.
+    Returns {"file", "size", "page_size", "db_version", "db_epoch"} for the manifest.
+    """
+    tmp_path = os.path.join(output_dir, 'snapshot.db.tmp')
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None, uri=True)
+    try:
+        # page_size only takes effect before the first table is created (or on VACUUM)
+        conn.execute(f'PRAGMA page_size = {PAGE_SIZE}')
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.execute(f'PRAGMA user_version = {SNAPSHOT_VERSION}')
+        conn.create_function('mark_value', 1, mark_value, deterministic=True)
+        conn.create_function('mark_is_time', 1, _mark_is_time, deterministic=True)
+        conn.executescript(SCHEMA)
+
+        # Read-only: only staged writers change the live DB (staging.py)
+        conn.execute('ATTACH DATABASE ? AS source', (read_only_uri(db_path),))
+        # One transaction, so the copy is consistent with the recorded version
+        conn.executescript('BEGIN;' + COPY + 'COMMIT;')
+        conn.execute('DETACH DATABASE source')
+        version, epoch = conn.execute('SELECT db_version, db_epoch FROM snapshot_info').fetchone()
+
+        conn.executescript(INDEXES)
+        create_search_index(conn)
+        conn.execute('ANALYZE')
+        conn.execute('VACUUM')
+    finally:
+        conn.close()
+
+    sha = hashlib.sha256()
+    with open(tmp_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            sha.update(chunk)
+    name = snapshot_name(sha.hexdigest())
+    os.replace(tmp_path, os.path.join(output_dir, name))
+    return {"file": name, "size": os.path.getsize(os.path.join(output_dir, name)),
+            "page_size": PAGE_SIZE, "db_version": version, "db_epoch": epoch}
+
+def remove_stale_snapshots(output_dir, keep):
+    removed = 0
+    for filename in os.listdir(output_dir):
+        if filename.startswith('snapshot.') and filename.endswith('.db') and filename != keep:
+            os.remove(os.path.join(output_dir, filename))
+            removed += 1
+    return removed
+
+if __name__ == "__main__":
+    backend_dir = os.path.dirname(__file__)
+    db = sys.argv[1] if len(sys.argv) > 1 else os.path.join(backend_dir, '..', 'track_app.db')
+    out = sys.argv[2] if len(sys.argv) > 2 else os.path.join(backend_dir, '..', 'ui', 'public', 'data')
+    os.makedirs(out, exist_ok=True)
+    source = sqlite3.connect(read_only_uri(db), uri=True)
+    require_current_schema(source, db)
+    source.close()
+    info = build_snapshot(db, out)
+    print(f"Wrote {info['file']} ({info['size'] / 1024:.1f} KB, {PAGE_SIZE}-byte pages).")
@@ -0,0 +1,266 @@
+import os
+import sqlite3
+import threading
+
+# Scrapes and resyncs write to a staging copy of the database, never to the live one.
+#
+#   staged = StagedDatabase(db_path, wipe=False)
+#   path = staged.begin()     # {db}.staging: a copy of the live DB, or empty for a wipe
+#   ... write to path ...
+#   staged.publish()          # validate, then swap it in; discard() on failure
+#
+# Validation runs PRAGMA integrity_check and foreign_key_check, then compares row counts with
+# the live DB. An update may not shrink any of TABLES by more than MAX_SHRINK. A full rebuild
+# must bring back FULL_MIN_RATIO of the live rows in every table, and FULL_TABLES
+# (performances, meets) may not be empty. A copy that fails is kept as {db}.rejected for
+# inspection, and the live DB is left as it was.
+#
+# One writer stages a database at a time: begin() takes {db}.lock (an exclusive SQLite lock,
+# which the OS drops if the process dies) and publish() or discard() releases it. A second
+# writer, e.g. identity.py while a scrape runs, gets a StagingError instead of deleting the
+# first one's copy.
+#
+# Readers never see a half-written database and never wait on the writer's locks. Outside
+# the API, publishing is replace_db(). The API reads through a ConnectionPool, and its
+# publish() also moves the pool to a new generation: requests already running finish on the
+# connection they have, and later requests open the new data.
+
+STAGING_SUFFIX = '.staging'
+REJECTED_SUFFIX = '.rejected'
+LOCK_SUFFIX = '.lock'
+TABLES = ("athletes", "teams", "meets", "performances", "relay_legs")
+FULL_TABLES = ("performances", "meets")
+MAX_SHRINK = 0.05
+FULL_MIN_RATIO = 0.9
+POOL_SIZE = 8  # idle connections kept for reuse
+
+class StagingError(Exception):
+    pass
+
+def copy_db(source_path, target_path):
+    """Copies a database with the backup API: a consistent copy, even while the source is read."""
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+def replace_db(staging_path, db_path):
+    """Makes staging_path the live database in one step. os.replace swaps the file, and readers
+    keep the one they opened. Windows refuses that while the live file is open, so there the
+    staged copy is written over it with the backup API instead, in a single transaction."""
+    try:
+        os.replace(staging_path, db_path)
+    except PermissionError:
+        copy_db(staging_path, db_path)
+        remove_db(staging_path)
+
+def remove_db(path):
+    for name in (path, path + '-journal'):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+def row_counts(path):
+    """{table: rows} for TABLES; 0 for a missing database or table."""
+    counts = dict.fromkeys(TABLES, 0)
+    if not os.path.exists(path):
+        return counts
+    conn = sqlite3.connect(path)
+    try:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in TABLES:
+            if table in existing:
+                counts[table] = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+    return counts
+
+class WriterLock:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = None
+
+    def acquire(self):
+        # Publishing may happen on another thread than begin() (API jobs)
+        conn = sqlite3.connect(self.db_path + LOCK_SUFFIX, timeout=0, isolation_level=None,
+                               check_same_thread=False)
+        try:
+            conn.execute('BEGIN EXCLUSIVE')
+        except sqlite3.OperationalError:
+            conn.close()
+            raise StagingError(f"Another writer (a scrape or resync?) is staging {self.db_path}; "
+                               "try again when it finishes")
+        self.conn = conn
+
+    def release(self):
+        if self.conn is not None:
+            self.conn.close()  # ends the transaction, and with it the lock
+            self.conn = None
+
+class StagedDatabase:
+    def __init__(self, db_path, wipe=False, publish=None):
+        self.db_path = db_path
+        self.path = db_path + STAGING_SUFFIX
+        self.wipe = wipe
+        # publish(staging_path, db_path); ConnectionPool.publish in the API
+        self.publisher = publish or replace_db
+        self.lock = WriterLock(db_path)
+        # {table: rows} the writer deletes on purpose (merged athletes); not counted as shrinking
+        self.removed = {}
+
+    def begin(self):
+        """Takes the writer lock and creates the staging copy (left over ones from a crash are
+        replaced). Returns its path; raises StagingError if another writer holds the lock."""
+        self.lock.acquire()
+        try:
+            remove_db(self.path)
+            if not self.wipe and os.path.exists(self.db_path):
+                copy_db(self.db_path, self.path)
+        except Exception:
+            self.lock.release()
+            raise
+        return self.path
+
+    def validate(self):
+        """Returns the staged row counts, or raises StagingError (and keeps the copy as .rejected)."""
+        problems = []
+        conn = sqlite3.connect(self.path)
+        try:
+            integrity = [r[0] for r in conn.execute('PRAGMA integrity_check')]
+            if integrity != ['ok']:
+                problems.append(f"integrity_check: {'; '.join(integrity[:3])}")
+            orphans = conn.execute('PRAGMA foreign_key_check').fetchall()
+            if orphans:
+                problems.append(f"{len(orphans)} rows with dangling foreign keys (first in {orphans[0][0]})")
+        finally:
+            conn.close()
+
+        live = row_counts(self.db_path)
+        staged = row_counts(self.path)
+        for table in TABLES:
+            before, after = live[table], staged[table]
+            if self.wipe:
+                # Only FULL_TABLES must have rows; a dataset without relays has no relay_legs
+                if table in FULL_TABLES and after == 0:
+                    problems.append(f"{table} is empty")
+                elif after < before * FULL_MIN_RATIO:
+                    problems.append(f"{table}: {after} rows, under {FULL_MIN_RATIO:.0%} of the live {before}")
+            elif after < (before - self.removed.get(table, 0)) * (1 - MAX_SHRINK):
+                problems.append(f"{table} shrank from {before} to {after} rows")
+
+        if problems:
+            rejected = self.db_path + REJECTED_SUFFIX
+            remove_db(rejected)
+            os.replace(self.path, rejected)
+            raise StagingError(f"Staged database rejected ({rejected}): " + ", ".join(problems))
+        return staged
+
+    def publish(self):
+        """Validates the staging copy and makes it the live database. Returns its row counts."""
+        try:
+            counts = self.validate()
+            self.publisher(self.path, self.db_path)
+        finally:
+            self.lock.release()
+        return counts
+
+    def discard(self):
+        remove_db(self.path)
+        self.lock.release()
+
+class PooledConnection(sqlite3.Connection):
+    """close() hands the connection back to its pool, so callers use it like a plain one."""
+    def close(self):
+        self.pool.release(self)
+
+def file_id(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+class ConnectionPool:
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.path = db_path  # what new connections open: db_path, or the staged copy mid-publish
+        self.size = size
+        self.generation = 0
+        self.idle = []
+        self.retired = set()  # staged copies to delete once nothing has them open
+        self.lock = threading.Lock()
+        self.file_id = file_id(db_path)
+
+    def connect(self):
+        # Another process (resync_db.py, identity.py) may have swapped a new file in; idle
+        # connections would keep reading the old one
+        current = file_id(self.path)
+        if current is not None and current != self.file_id:
+            self.switch(self.path)
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+            path, generation = self.path, self.generation
+        # Requests run on a thread pool, so a connection may be returned from another thread
+        conn = sqlite3.connect(path, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.pool = self
+        conn.generation = generation
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self.lock:
+            if conn in self.idle:
+                return  # closed twice
+            if conn.generation == self.generation and len(self.idle) < self.size:
+                self.idle.append(conn)
+                return
+        sqlite3.Connection.close(conn)
+        self.remove_retired()
+
+    def switch(self, path):
+        """Starts a new generation: new connections open `path`, idle old ones are closed."""
+        with self.lock:
+            self.path = path
+            self.file_id = file_id(path)
+            self.generation += 1
+            stale, self.idle = self.idle, []
+        for conn in stale:
+            sqlite3.Connection.close(conn)
+
+    def publish(self, staging_path, db_path):
+        """Publisher for StagedDatabase: replace_db, with the pool moved to the new generation."""
+        try:
+            os.replace(staging_path, db_path)
+        except PermissionError:
+            # Windows: serve the staged copy while it is written over the live file, so no
+            # reader waits on the copy, then go back to the live file
+            self.switch(staging_path)
+            copy_db(staging_path, db_path)
+            with self.lock:
+                self.retired.add(staging_path)
+        self.switch(db_path)
+        self.remove_retired()
+
+    def remove_retired(self):
+        # Windows can't delete a file that is still open; try again as old connections close
+        with self.lock:
+            retired = [p for p in self.retired if p != self.path]
+        for path in retired:
+            try:
+                remove_db(path)
+            except PermissionError:
+                continue
+            with self.lock:
+                self.retired.discard(path)
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            sqlite3.Connection.close(conn)
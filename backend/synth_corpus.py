@@ -0,0 +1,449 @@
+import html
+import json
+import math
+import os
+import random
+import sys
+from collections import Counter
+from datetime import date as Date, timedelta
+try:
+    from backend.scraper import TEAM_MAPPING
+except ImportError:
+    from scraper import TEAM_MAPPING
+
+# Synthetic Sub5 / Hy-Tek result pages for scale testing.
+#
+#   python backend/synth_corpus.py OUT_DIR [--scale 10] [--seed 1] [--seasons 2025,2026]
+#
+# Writes OUT_DIR/{year}/*.htm (the same layout as backend/data/sub5_archive) and an index
+# page OUT_DIR/{year}.html in the shape of the sub5 season pages (date rows above the links).
+# Pages come in the layouts the parser has to handle:
+#   standard    Name / Year / School / Finals / Points, as in data/debug/EMITL-Small-school-boys.htm
+#   prelims     dashes and hurdles run as Prelims (H#, q qualifiers) and then Finals
+#   smaa        SMAA meets: no Year column and a wider School column
+#   paragraph   the standard page as one <p> per line with &nbsp; runs instead of <pre>
+# Every layout has relays with runner lines, lap splits on 800m and longer, exhibition
+# (x-prefixed) marks, DQ/DNS/DNF/NH/FOUL rows, record lines and a team score block.
+#
+# Each meet also records the athlete (relay runners) and team of every result row as printed,
+# so a parse can be checked value by value (check_parsed), not only by row count.
+#
+# `scale` multiplies the meets per season and, by its square root, the team rosters; scale 1
+# is about one of today's seasons per season. The same seed and scale give the same corpus.
+
+SEASONS = ("2023", "2024", "2025", "2026")
+MEETS_PER_SEASON = 30
+ROSTER = 24                  # athletes per team and gender
+TEAMS_PER_MEET = (4, 10)
+ENTRIES_PER_TEAM = (1, 3)    # per individual event
+HEAT_SIZE = 8
+FINALISTS = 8
+POINTS = (10, 8, 6, 4, 2, 1)
+LAYOUTS = {"standard": 6, "prelims": 3, "paragraph": 1}  # weights for the non-SMAA leagues
+LEAGUES = ("EMITL", "KVAC", "PVC", "SMAA", "WMC")
+EXHIBITION_RATE = 0.03
+DQ_RATE = 0.015
+NO_MARK_RATE = 0.02
+WIDTH = 79
+
+# (name, kind, base mark, spread, splits): times in seconds, field marks in inches.
+# `splits` is the number of laps (individual) or legs (relay) with a split, 0 for none.
+EVENTS = (
+    ("55 Meter Dash", "sprint", 7.1, 0.45, 0),
+    ("55 Meter Hurdles", "sprint", 9.0, 0.8, 0),
+    ("200 Meter Dash", "time", 25.8, 1.8, 0),
+    ("400 Meter Dash", "time", 58.0, 4.5, 0),
+    ("800 Meter Run", "time", 136.0, 11.0, 4),
+    ("1 Mile Run", "time", 312.0, 26.0, 8),
+    ("2 Mile Run", "time", 665.0, 55.0, 16),
+    ("4x200 Meter Relay", "relay", 106.0, 6.0, 0),
+    ("4x400 Meter Relay", "relay", 238.0, 12.0, 4),
+    ("4x800 Meter Relay", "relay", 565.0, 30.0, 4),
+    ("High Jump", "field", 62.0, 4.0, 0),
+    ("Pole Vault", "field", 120.0, 14.0, 0),
+    ("Long Jump", "field", 215.0, 18.0, 0),
+    ("Triple Jump", "field", 450.0, 36.0, 0),
+    ("Shot Put", "field", 430.0, 60.0, 0),
+)
+GIRLS_FACTOR = {"sprint": 1.1, "time": 1.13, "relay": 1.13, "field": 0.8}
+
+FIRST_NAMES = {
+    "Boys": ("Aiden", "Ben", "Caleb", "Connor", "Dylan", "Eli", "Ethan", "Gavin", "Henry", "Isaac",
+             "Jack", "Jacob", "Jayden", "Liam", "Logan", "Lucas", "Mason", "Noah", "Owen", "Ryan",
+             "Samuel", "Tristan", "Tyler", "Wyatt", "Zachary", "Brady", "Colby", "Reuben"),
+    "Girls": ("Abigail", "Addison", "Ava", "Brooke", "Chloe", "Ella", "Emma", "Grace", "Hannah",
+              "Isabella", "Kaitlyn", "Lily", "Madison", "Maya", "Mia", "Natalie", "Olivia", "Paige",
+              "Riley", "Sophia", "Sydney", "Taylor", "Zoe", "Hailey", "Julia", "Morgan"),
+}
+LAST_NAMES = ("Adams", "Arsenault", "Baldwin", "Bouchard", "Bradley", "Bryant", "Cannon", "Cote",
+              "Davis", "Dorr", "Dyer", "Fisher", "Forbes", "Gagne", "Hopkins-Watrous", "Jerome",
+              "Kain", "Ladd", "LePage", "Macneil", "Moeykens", "Norgang", "Ouellette", "Parker",
+              "Pelletier", "Poitras", "Provencher", "Reardon", "Richardson", "Riley", "Runnells",
+              "Sawyer", "Tenney", "Thibodeau", "Whitcomb", "Willett", "Williams", "Zimmerman",
+              "Bouchard-Wasson", "DelMonaco", "Laplant", "Morin", "Libby", "Grant", "Leavitt")
+VENUES = ("New Balance Field House, UMaine, Orono, ME", "Bowdoin College, Brunswick, ME",
+          "Colby College, Waterville, ME", "University of Southern Maine, Gorham, ME")
+SCHOOLS = sorted(set(TEAM_MAPPING.values()))
+
+def season_window(year):
+    """First and last Saturday of indoor season `year` (December of the year before to February)."""
+    first = Date(int(year) - 1, 12, 1)
+    first += timedelta(days=(5 - first.weekday()) % 7)
+    return first, Date(int(year), 2, 28)
+
+def format_time(seconds):
+    if seconds < 60:
+        return f"{seconds:.2f}"
+    minutes, rest = divmod(round(seconds, 2), 60)
+    return f"{int(minutes)}:{rest:05.2f}"
+
+def format_distance(inches):
+    inches = round(inches * 4) / 4
+    feet, rest = divmod(inches, 12)
+    return f"{int(feet)}-{rest:05.2f}"
+
+def layout_row(cells):
+    """Fixed-width line from (text, column, align) cells, left to right. 'r' cells end at column."""
+    line = ""
+    for text, column, align in cells:
+        start = column - len(text) if align == 'r' else column
+        line = line.ljust(max(start, len(line) + 1 if line else start)) + text
+    return line
+
+def centered(text):
+    return text.center(WIDTH)
+
+class Athlete:
+    def __init__(self, name, year, talent):
+        self.name = name
+        self.year = year
+        self.talent = talent
+
+class Corpus:
+    def __init__(self, scale=1.0, seed=1):
+        self.scale = scale
+        self.seed = seed
+
+    def rosters(self, rng):
+        size = max(4, round(ROSTER * math.sqrt(self.scale)))
+        rosters = {}
+        for school in SCHOOLS:
+            for gender, firsts in FIRST_NAMES.items():
+                rosters[school, gender] = [
+                    Athlete(f"{rng.choice(firsts)} {rng.choice(LAST_NAMES)}", rng.randint(9, 12), rng.gauss(0, 1))
+                    for _ in range(size)]
+        return rosters
+
+    def mark(self, rng, event, gender, talent):
+        name, kind, base, spread, _ = event
+        base *= GIRLS_FACTOR[kind] if gender == "Girls" else 1
+        quality = talent + rng.gauss(0, 0.35)
+        if kind == "field":
+            return max(base * 0.4, base + spread * quality)
+        return max(base * 0.8, base - spread * quality)
+
+    def no_mark(self, rng, event):
+        name, kind = event[0], event[1]
+        if kind == "field":
+            return "NH" if name in ("High Jump", "Pole Vault") else "FOUL"
+        return rng.choice(("DNS", "DNF", "DQ") if kind == "time" and event[4] else ("DNS", "DQ"))
+
+    def splits(self, rng, total, laps):
+        """Cumulative splits with a lap time for each, as Hy-Tek prints them: 33.12 (33.12)."""
+        weights = [rng.uniform(0.9, 1.1) for _ in range(laps)]
+        weights[0] *= 0.93  # fast first lap
+        cumulative = 0.0
+        parts = []
+        for w in weights:
+            lap = total * w / sum(weights)
+            cumulative += lap
+            parts.append(f"{format_time(cumulative)} ({format_time(lap)})")
+        return [" " * 5 + "  ".join(parts[i:i + 5]) for i in range(0, len(parts), 5)]
+
+    def meets(self, year):
+        """(filename, date, league, layout) for each meet of a season."""
+        rng = random.Random(f"{self.seed}-{year}-meets")
+        first, last = season_window(year)
+        saturdays = (last - first).days // 7 + 1
+        meets = []
+        for n in range(max(1, round(MEETS_PER_SEASON * self.scale))):
+            league = rng.choice(LEAGUES)
+            layout = "smaa" if league == "SMAA" else rng.choices(list(LAYOUTS), list(LAYOUTS.values()))[0]
+            day = first + timedelta(days=7 * rng.randrange(saturdays))
+            meets.append((f"synth-{year}-{league.lower()}-meet{n + 1:03d}-results.htm", day, league, layout))
+        return meets
+
+    def season(self, year, output_dir, seasons=SEASONS):
+        """Writes one season's pages and index. Returns (files, bytes, {file stem: result rows})."""
+        rng = random.Random(f"{self.seed}-{year}")
+        rosters = self.rosters(rng)
+        archive_dir = os.path.join(output_dir, year)
+        os.makedirs(archive_dir, exist_ok=True)
+        files = size = 0
+        rows = {}
+        index = []
+        for filename, day, league, layout in self.meets(year):
+            lines, rows[os.path.splitext(filename)[0]] = self.meet_lines(rng, rosters, day, league, layout)
+            page = paragraph_page(lines) if layout == "paragraph" else pre_page(lines)
+            path = os.path.join(archive_dir, filename)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(page)
+            files += 1
+            size += os.path.getsize(path)
+            index.append((day, filename, league))
+        with open(os.path.join(output_dir, f"{year}.html"), 'w', encoding='utf-8') as f:
+            f.write(index_page(year, index, seasons))
+        return files, size, rows
+
+    def meet_lines(self, rng, rosters, day, league, layout):
+        teams = rng.sample(SCHOOLS, min(len(SCHOOLS), rng.randint(*TEAMS_PER_MEET)))
+        date_str = f"{day.month}/{day.day}/{day.year}"
+        lines = [
+            f"Licensed to Sub5 Timing - Hy-Tek's MEET MANAGER   {date_str} 03:21 PM  Page 1",
+            centered(f"{day.year} {league} Meet {rng.randint(1, 6)} - {date_str}"),
+            centered(rng.choice(VENUES)),
+            centered("Results"),
+            " ",
+        ]
+        numbered = rng.random() < 0.3
+        number = 0
+        rows = []
+        for gender in ("Girls", "Boys"):
+            for event in EVENTS:
+                number += 1
+                title = f"Event {number}  {gender} {event[0]}" if numbered else f"{gender} {event[0]}"
+                if event[1] == "relay":
+                    block = self.relay_block(rng, rosters, teams, gender, event, title, layout, rows)
+                else:
+                    block = self.individual_blocks(rng, rosters, teams, gender, event, title, layout, rows)
+                lines.extend(block)
+        for gender in ("Women", "Men"):
+            lines.extend(self.team_scores(rng, teams, gender))
+        return lines, rows
+
+    def header(self, title, event, layout, column, relay=False):
+        rule = "=" * (67 if column == "Prelims" else 71)
+        base = event[2] * (0.92 if event[1] != "field" else 1.12)
+        record = layout_row([("Meet Record: M", 0, 'l'), (self.format_mark(event, base), 22, 'r'),
+                             ("2019", 24, 'l'), (", School" if relay else "Record Holder, School", 36, 'l')])
+        lines = [title, rule, record]
+        if relay:
+            lines.append(" " * 25 + "A. Runner, B. Runner, C. Runner, D. Runner")
+            cells = [("School", 4, 'l'), ("Finals", 63, 'r'), ("Points", 65, 'l')]
+        elif layout == "smaa":
+            cells = [("Name", 4, 'l'), ("School", 30, 'l'), (column, 60, 'r'), ("Points", 62, 'l')]
+        elif column == "Prelims":
+            cells = [("Name", 4, 'l'), ("Year", 28, 'l'), ("School", 33, 'l'), ("Prelims", 63, 'r'), ("H#", 65, 'l')]
+        else:
+            cells = [("Name", 4, 'l'), ("Year", 28, 'l'), ("School", 33, 'l'), ("Finals", 63, 'r'), ("Points", 65, 'l')]
+        lines.extend([layout_row(cells), rule])
+        return lines
+
+    def individual_row(self, place, athlete, school, mark, extra, layout, column, rows):
+        """One result line; appends its (athlete, team) as printed to `rows`."""
+        if layout == "smaa":
+            # The parser reads the school from 5 columns left of the School header, so the
+            # name has to end before column 25; the school ends 2+ spaces before an x12:31.45
+            name, team = athlete.name[:20].rstrip(), school[:18].rstrip()
+            cells = [(place, 3, 'r'), (name, 4, 'l'), (team, 30, 'l'), (mark, 60, 'r')]
+            if extra:
+                cells.append((extra, 65, 'r'))
+        else:
+            name, team = athlete.name[:24].rstrip(), school[:12].rstrip()
+            cells = [(place, 3, 'r'), (name, 4, 'l'), (str(athlete.year), 32, 'r'), (team, 33, 'l'), (mark, 63, 'r')]
+            if extra:
+                cells.append((extra, 65, 'l') if column == "Prelims" else (extra, 68, 'r'))
+        rows.append((name, team))
+        return layout_row(cells) + " "
+
+    def entries(self, rng, rosters, teams, gender, event):
+        entries = []
+        for school in teams:
+            roster = rosters[school, gender]
+            for athlete in rng.sample(roster, min(len(roster), rng.randint(*ENTRIES_PER_TEAM))):
+                entries.append((athlete, school, self.mark(rng, event, gender, athlete.talent)))
+        return entries
+
+    def ranked(self, rng, entries, event):
+        """Splits entries into placed (best first), exhibition and no-mark rows."""
+        placed, exhibition, no_marks = [], [], []
+        for entry in entries:
+            roll = rng.random()
+            if roll < EXHIBITION_RATE:
+                exhibition.append(entry)
+            elif roll < EXHIBITION_RATE + DQ_RATE:
+                no_marks.append((entry, "DQ"))
+            elif roll < EXHIBITION_RATE + DQ_RATE + NO_MARK_RATE:
+                no_marks.append((entry, self.no_mark(rng, event)))
+            else:
+                placed.append(entry)
+        placed.sort(key=lambda e: -e[2] if event[1] == "field" else e[2])
+        return placed, exhibition, no_marks
+
+    def format_mark(self, event, value):
+        return format_distance(value) if event[1] == "field" else format_time(value)
+
+    def individual_blocks(self, rng, rosters, teams, gender, event, title, layout, rows):
+        entries = self.entries(rng, rosters, teams, gender, event)
+        lines = []
+        if layout == "prelims" and event[1] == "sprint":
+            placed, exhibition, no_marks = self.ranked(rng, entries, event)
+            lines.extend(self.header(title, event, layout, "Prelims"))
+            lines.append("Preliminaries")
+            for i, (athlete, school, value) in enumerate(placed):
+                mark = self.format_mark(event, value) + ("q" if i < FINALISTS else "")
+                lines.append(self.individual_row(str(i + 1), athlete, school, mark,
+                                                 str(i % max(1, math.ceil(len(entries) / HEAT_SIZE)) + 1),
+                                                 layout, "Prelims", rows))
+            self.unplaced(lines, exhibition, no_marks, event, layout, "Prelims", rows)
+            lines.append(" ")
+            entries = [(a, s, self.mark(rng, event, gender, a.talent)) for a, s, _ in placed[:FINALISTS]]
+            lines.extend(self.header(title, event, layout, "Finals"))
+            lines.append("Finals")
+        else:
+            lines.extend(self.header(title, event, layout, "Finals"))
+        placed, exhibition, no_marks = self.ranked(rng, entries, event)
+        for i, (athlete, school, value) in enumerate(placed):
+            points = str(POINTS[i]) if i < len(POINTS) else ""
+            lines.append(self.individual_row(str(i + 1), athlete, school, self.format_mark(event, value),
+                                             points, layout, "Finals", rows))
+            if event[4]:
+                lines.extend(self.splits(rng, value, event[4]))
+        self.unplaced(lines, exhibition, no_marks, event, layout, "Finals", rows)
+        lines.append(" ")
+        return lines
+
+    def unplaced(self, lines, exhibition, no_marks, event, layout, column, rows):
+        for athlete, school, value in exhibition:
+            lines.append(self.individual_row("--", athlete, school, "x" + self.format_mark(event, value), "",
+                                             layout, column, rows))
+        for (athlete, school, _), status in no_marks:
+            lines.append(self.individual_row("--", athlete, school, status, "", layout, column, rows))
+
+    def relay_block(self, rng, rosters, teams, gender, event, title, layout, rows):
+        lines = self.header(title, event, layout, "Finals", relay=True)
+        results = []
+        for school in teams:
+            runners = rng.sample(rosters[school, gender], 4)
+            talent = sum(r.talent for r in runners) / 4
+            results.append((school, runners, self.mark(rng, event, gender, talent)))
+        placed, exhibition, no_marks = self.ranked(rng, results, event)
+        placings = [(str(i + 1), r, self.format_mark(event, r[2]), str(POINTS[i]) if i < len(POINTS) else "")
+                    for i, r in enumerate(placed)]
+        placings += [("--", r, "x" + self.format_mark(event, r[2]), "") for r in exhibition]
+        placings += [("--", r, status, "") for r, status in no_marks]
+        for place, (school, runners, value), mark, points in placings:
+            cells = [(place, 3, 'r'), (school, 4, 'l'), (mark, 63, 'r')]
+            if points:
+                cells.append((points, 68, 'r'))
+            lines.append(layout_row(cells) + "   ")
+            names = [r.name if layout == "smaa" else f"{r.name} {r.year}" for r in runners]
+            lines.append(layout_row([(f"1) {names[0]}", 5, 'l'), (f"2) {names[1]}", 37, 'l')]))
+            lines.append(layout_row([(f"3) {names[2]}", 5, 'l'), (f"4) {names[3]}", 37, 'l')]))
+            rows.append((tuple(r.name for r in runners), school))
+            if event[4] and mark[0].isdigit():
+                lines.extend(self.splits(rng, value, event[4]))
+        lines.append(" ")
+        return lines
+
+    def team_scores(self, rng, teams, gender):
+        lines = [centered(f"{gender} - Team Rankings - {len(EVENTS)} Events Scored"), "=" * WIDTH]
+        scores = sorted(((rng.randint(0, 150), school) for school in teams), reverse=True)
+        for i in range(0, len(scores), 2):
+            cells = []
+            for j, (score, school) in enumerate(scores[i:i + 2]):
+                cells += [(f"{i + j + 1})", 7 + 40 * j, 'r'), (school[:25], 8 + 40 * j, 'l'), (str(score), 38 + 40 * j, 'r')]
+            lines.append(layout_row(cells))
+        lines.append(" ")
+        return lines
+
+def pre_page(lines):
+    return "<HTML>\n<BODY>\n<P>\n<PRE>\n\n" + "\n".join(html.escape(l, quote=False) for l in lines) + "\n</PRE>\n</BODY>\n</HTML>\n"
+
+def paragraph_page(lines):
+    """One <p> per line; runs of spaces become &nbsp; so the columns survive HTML whitespace rules."""
+    def nbsp(line):
+        escaped = html.escape(line, quote=False)
+        out = []
+        run = 0
+        for ch in escaped + "\0":
+            if ch == " ":
+                run += 1
+                continue
+            if run:
+                out.append(" " if run == 1 else "&nbsp;" * (run - 1) + " ")
+                run = 0
+            out.append(ch)
+        return "".join(out[:-1]) or "&nbsp;"
+    body = "\n".join(f'<p class="MsoPlainText" style="margin:0">{nbsp(l)}</p>' for l in lines)
+    return f"<html>\n<body>\n{body}\n</body>\n</html>\n"
+
+def index_page(year, meets, seasons):
+    """Season links, then a table with a date row above each meet's link (see meet_dates.web_dates_from_soup)."""
+    links = " - ".join(f'<a href="/youth-pages/indoor-track/{y}-indoor-results/">{y}</a>' for y in seasons)
+    rows = []
+    for day, filename, league in sorted(meets):
+        rows.append(f"<tr><td>{day.strftime('%B')} {day.day}, {day.year}</td>"
+                    f"<td><a href=\"{year}/{filename}\">{league} results</a></td></tr>")
+    return (f"<html><body><h1>{year} Indoor Results</h1>\n<p>{links}</p>\n<table>\n" + "\n".join(rows) +
+            "\n</table>\n</body></html>\n")
+
+def generate_corpus(output_dir, scale=1.0, seed=1, seasons=SEASONS):
+    """Writes the corpus. Returns {year: {"dir", "files", "bytes", "results", "rows"}}, where
+    "rows" maps each file stem to its (athlete, team) result rows (see check_parsed)."""
+    corpus = Corpus(scale, seed)
+    summary = {}
+    for year in seasons:
+        files, size, rows = corpus.season(year, output_dir, seasons)
+        summary[year] = {"dir": os.path.join(output_dir, year), "files": files, "bytes": size,
+                         "results": sum(len(r) for r in rows.values()), "rows": rows}
+    return summary
+
+def parsed_rows(path):
+    """(athlete, team) rows of a parser JSON file, in the shape Corpus records them."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    events = data.get("events", []) if isinstance(data, dict) else data
+    return [(tuple(r.get("athletes", [])) if e.get("is_relay") else r.get("athlete"), r.get("school"))
+            for e in events for r in e.get("results", [])]
+
+def check_parsed(rows, json_dir, examples=5):
+    """Compares the parser's JSON in `json_dir` with the generated `rows` ({file stem: rows}).
+    Returns (parsed, wrong, samples): parsed rows, parsed rows whose athlete or team is not one
+    the file was generated with, and up to `examples` of those as (file, athlete, team)."""
+    parsed = wrong = 0
+    samples = []
+    for stem, expected in sorted(rows.items()):
+        path = os.path.join(json_dir, stem + ".json")
+        if not os.path.exists(path):
+            continue
+        found = parsed_rows(path)
+        parsed += len(found)
+        unexpected = Counter(found) - Counter(expected)
+        wrong += sum(unexpected.values())
+        samples += [(stem, athlete, team) for athlete, team in unexpected][:max(0, examples - len(samples))]
+    return parsed, wrong, samples
+
+def parse_args(argv):
+    """--scale, --seed and --seasons options; returns (options, positional args)."""
+    options = {"scale": 1.0, "seed": 1, "seasons": SEASONS}
+    rest = []
+    i = 0
+    while i < len(argv):
+        if argv[i] in ("--scale", "--seed", "--seasons") and i + 1 < len(argv):
+            key, value = argv[i][2:], argv[i + 1]
+            options[key] = float(value) if key == "scale" else int(value) if key == "seed" else tuple(value.split(','))
+            i += 2
+        else:
+            rest.append(argv[i])
+            i += 1
+    return options, rest
+
+if __name__ == "__main__":
+    options, rest = parse_args(sys.argv[1:])
+    if not rest:
+        print("usage: python backend/synth_corpus.py OUT_DIR [--scale 1] [--seed 1] [--seasons 2025,2026]")
+        sys.exit(2)
+    summary = generate_corpus(rest[0], **options)
+    for year, s in summary.items():
+        print(f"{year}: {s['files']} files, {s['bytes'] / 1024 / 1024:.1f} MB, {s['results']} results -> {s['dir']}")
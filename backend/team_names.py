@@ -0,0 +1,73 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Team-name matching shared by the scraper (TEAM_MAPPING) and the performance-list
+# analyzer (PVC_SMALL_SCHOOLS).
+#
+# The mapping keys are folded into a character trie once. A lookup walks the raw name
+# a single time and keeps the LONGEST key that matches, so the cost depends on the
+# length of the name rather than on how many keys there are. It also means that
+# "Bangor Christian" can't be captured by "Bangor", whatever order the keys are in.
+# Raw names repeat thousands of times per sync, so results are memoized.
+
+_END = object()
+
+# Hy-Tek appends entry codes to truncated school names: "George Steve J12.34 ..."
+_ENTRY_CODE = re.compile(r'\s+J[\d\.\-\':]+.*')
+
+class TeamNameNormalizer:
+    def __init__(self, mapping, cache_size=4096):
+        self.trie = {}
+        for key, canonical in mapping.items():
+            node = self.trie
+            for ch in key.casefold():
+                node = node.setdefault(ch, {})
+            node[_END] = canonical
+        self.unmapped = Counter()
+        self._normalize = lru_cache(maxsize=cache_size)(self._normalize_uncached)
+        self._find = lru_cache(maxsize=cache_size)(self._find_uncached)
+
+    def _longest_prefix(self, text, start=0):
+        node = self.trie
+        found = None
+        for ch in text[start:]:
+            node = node.get(ch)
+            if node is None:
+                break
+            if _END in node:
+                found = node[_END]
+        return found
+
+    def _normalize_uncached(self, name):
+        name = _ENTRY_CODE.sub('', name.strip())
+        return name, self._longest_prefix(name.casefold())
+
+    def normalize(self, name):
+        """Canonical name for a raw result-file team name; unmapped names are returned cleaned."""
+        if not name:
+            return "Unknown"
+        cleaned, canonical = self._normalize(name)
+        if canonical is None:
+            self.unmapped[cleaned] += 1
+            return cleaned
+        return canonical
+
+    def _find_uncached(self, text):
+        folded = text.casefold()
+        for start in range(len(folded)):
+            found = self._longest_prefix(folded, start)
+            if found is not None:
+                return found
+        return None
+
+    def find(self, text):
+        """Canonical name for the first key appearing anywhere in text, or None."""
+        if not text:
+            return None
+        return self._find(text)
+
+    def pop_unmapped(self):
+        """Returns {raw name: rows} seen since the last call and resets the counts."""
+        unmapped, self.unmapped = self.unmapped, Counter()
+        return unmapped
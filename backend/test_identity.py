@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+try:
+    from backend.database import create_schema
+    from backend.identity import record_candidates, set_status, approve_above, apply_approved, MIN_CONFIDENCE
+    from backend.resync_db import resync
+    from backend.scraper import Sub5Scraper
+except ImportError:
+    from database import create_schema
+    from identity import record_candidates, set_status, approve_above, apply_approved, MIN_CONFIDENCE
+    from resync_db import resync
+    from scraper import Sub5Scraper
+
+# Checks for identity.py merges against scratch databases.
+#
+#   python backend/test_identity.py
+
+def scratch_db(names):
+    """In-memory DB with one athlete per name (ids from 1) and one 1600m result each."""
+    conn = sqlite3.connect(':memory:')
+    create_schema(conn)
+    conn.executemany('INSERT INTO athletes (id, name) VALUES (?, ?)', list(enumerate(names, 1)))
+    conn.execute("INSERT INTO events (id, name) VALUES (1, '1600 Meters')")
+    conn.executemany('INSERT INTO performances (athlete_id, event_id, mark, date) VALUES (?, 1, ?, ?)',
+                     [(i, f'4:5{i}.00', f'2025-04-0{i}') for i in range(1, len(names) + 1)])
+    return conn
+
+def test_chained_merges():
+    """Approved 1 <- 2 and 2 <- 3: everything ends up on athlete 1, with no dangling foreign keys."""
+    conn = scratch_db(["Christopher Smith", "Chris Smith", "Chris Smyth"])
+    conn.execute("INSERT INTO athlete_aliases (alias, athlete_id) VALUES ('Smyth, Chris', 3)")
+    record_candidates(conn, [(1, 2, 0.92, "test"), (2, 3, 0.86, "test")])
+    approve_above(conn, MIN_CONFIDENCE)
+
+    assert apply_approved(conn) == 2
+    assert conn.execute('PRAGMA foreign_key_check').fetchall() == []
+    assert {r[0] for r in conn.execute('SELECT DISTINCT athlete_id FROM performances')} == {1}
+    assert {r[0] for r in conn.execute('SELECT DISTINCT athlete_id FROM athlete_aliases')} == {1}
+    conn.close()
+
+def test_conflicting_candidates_superseded():
+    """Merging 2 into 1 turns the pending 2 <- 3 into 1 <- 3, which already exists: the
+    duplicate is superseded, and no open candidate refers to the deleted athlete."""
+    conn = scratch_db(["Christopher Smith", "Chris Smith", "Chris Smyth"])
+    record_candidates(conn, [(1, 2, 0.95, "test"), (2, 3, 0.90, "test"), (1, 3, 0.85, "test")])
+    set_status(conn, [1], "approved")
+
+    assert apply_approved(conn) == 1
+    open_rows = conn.execute('''
+        SELECT keep_id, merge_id FROM athlete_merge_candidates WHERE status IN ('pending', 'approved')
+    ''').fetchall()
+    assert open_rows == [(1, 3)]
+    statuses = dict(conn.execute('SELECT id, status FROM athlete_merge_candidates').fetchall())
+    assert statuses == {1: 'applied', 2: 'superseded', 3: 'pending'}
+    conn.close()
+
+MEET = {
+    "date": "2025-01-11",
+    "events": [
+        {"event": "1600 Meters", "gender": "Boys", "results": [
+            {"athlete": "Christopher Smith", "school": "Bangor", "result": "4:50.00"},
+            {"athlete": "Smith, Chris", "school": "Bangor", "result": "4:58.00"},
+            {"athlete": "Chris Smyth", "school": "Bangor", "result": "5:02.00"},
+        ]},
+        {"event": "4x800 Relay", "gender": "Boys", "is_relay": True, "results": [
+            {"school": "Bangor", "result": "9:01.00",
+             "athletes": ["Christopher Smith", "Chris Smyth", "Alex Reed", "Sam Cole"]},
+        ]},
+    ],
+}
+
+def test_merge_survives_resync():
+    """An applied merge and a rejected candidate are still there after resync_db rebuilds the DB."""
+    work_dir = tempfile.mkdtemp(prefix='sub5-identity-')
+    try:
+        db_path = os.path.join(work_dir, 'track.db')
+        data_dir = os.path.join(work_dir, 'data')
+        os.makedirs(os.path.join(data_dir, 'parsed_results', '2025'))
+        with open(os.path.join(data_dir, 'parsed_results', '2025', 'test-meet.json'), 'w') as f:
+            json.dump(MEET, f)
+
+        def rebuild():
+            resync(Sub5Scraper(db_path=db_path, data_dir=data_dir, progress_callback=lambda *a: None), years=["2025"])
+
+        def athlete(conn, name):
+            return conn.execute('SELECT id FROM athletes WHERE name = ?', (name,)).fetchone()[0]
+
+        rebuild()
+        conn = sqlite3.connect(db_path)
+        chris, smith, smyth = (athlete(conn, n) for n in ("Christopher Smith", "Smith, Chris", "Chris Smyth"))
+        record_candidates(conn, [(chris, smith, 0.92, "test"), (chris, smyth, 0.85, "test")])
+        approve_above(conn, 0.9)
+        set_status(conn, [2], "rejected")
+        assert apply_approved(conn) == 1
+        conn.close()
+
+        rebuild()
+        conn = sqlite3.connect(db_path)
+        chris, smyth = athlete(conn, "Christopher Smith"), athlete(conn, "Chris Smyth")
+        assert conn.execute("SELECT COUNT(*) FROM athletes WHERE name = 'Smith, Chris'").fetchone()[0] == 0
+        assert conn.execute('SELECT athlete_id FROM athlete_aliases').fetchall() == [(chris,)]
+        marks = {r[0] for r in conn.execute('SELECT mark FROM performances WHERE athlete_id = ?', (chris,))}
+        assert marks == {"4:50.00", "4:58.00"}
+        assert conn.execute('SELECT keep_id, merge_id, status FROM athlete_merge_candidates').fetchall() == \
+            [(chris, smyth, 'rejected')]
+        assert conn.execute('PRAGMA foreign_key_check').fetchall() == []
+        conn.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    for test in (test_chained_merges, test_conflicting_candidates_superseded, test_merge_survives_resync):
+        test()
+        print(f"{test.__name__}: OK")
@@ -1,6 +1,7 @@
 
 import React, { useState, useEffect, useMemo } from 'react'
-import { isBetter } from './utils'
+import { isBetter, performerKey } from './utils'
+import { loadManifest, manifestTeams, shardFiles, loadTeamShards } from './data'
 import PerformanceList from './PerformanceList'
 import PRPopCalculator from './PRPopCalculator'
 import './App.css'
@@ -15,7 +16,9 @@ import MeetSheet from './MeetSheet'
 import AthleteProfile from './AthleteProfile'
 
 function App() {
-  const [allPerformances, setAllPerformances] = useState([])
+  const [manifest, setManifest] = useState(null)
+  const [loadedShards, setLoadedShards] = useState({}) // shard file -> rows
+  const [apiPerformances, setApiPerformances] = useState(null) // local dev fallback
   const [dataLoaded, setDataLoaded] = useState(false)
 
   const [selectedTeam, setSelectedTeam] = useState('George Stevens Academy')
@@ -35,32 +38,49 @@ function App() {
   const [sortField, setSortField] = useState('date') // 'date' or 'mark/result'
   const [sortDirection, setSortDirection] = useState('desc')
 
-  // Load static data on mount
+  // Load the static export manifest on mount
   useEffect(() => {
-    fetch('/data.json')
-      .then(res => res.json())
-      .then(data => {
-        setAllPerformances(data)
-        setDataLoaded(true)
-      })
+    loadManifest()
+      .then(setManifest)
       .catch(err => {
-        console.error('Error loading data.json:', err)
-        // Fallback for local dev if data.json isn't exported yet
+        console.error('Error loading data manifest:', err)
+        // Fallback for local dev if the data isn't exported yet
         fetch('http://localhost:8000/performances')
           .then(res => res.json())
           .then(data => {
-            setAllPerformances(data)
+            setApiPerformances(data)
             setDataLoaded(true)
           })
           .catch(e => console.error('Local dev fallback failed:', e))
       })
   }, [])
 
+  // Only the shards for the team in view are fetched; the analyzer compares every team
+  const teamInView = activeTab === 'analyzer' ? 'All' : selectedTeam
+  useEffect(() => {
+    if (!manifest) return
+    let cancelled = false
+    loadTeamShards(manifest, teamInView)
+      .then(shards => {
+        if (cancelled) return
+        setLoadedShards(prev => ({ ...prev, ...shards }))
+        setDataLoaded(true)
+      })
+      .catch(err => console.error('Error loading data shards:', err))
+    return () => { cancelled = true }
+  }, [manifest, teamInView])
+
+  const allPerformances = useMemo(() => {
+    if (!manifest) return apiPerformances || []
+    return shardFiles(manifest, teamInView).flatMap(f => loadedShards[f] || [])
+  }, [manifest, apiPerformances, loadedShards, teamInView])
+
   // Derived: Unique Teams
   const teams = useMemo(() => {
+    if (manifest) return manifestTeams(manifest)
     const t = new Set(allPerformances.map(p => p.team).filter(Boolean))
     return Array.from(t).sort()
-  }, [allPerformances])
+  }, [manifest, allPerformances])
 
   // Derived: Athletes for the current view
   const athletes = useMemo(() => {
@@ -71,7 +91,14 @@ function App() {
 
     const uniqueAthletes = {}
     filtered.forEach(p => {
-      if (!uniqueAthletes[p.athlete_id]) {
+      if (p.relay_legs) {
+        // Relays have no athlete of their own; list each runner instead
+        p.relay_legs.forEach(l => {
+          if (!uniqueAthletes[l.athlete_id]) {
+            uniqueAthletes[l.athlete_id] = { id: l.athlete_id, name: l.athlete_name }
+          }
+        })
+      } else if (p.athlete_id != null && !uniqueAthletes[p.athlete_id]) {
         uniqueAthletes[p.athlete_id] = { id: p.athlete_id, name: p.athlete_name }
       }
     })
@@ -85,10 +112,12 @@ function App() {
     if (selectedAthlete.id === 'all') {
       return allPerformances
     }
-    return allPerformances.filter(p => p.athlete_id === selectedAthlete.id)
+    return allPerformances.filter(p => p.athlete_id === selectedAthlete.id ||
+      (p.relay_legs && p.relay_legs.some(l => l.athlete_id === selectedAthlete.id)))
   }, [allPerformances, selectedAthlete])
 
   const [isScraping, setIsScraping] = useState(false)
+  const [scrapeJobId, setScrapeJobId] = useState(null)
   const [scrapeStatus, setScrapeStatus] = useState({ message: '', progress: 0 })
 
   const isLocalDev = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1'
@@ -99,7 +128,9 @@ function App() {
       const url = `http://localhost:8000/scrape/sub5?full=${full}`
       const res = await fetch(url, { method: 'POST' })
       const result = await res.json()
-      if (result.status === 'started' || result.status === 'busy') {
+      if (result.status === 'started' || result.status === 'queued') {
+        setScrapeJobId(result.job_id)
+        setScrapeStatus({ message: result.status === 'queued' ? 'Queued behind another scrape...' : 'Starting scrape...', progress: 0 })
         setIsScraping(true)
       } else {
         throw new Error(result.message || 'Failed to start')
@@ -110,28 +141,33 @@ function App() {
     }
   }
 
-  // Polling for scrape status (Local Only)
+  // Scrape progress pushed by the API as Server-Sent Events (Local Only)
   useEffect(() => {
-    if (!isLocalDev || !isScraping) return
-    const interval = setInterval(async () => {
-      try {
-        const res = await fetch('http://localhost:8000/scrape/status')
-        const data = await res.json()
-        setScrapeStatus({ message: data.message, progress: data.progress })
-        if (!data.is_active) {
-          setIsScraping(false)
-          if (data.message.includes('Finished')) {
-            alert(data.message)
-          }
-          window.location.reload() // Reload to get new data.json if built
+    if (!isLocalDev || !isScraping || !scrapeJobId) return
+    const events = new EventSource(`http://localhost:8000/jobs/events?job=${scrapeJobId}`)
+    events.addEventListener('job', (e) => {
+      const job = JSON.parse(e.data)
+      if (job.id !== scrapeJobId) return // a season sub-job; the scrape job carries the overall progress
+      setScrapeStatus({ message: job.message, progress: job.progress })
+      if (['succeeded', 'failed', 'cancelled'].includes(job.state)) {
+        events.close()
+        setIsScraping(false)
+        if (job.state === 'succeeded') {
+          alert(`Finished. ${job.result.inserted} results updated.`)
+        } else {
+          alert(`Scrape ${job.state}${job.error ? `: ${job.error}` : ''}`)
         }
-      } catch (err) {
-        console.error('Status check error:', err)
-        clearInterval(interval)
+        window.location.reload() // Refetch manifest.json (no-cache), which points at any shards re-exported since
       }
-    }, 1000)
-    return () => clearInterval(interval)
-  }, [isScraping, isLocalDev])
+    })
+    events.onerror = (err) => console.error('Scrape event stream error:', err)
+    return () => events.close()
+  }, [isScraping, isLocalDev, scrapeJobId])
+
+  const cancelScrape = async () => {
+    if (!scrapeJobId) return
+    await fetch(`http://localhost:8000/jobs/${scrapeJobId}/cancel`, { method: 'POST' })
+  }
 
   // Reset filters and sort when changing view (selectedAthlete or selectedTeam)
   useEffect(() => {
@@ -167,8 +203,8 @@ function App() {
         type = match[2]
       }
 
-      const prK = `${p.athlete_id}|${p.event}|${type}`
-      const sbK = `${p.athlete_id}|${year}|${type}|${p.event}`
+      const prK = `${performerKey(p)}|${p.event}|${type}`
+      const sbK = `${performerKey(p)}|${year}|${type}|${p.event}`
 
       // First Time
       if (!seenEvents.has(prK)) {
@@ -200,8 +236,8 @@ function App() {
         year = year || match[1]
         type = match[2]
       }
-      const prK = `${p.athlete_id}|${p.event}|${type}`
-      const sbK = `${p.athlete_id}|${year}|${type}|${p.event}`
+      const prK = `${performerKey(p)}|${p.event}|${type}`
+      const sbK = `${performerKey(p)}|${year}|${type}|${p.event}`
 
       if (p.mark === absoluteBests[prK] && !claimedPR.has(prK)) {
         absoluteBestIds.add(p.id)
@@ -413,6 +449,13 @@ function App() {
                 <span className="progress-msg">{scrapeStatus.message}</span>
                 <span className="progress-pct">{scrapeStatus.progress}%</span>
               </div>
+              <div
+                className="full-rescrape-link"
+                onClick={cancelScrape}
+                style={{ fontSize: '0.7rem', color: '#a0aec0', cursor: 'pointer', marginTop: '4px', textAlign: 'center', textDecoration: 'underline' }}
+              >
+                Cancel
+              </div>
             </div>
           )}
 
@@ -1,5 +1,5 @@
 import React, { useState, useMemo } from 'react';
-import { parseMark } from './utils';
+import { parseMark, performerKey } from './utils';
 
 const formatImprovement = (pNew, pOld) => {
     const diff = pOld.value - pNew.value; // For time: positive means improved (new is smaller). For distance: negative means improved (new is larger).
@@ -32,7 +32,7 @@ const PRPopCalculator = ({ performances, selectedTeam, isBetter }) => {
                 if (match) type = match[2];
             }
 
-            const key = `${p.athlete_id}|${p.event}|${type}`;
+            const key = `${performerKey(p)}|${p.event}|${type}`;
             const pDateStr = p.date || '1970-01-01';
             if (!firstDatesMap[key] || new Date(pDateStr) < new Date(firstDatesMap[key])) {
                 firstDatesMap[key] = pDateStr;
@@ -71,7 +71,7 @@ const PRPopCalculator = ({ performances, selectedTeam, isBetter }) => {
 
         const bestOfMeetDay = {};
         meetPerformances.forEach(p => {
-            const key = `${p.athlete_id}|${p.event}`;
+            const key = `${performerKey(p)}|${p.event}`;
             if (!bestOfMeetDay[key] || isBetter(p.mark, bestOfMeetDay[key].mark)) {
                 bestOfMeetDay[key] = p;
             }
@@ -86,7 +86,7 @@ const PRPopCalculator = ({ performances, selectedTeam, isBetter }) => {
 
             // Find all historical performances for this athlete/event/type BEFORE THIS DAY
             const prevPerformances = performances.filter(prev =>
-                prev.athlete_id === p.athlete_id &&
+                performerKey(prev) === performerKey(p) &&
                 prev.event === p.event &&
                 new Date(prev.date.split('T')[0]) < new Date(actualMeetDate)
             );
@@ -117,7 +117,7 @@ const PRPopCalculator = ({ performances, selectedTeam, isBetter }) => {
 
             // Find the best previous mark
             const prevPerformances = performances.filter(prev =>
-                prev.athlete_id === p.athlete_id &&
+                performerKey(prev) === performerKey(p) &&
                 prev.event === p.event &&
                 new Date(prev.date) < new Date(p.date)
                 // We could also filter by pType but PR usually spans years in same event
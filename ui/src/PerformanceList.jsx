@@ -297,10 +297,15 @@ function PVCSimulator({ performances, isBetter }) {
             athleteEntries[name].push(e);
         });
 
-        relayEntries.forEach(e => {
-            // Relays usually have athlete names like "A, B, C, D"
+        // Relay runners come from relay_legs; older exports only have "A, B, C, D" names
+        const relayMembers = (e) => {
+            if (e.relay_legs) return e.relay_legs.map(l => l.athlete_name);
             const nameStr = e.athlete_name || "";
-            const members = nameStr.split(',').map(n => n.trim()).filter(Boolean);
+            return nameStr.split(',').map(n => n.trim()).filter(Boolean);
+        };
+
+        relayEntries.forEach(e => {
+            const members = relayMembers(e);
             members.forEach(m => {
                 if (!athleteEntries[m]) athleteEntries[m] = [];
                 athleteEntries[m].push({ ...e, isRelayLeg: true, relayRef: e });
@@ -323,8 +328,7 @@ function PVCSimulator({ performances, isBetter }) {
             });
         });
         relayEntries.forEach(e => {
-            const nameStr = e.athlete_name || "";
-            const members = nameStr.split(',').map(n => n.trim()).filter(Boolean);
+            const members = relayMembers(e);
             allPossibleScoringActions.push({
                 type: 'rel',
                 entry: e,
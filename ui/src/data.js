@@ -0,0 +1,125 @@
+/**
+ * Loader for the sharded static export written by backend/export_for_web.py.
+ *
+ * /data/manifest.json is small and always fetched first. It lists the teams, seasons
+ * and athletes, plus one shard per (team, season). Shard filenames contain a hash of
+ * their content, so a shard URL never changes meaning and can be cached forever; only
+ * the shards for the team being viewed are fetched.
+ *
+ * Shards are columnar and refer to the manifest's dictionaries by id; decodeShard
+ * rebuilds plain row objects so the components don't see the encoding.
+ */
+
+const DATA_ROOT = '/data/'
+const FORMAT = 2 // export_for_web.FORMAT
+
+const shardCache = new Map() // file -> Promise<rows>
+
+export async function loadManifest() {
+    // The manifest itself is not content-hashed: always revalidate it
+    const res = await fetch(`${DATA_ROOT}manifest.json`, { cache: 'no-cache' })
+    if (!res.ok) throw new Error(`manifest.json: HTTP ${res.status}`)
+    const manifest = await res.json()
+    if (manifest.format !== FORMAT) throw new Error(`manifest.json: unsupported format ${manifest.format}`)
+    return manifest
+}
+
+/** Team names that have at least one shard, sorted. */
+export function manifestTeams(manifest) {
+    const withShards = new Set(manifest.shards.map(s => s.team_id))
+    return manifest.teams
+        .filter(t => withShards.has(t.id) && t.name)
+        .map(t => t.name)
+        .sort()
+}
+
+/** Shard files needed to show a team ('All' means every shard). */
+export function shardFiles(manifest, teamName) {
+    if (teamName === 'All') return manifest.shards.map(s => s.file)
+    const team = manifest.teams.find(t => t.name === teamName)
+    if (!team) return []
+    return manifest.shards.filter(s => s.team_id === team.id).map(s => s.file)
+}
+
+export function loadShard(file) {
+    if (!shardCache.has(file)) {
+        const request = fetch(`${DATA_ROOT}${file}`)
+            .then(res => {
+                if (!res.ok) throw new Error(`${file}: HTTP ${res.status}`)
+                return res.json()
+            })
+            .catch(err => {
+                shardCache.delete(file) // allow a retry
+                throw err
+            })
+        shardCache.set(file, request)
+    }
+    return shardCache.get(file)
+}
+
+const dictionaries = new WeakMap() // manifest -> {teams, seasons, events, meets, athletes} by id
+
+function dictionariesFor(manifest) {
+    if (!dictionaries.has(manifest)) {
+        const byId = list => new Map((list || []).map(x => [x.id, x]))
+        dictionaries.set(manifest, {
+            teams: byId(manifest.teams),
+            seasons: byId(manifest.seasons),
+            events: byId(manifest.events),
+            meets: byId(manifest.meets),
+            athletes: byId(manifest.athletes),
+        })
+    }
+    return dictionaries.get(manifest)
+}
+
+/**
+ * Turns a columnar shard back into the row objects GET /performances returns
+ * (see EXPORT_SCHEMA.md). mark_value is kept on each row for numeric sorting.
+ */
+export function decodeShard(manifest, shard) {
+    const { teams, seasons, events, meets, athletes } = dictionariesFor(manifest)
+    const c = shard.columns
+    const team = teams.get(shard.team_id)?.name ?? null
+    const season = seasons.get(shard.season_id)
+    const athleteName = id => athletes.get(id)?.name ?? 'Unknown'
+
+    const rows = new Array(shard.count)
+    for (let i = 0; i < shard.count; i++) {
+        const meet = meets.get(c.meet_id[i])
+        const row = {
+            id: c.id[i],
+            athlete_id: c.athlete_id[i],
+            athlete_name: c.athlete_id[i] != null ? athleteName(c.athlete_id[i]) : null,
+            event: events.get(c.event_id[i])?.name ?? null,
+            mark: c.mark[i],
+            mark_value: c.mark_value[i],
+            place: c.place[i],
+            team,
+            date: shard.dates[c.date[i]],
+            season: season?.season ?? null,
+            year: season?.year ?? null,
+            meet_name: meet?.name ?? null,
+            meet_url: meet?.url ?? '',
+            splits: c.splits[i],
+        }
+        const legs = c.relay_legs[i]
+        if (legs) {
+            row.relay_legs = legs.map(([athleteId, split], leg) => ({
+                leg: leg + 1, athlete_id: athleteId, athlete_name: athleteName(athleteId), split
+            }))
+            row.athlete_name = legs.length
+                ? row.relay_legs.map(l => l.athlete_name).join(', ')
+                : `${team || 'Unknown'} Relay`
+        }
+        rows[i] = row
+    }
+    return rows
+}
+
+/** Resolves to {file: rows} for every shard the team needs. */
+export async function loadTeamShards(manifest, teamName) {
+    const files = shardFiles(manifest, teamName)
+    const shards = await Promise.all(files.map(loadShard))
+    return Object.fromEntries(files.map((f, i) => [f, decodeShard(manifest, shards[i])]))
+}
@@ -91,3 +91,11 @@ export function isBetter(a, b) {
         return pA.value > pB.value;
     }
 }
+
+/**
+ * Identifies who a performance belongs to for PR/SB tracking.
+ * Relays have no athlete_id, so the team stands in for the relay squad.
+ */
+export function performerKey(p) {
+    return p.athlete_id != null ? String(p.athlete_id) : `relay:${p.team}`;
+}